@@ -1,3 +1,6 @@
+-- bhav_mcx and bhavcopy are partitioned by month on their trade date (see migrations/003).
+-- After creating them, run `python manage.py manage_partitions` to add the monthly partitions.
+
 CREATE TABLE `bhav_mcx` (
   `id` int NOT NULL AUTO_INCREMENT,
   `date` date NOT NULL,
@@ -18,13 +21,20 @@ CREATE TABLE `bhav_mcx` (
   `option_type` varchar(10) DEFAULT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=34834 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+  PRIMARY KEY (`id`, `date`),
+  KEY `ix_bhav_mcx_date` (`date`),
+  KEY `ix_bhav_mcx_symbol_date` (`symbol`, `date`),
+  KEY `ix_bhav_mcx_expiry` (`symbol`, `expiry_date`, `date`)
+) ENGINE=InnoDB AUTO_INCREMENT=34834 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS (`date`) (
+  PARTITION p_history VALUES LESS THAN ('2024-01-01'),
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
 
 
 
 CREATE TABLE `bhavcopy` (
-  `TradDt` date DEFAULT NULL,
+  `TradDt` date NOT NULL,
   `BizDt` date DEFAULT NULL,
   `Sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
   `Src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
@@ -62,5 +72,92 @@ CREATE TABLE `bhavcopy` (
   `status` tinyint NOT NULL DEFAULT '0',
   `created_at` datetime DEFAULT CURRENT_TIMESTAMP,
   `updated_at` datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=326084 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+  PRIMARY KEY (`id`, `TradDt`),
+  UNIQUE KEY `uq_bhavcopy_natural` (`TradDt`, `Sgmt`, `Src`, `FinInstrmId`, `SsnId`),
+  KEY `ix_bhavcopy_symbol_date` (`TckrSymb`, `TradDt`),
+  KEY `ix_bhavcopy_instrument_date` (`FinInstrmId`, `TradDt`),
+  KEY `ix_bhavcopy_expiry` (`TckrSymb`, `XpryDt`, `TradDt`)
+) ENGINE=InnoDB AUTO_INCREMENT=326084 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE COLUMNS (`TradDt`) (
+  PARTITION p_history VALUES LESS THAN ('2024-01-01'),
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+
+
+CREATE TABLE `load_status` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `row_count` int NOT NULL DEFAULT '0',
+  `checksum` char(64) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
+  `loaded_at` datetime DEFAULT NULL,
+  `updated_at` datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_load_status_cell` (`trade_date`, `sgmt`, `src`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+
+CREATE TABLE `daily_market_summary` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `instruments` int NOT NULL DEFAULT '0',
+  `advances` int NOT NULL DEFAULT '0',
+  `declines` int NOT NULL DEFAULT '0',
+  `unchanged` int NOT NULL DEFAULT '0',
+  `total_volume` bigint DEFAULT NULL,
+  `total_turnover` decimal(22,2) DEFAULT NULL,
+  `total_trades` bigint DEFAULT NULL,
+  `total_open_interest` bigint DEFAULT NULL,
+  `computed_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_daily_market_summary_cell` (`trade_date`, `sgmt`, `src`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Top N gainers / losers by % change of ClsPric over PrvsClsgPric and top N by TtlTrfVal
+CREATE TABLE `daily_top_movers` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `category` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `position` smallint NOT NULL,
+  `FinInstrmId` int NOT NULL,
+  `TckrSymb` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `ClsPric` decimal(18,2) DEFAULT NULL,
+  `PrvsClsgPric` decimal(18,2) DEFAULT NULL,
+  `pct_change` decimal(12,4) DEFAULT NULL,
+  `TtlTrfVal` decimal(18,2) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_daily_top_movers_rank` (`trade_date`, `sgmt`, `src`, `category`, `position`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+
+CREATE TABLE `continuous_futures` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `dataset` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `root` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `rule` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `trade_date` date NOT NULL,
+  `expiry_date` date NOT NULL,
+  `contract_id` int DEFAULT NULL,
+  `open_price` decimal(18,2) DEFAULT NULL,
+  `high_price` decimal(18,2) DEFAULT NULL,
+  `low_price` decimal(18,2) DEFAULT NULL,
+  `close_price` decimal(18,2) DEFAULT NULL,
+  `settle_price` decimal(18,2) DEFAULT NULL,
+  `volume` bigint DEFAULT NULL,
+  `open_interest` bigint DEFAULT NULL,
+  `adjustment` decimal(18,2) NOT NULL DEFAULT '0.00',
+  `rolled` tinyint NOT NULL DEFAULT '0',
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_continuous_futures_day` (`dataset`, `sgmt`, `src`, `root`, `rule`, `trade_date`),
+  KEY `ix_continuous_futures_date` (`dataset`, `sgmt`, `src`, `trade_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,7 @@
+-- Natural key for BhavCopy so that reloads upsert instead of appending a second copy of the day.
+-- Existing duplicates must be removed first:  python manage.py dedupe_bhavcopy
+-- One row per (trade date, segment, source, instrument, session).
+
+ALTER TABLE `bhavcopy`
+  MODIFY `TradDt` date NOT NULL,
+  ADD UNIQUE KEY `uq_bhavcopy_natural` (`TradDt`, `Sgmt`, `Src`, `FinInstrmId`, `SsnId`);
@@ -0,0 +1,16 @@
+-- Per-cell load summary maintained by the ingest code; the coverage dashboard reads this
+-- instead of grouping the fact tables. MCX days are stored with sgmt = src = 'MCX'.
+-- Backfill after creating:  python manage.py rebuild_load_status
+
+CREATE TABLE IF NOT EXISTS `load_status` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `row_count` int NOT NULL DEFAULT '0',
+  `checksum` char(64) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
+  `loaded_at` datetime DEFAULT NULL,
+  `updated_at` datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_load_status_cell` (`trade_date`, `sgmt`, `src`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,99 @@
+-- Monthly RANGE COLUMNS partitioning of the two fact tables on their trade date, so that
+-- date-range reads and per-day reloads touch only the partitions of the dates involved and old
+-- months can be dropped or archived as a metadata operation.
+-- MySQL requires the partitioning column in every unique key, hence the (id, date) primary keys.
+-- p_history holds everything before 2024; p_future catches dates beyond the last monthly partition.
+-- Keep partitions ahead of the calendar and apply retention with:  python manage.py manage_partitions
+-- Both ALTERs rebuild their table; run them in a maintenance window.
+
+ALTER TABLE `bhavcopy`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `TradDt`);
+
+ALTER TABLE `bhavcopy`
+PARTITION BY RANGE COLUMNS (`TradDt`) (
+  PARTITION p_history VALUES LESS THAN ('2024-01-01'),
+  PARTITION p202401 VALUES LESS THAN ('2024-02-01'),
+  PARTITION p202402 VALUES LESS THAN ('2024-03-01'),
+  PARTITION p202403 VALUES LESS THAN ('2024-04-01'),
+  PARTITION p202404 VALUES LESS THAN ('2024-05-01'),
+  PARTITION p202405 VALUES LESS THAN ('2024-06-01'),
+  PARTITION p202406 VALUES LESS THAN ('2024-07-01'),
+  PARTITION p202407 VALUES LESS THAN ('2024-08-01'),
+  PARTITION p202408 VALUES LESS THAN ('2024-09-01'),
+  PARTITION p202409 VALUES LESS THAN ('2024-10-01'),
+  PARTITION p202410 VALUES LESS THAN ('2024-11-01'),
+  PARTITION p202411 VALUES LESS THAN ('2024-12-01'),
+  PARTITION p202412 VALUES LESS THAN ('2025-01-01'),
+  PARTITION p202501 VALUES LESS THAN ('2025-02-01'),
+  PARTITION p202502 VALUES LESS THAN ('2025-03-01'),
+  PARTITION p202503 VALUES LESS THAN ('2025-04-01'),
+  PARTITION p202504 VALUES LESS THAN ('2025-05-01'),
+  PARTITION p202505 VALUES LESS THAN ('2025-06-01'),
+  PARTITION p202506 VALUES LESS THAN ('2025-07-01'),
+  PARTITION p202507 VALUES LESS THAN ('2025-08-01'),
+  PARTITION p202508 VALUES LESS THAN ('2025-09-01'),
+  PARTITION p202509 VALUES LESS THAN ('2025-10-01'),
+  PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+  PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+  PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+  PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+  PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+  PARTITION p202604 VALUES LESS THAN ('2026-05-01'),
+  PARTITION p202605 VALUES LESS THAN ('2026-06-01'),
+  PARTITION p202606 VALUES LESS THAN ('2026-07-01'),
+  PARTITION p202607 VALUES LESS THAN ('2026-08-01'),
+  PARTITION p202608 VALUES LESS THAN ('2026-09-01'),
+  PARTITION p202609 VALUES LESS THAN ('2026-10-01'),
+  PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+  PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+  PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+ALTER TABLE `bhav_mcx`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `date`);
+
+ALTER TABLE `bhav_mcx`
+PARTITION BY RANGE COLUMNS (`date`) (
+  PARTITION p_history VALUES LESS THAN ('2024-01-01'),
+  PARTITION p202401 VALUES LESS THAN ('2024-02-01'),
+  PARTITION p202402 VALUES LESS THAN ('2024-03-01'),
+  PARTITION p202403 VALUES LESS THAN ('2024-04-01'),
+  PARTITION p202404 VALUES LESS THAN ('2024-05-01'),
+  PARTITION p202405 VALUES LESS THAN ('2024-06-01'),
+  PARTITION p202406 VALUES LESS THAN ('2024-07-01'),
+  PARTITION p202407 VALUES LESS THAN ('2024-08-01'),
+  PARTITION p202408 VALUES LESS THAN ('2024-09-01'),
+  PARTITION p202409 VALUES LESS THAN ('2024-10-01'),
+  PARTITION p202410 VALUES LESS THAN ('2024-11-01'),
+  PARTITION p202411 VALUES LESS THAN ('2024-12-01'),
+  PARTITION p202412 VALUES LESS THAN ('2025-01-01'),
+  PARTITION p202501 VALUES LESS THAN ('2025-02-01'),
+  PARTITION p202502 VALUES LESS THAN ('2025-03-01'),
+  PARTITION p202503 VALUES LESS THAN ('2025-04-01'),
+  PARTITION p202504 VALUES LESS THAN ('2025-05-01'),
+  PARTITION p202505 VALUES LESS THAN ('2025-06-01'),
+  PARTITION p202506 VALUES LESS THAN ('2025-07-01'),
+  PARTITION p202507 VALUES LESS THAN ('2025-08-01'),
+  PARTITION p202508 VALUES LESS THAN ('2025-09-01'),
+  PARTITION p202509 VALUES LESS THAN ('2025-10-01'),
+  PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+  PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+  PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+  PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+  PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+  PARTITION p202604 VALUES LESS THAN ('2026-05-01'),
+  PARTITION p202605 VALUES LESS THAN ('2026-06-01'),
+  PARTITION p202606 VALUES LESS THAN ('2026-07-01'),
+  PARTITION p202607 VALUES LESS THAN ('2026-08-01'),
+  PARTITION p202608 VALUES LESS THAN ('2026-09-01'),
+  PARTITION p202609 VALUES LESS THAN ('2026-10-01'),
+  PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+  PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+  PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
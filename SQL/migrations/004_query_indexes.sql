@@ -0,0 +1,19 @@
+-- Secondary indexes for the hot read paths. Check the plans afterwards with:
+--   python manage.py check_query_plans
+--
+-- Already covered by earlier keys:
+--   * BhavCopy day/segment/source lookups (reload reconcile, rebuild_load_status, TradDt range +
+--     Sgmt/Src filters): prefix of uq_bhavcopy_natural (TradDt, Sgmt, Src, ...).
+--   * Dashboard coverage: load_status.uq_load_status_cell (trade_date, sgmt, src).
+-- Every index ends in the date column so range reads stay index range scans and, with the monthly
+-- partitioning from 003, prune to the months asked for.
+
+ALTER TABLE `bhavcopy`
+  ADD KEY `ix_bhavcopy_symbol_date` (`TckrSymb`, `TradDt`),
+  ADD KEY `ix_bhavcopy_instrument_date` (`FinInstrmId`, `TradDt`),
+  ADD KEY `ix_bhavcopy_expiry` (`TckrSymb`, `XpryDt`, `TradDt`);
+
+ALTER TABLE `bhav_mcx`
+  ADD KEY `ix_bhav_mcx_date` (`date`),
+  ADD KEY `ix_bhav_mcx_symbol_date` (`symbol`, `date`),
+  ADD KEY `ix_bhav_mcx_expiry` (`symbol`, `expiry_date`, `date`);
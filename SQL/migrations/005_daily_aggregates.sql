@@ -0,0 +1,39 @@
+-- Per-day market aggregates per (segment, source), computed by the ingest code from the parsed
+-- file (bhavcopy_app.daily_aggregates) so nobody has to GROUP BY a full BhavCopy day.
+-- Backfill or repair after creating:  python manage.py rebuild_daily_aggregates
+
+CREATE TABLE IF NOT EXISTS `daily_market_summary` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `instruments` int NOT NULL DEFAULT '0',
+  `advances` int NOT NULL DEFAULT '0',
+  `declines` int NOT NULL DEFAULT '0',
+  `unchanged` int NOT NULL DEFAULT '0',
+  `total_volume` bigint DEFAULT NULL,
+  `total_turnover` decimal(22,2) DEFAULT NULL,
+  `total_trades` bigint DEFAULT NULL,
+  `total_open_interest` bigint DEFAULT NULL,
+  `computed_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_daily_market_summary_cell` (`trade_date`, `sgmt`, `src`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Top N gainers / losers by % change of ClsPric over PrvsClsgPric and top N by TtlTrfVal
+CREATE TABLE IF NOT EXISTS `daily_top_movers` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `trade_date` date NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `category` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `position` smallint NOT NULL,
+  `FinInstrmId` int NOT NULL,
+  `TckrSymb` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `ClsPric` decimal(18,2) DEFAULT NULL,
+  `PrvsClsgPric` decimal(18,2) DEFAULT NULL,
+  `pct_change` decimal(12,4) DEFAULT NULL,
+  `TtlTrfVal` decimal(18,2) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_daily_top_movers_rank` (`trade_date`, `sgmt`, `src`, `category`, `position`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,28 @@
+-- Rolled continuous futures series per root symbol and roll rule, maintained incrementally by the
+-- ingest code (bhavcopy_app.continuous_futures): each loaded day appends one row per root and rule.
+-- Prices are stored raw with a forward adjustment; adjusted price = raw price + adjustment.
+-- Build the history after creating:  python manage.py rebuild_continuous_futures --start YYYY-MM-DD
+
+CREATE TABLE IF NOT EXISTS `continuous_futures` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `dataset` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `sgmt` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `src` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `root` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `rule` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `trade_date` date NOT NULL,
+  `expiry_date` date NOT NULL,
+  `contract_id` int DEFAULT NULL,
+  `open_price` decimal(18,2) DEFAULT NULL,
+  `high_price` decimal(18,2) DEFAULT NULL,
+  `low_price` decimal(18,2) DEFAULT NULL,
+  `close_price` decimal(18,2) DEFAULT NULL,
+  `settle_price` decimal(18,2) DEFAULT NULL,
+  `volume` bigint DEFAULT NULL,
+  `open_interest` bigint DEFAULT NULL,
+  `adjustment` decimal(18,2) NOT NULL DEFAULT '0.00',
+  `rolled` tinyint NOT NULL DEFAULT '0',
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_continuous_futures_day` (`dataset`, `sgmt`, `src`, `root`, `rule`, `trade_date`),
+  KEY `ix_continuous_futures_date` (`dataset`, `sgmt`, `src`, `trade_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
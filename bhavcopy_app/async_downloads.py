@@ -0,0 +1,170 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from bhavcopy_app.exchange_sessions import SESSION_POOL
+from bhavcopy_app.metrics import stage_timer
+from bhavcopy_app.raw_cache import RAW_CACHE
+from bhavcopy_app.reload_script import (DOWNLOAD_ATTEMPTS, REFRESH_SESSION, download_backoff, download_failure,
+                                        download_file, download_outcome, get_headers, reload_data_for_date,
+                                        report_progress)
+from config import BASE_URLS, HTTP_POOL_MAXSIZE, RELOAD_ASYNC_DOWNLOADS, RELOAD_DOWNLOAD_CONCURRENCY, RELOAD_WORKERS
+
+try:
+    import httpx
+except ImportError:  # Optional: without it, downloads fall back to the blocking client in a worker thread
+    httpx = None
+
+
+class LoopState:
+    """The httpx client and per-exchange download limits of one event loop (neither may cross loops)."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_keepalive_connections=HTTP_POOL_MAXSIZE))
+        self.semaphores = {}
+
+    def semaphore(self, exchange):
+        if exchange not in self.semaphores:
+            self.semaphores[exchange] = asyncio.Semaphore(RELOAD_DOWNLOAD_CONCURRENCY)
+        return self.semaphores[exchange]
+
+
+_states = weakref.WeakKeyDictionary()  # event loop -> LoopState
+_loop = None
+_ingest_executor = None
+_loop_lock = threading.Lock()
+
+
+def async_downloads_enabled():
+    """True when reload jobs should download on the shared event loop (config switch and httpx installed)."""
+    return RELOAD_ASYNC_DOWNLOADS and httpx is not None
+
+
+def loop_state():
+    """LoopState of the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    if loop not in _states:
+        _states[loop] = LoopState()
+    return _states[loop]
+
+
+def download_loop():
+    """
+    Background event loop (started on first use) that async reload jobs run on.
+
+    Downloads from all jobs are in flight on it together. Short blocking hops (cookie warm-ups,
+    RAW_CACHE reads and writes) use the loop's default executor; the parse and database load of
+    each job go to ingest_executor(), so they never hold up a download waiting for a thread.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="reload-downloads", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def ingest_executor():
+    """RELOAD_WORKERS threads for the CPU- and database-bound stage of async reloads, like the synchronous job pool."""
+    global _ingest_executor
+    with _loop_lock:
+        if _ingest_executor is None:
+            _ingest_executor = ThreadPoolExecutor(max_workers=RELOAD_WORKERS, thread_name_prefix="reload")
+    return _ingest_executor
+
+
+async def download_file_async(file_url, src, date_str_formatted, progress=None):
+    """
+    Async counterpart of reload_script.download_file, with the same retries and (content, error) result.
+
+    The exchange cookies come from the shared SESSION_POOL session, warmed up in a thread; the
+    download itself is awaited on the event loop, at most RELOAD_DOWNLOAD_CONCURRENCY per exchange.
+    """
+    if httpx is None:
+        return await asyncio.to_thread(download_file, file_url, src, date_str_formatted, progress)
+
+    report_progress(progress, "cookies")
+    try:
+        session = await asyncio.to_thread(SESSION_POOL.get, src)
+    except requests.RequestException as e:
+        print(f"❌ Failed to fetch cookies for {src}: {e}")
+        return None, {"success": False, "error": f"Failed to fetch cookies from {src}."}
+
+    state = loop_state()
+    report_progress(progress, "download")
+    response = None
+    async with state.semaphore(src):
+        for attempt in range(DOWNLOAD_ATTEMPTS):
+            try:
+                response = await state.client.get(file_url, headers=cookie_headers(session, src, file_url))
+            except (httpx.HTTPError, requests.RequestException):
+                delay = download_backoff(attempt)
+                if delay is None:
+                    return download_failure(src, date_str_formatted, timed_out=True)
+                await asyncio.sleep(delay)
+                continue
+
+            outcome = download_outcome(response, src, date_str_formatted)
+            if outcome is REFRESH_SESSION:
+                session = await asyncio.to_thread(SESSION_POOL.refresh, src, session)
+            elif outcome is not None:
+                return outcome
+
+    return download_failure(src, date_str_formatted, response)
+
+
+def cookie_headers(session, src, url):
+    """get_headers(src) plus the Cookie header the shared requests session would send to `url`."""
+    headers = dict(get_headers(src))
+    cookie = requests.cookies.get_cookie_header(session.cookies, requests.Request("GET", url).prepare())
+    if cookie:
+        headers["Cookie"] = cookie
+    return headers
+
+
+async def reload_data_for_date_async(date_str, sgmt="CM", src="NSE", progress=None, force=False, **options):
+    """
+    reload_data_for_date with the download awaited on the event loop.
+
+    The RAW_CACHE copy is used unless `force` is set; otherwise the file is downloaded with
+    download_file_async and cached. Parsing and the database load, which hold the GIL or a blocking
+    driver call, then run on ingest_executor(). Returns the same result dict.
+    """
+    timer, owned = stage_timer(src, sgmt, progress)
+    result = await _reload_data_for_date_async(date_str, sgmt, src, timer, force, options)
+    return timer.finish(result) if owned else result
+
+
+async def _reload_data_for_date_async(date_str, sgmt, src, progress, force, options):
+    try:
+        date_str_formatted = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y%m%d")
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    url_key = f"{sgmt}_{src}"
+    if url_key not in BASE_URLS:
+        return {"success": False, "error": f"No URL defined for Sgmt={sgmt}, Src={src}"}
+
+    content = None
+    if not force:
+        report_progress(progress, "cache")
+        content = await asyncio.to_thread(RAW_CACHE.get, src, sgmt, date_str_formatted)
+    if content is not None:
+        print(f"📦 Using cached {src} {sgmt} file for {date_str_formatted}.")
+        progress.count("bhavcopy_ingest_bytes_total", len(content), source="cache")
+    else:
+        content, error = await download_file_async(BASE_URLS[url_key].format(date=date_str_formatted), src,
+                                                   date_str_formatted, progress)
+        if error:
+            return error
+        await asyncio.to_thread(RAW_CACHE.put, src, sgmt, date_str_formatted, content)
+        progress.count("bhavcopy_ingest_bytes_total", len(content), source="download")
+
+    load = functools.partial(reload_data_for_date, date_str, sgmt, src, progress=progress, force=force,
+                             content=content, **options)
+    return await asyncio.get_running_loop().run_in_executor(ingest_executor(), load)
@@ -0,0 +1,162 @@
+import pandas as pd
+
+# Column types used in the schemas below
+DATE = "date"
+STRING = "string"
+CATEGORY = "category"  # Low-cardinality strings, stored as pandas categoricals to save memory
+FLOAT = "float"
+INT = "int"
+
+# UDiFF BhavCopy layout shared by every segment and source: column -> (type, nullable).
+# Non-nullable columns are the NOT NULL columns of the BhavCopy table, so a blank cell drops its row
+# (reported in column_errors) instead of failing the whole insert batch.
+BASE_SCHEMA = {
+    "TradDt": (DATE, False),
+    "BizDt": (DATE, True),
+    "Sgmt": (CATEGORY, False),
+    "Src": (CATEGORY, False),
+    "FinInstrmTp": (CATEGORY, False),
+    "FinInstrmId": (INT, False),
+    "ISIN": (STRING, True),
+    "TckrSymb": (STRING, False),
+    "SctySrs": (CATEGORY, True),
+    "XpryDt": (DATE, True),
+    "FininstrmActlXpryDt": (DATE, True),
+    "StrkPric": (FLOAT, True),
+    "OptnTp": (CATEGORY, True),
+    "FinInstrmNm": (STRING, False),
+    "OpnPric": (FLOAT, True),
+    "HghPric": (FLOAT, True),
+    "LwPric": (FLOAT, True),
+    "ClsPric": (FLOAT, True),
+    "LastPric": (FLOAT, True),
+    "PrvsClsgPric": (FLOAT, True),
+    "UndrlygPric": (FLOAT, True),
+    "SttlmPric": (FLOAT, True),
+    "OpnIntrst": (INT, True),
+    "ChngInOpnIntrst": (INT, True),
+    "TtlTradgVol": (INT, True),
+    "TtlTrfVal": (FLOAT, True),
+    "TtlNbOfTxsExctd": (INT, True),
+    "SsnId": (CATEGORY, False),
+    "NewBrdLotQty": (INT, False),
+    "Rmks": (STRING, True),
+    "Rsvd1": (STRING, True),
+    "Rsvd2": (STRING, True),
+    "Rsvd3": (STRING, True),
+    "Rsvd4": (STRING, True),
+}
+
+# Derivatives segments always carry an expiry
+DERIVATIVE_OVERRIDES = {
+    "XpryDt": (DATE, False),
+}
+
+# (segment, source) -> overrides applied on top of BASE_SCHEMA
+SCHEMA_OVERRIDES = {
+    ("CM", "NSE"): {},
+    ("CM", "BSE"): {},
+    ("FO", "NSE"): DERIVATIVE_OVERRIDES,
+    ("FO", "BSE"): DERIVATIVE_OVERRIDES,
+    ("CD", "NSE"): DERIVATIVE_OVERRIDES,
+    ("CD", "BSE"): DERIVATIVE_OVERRIDES,
+}
+
+# UDiFF dates are ISO formatted
+DATE_FORMAT = "%Y-%m-%d"
+
+# dtypes handed to pd.read_csv. Dates are read as text and parsed with DATE_FORMAT; integers are
+# read as float64 (the parser's nullable Int64 path is several times slower) and narrowed in coerce().
+READ_DTYPES = {DATE: "str", STRING: "str", CATEGORY: "category", FLOAT: "float64", INT: "float64"}
+
+
+class SchemaValidationError(ValueError):
+    """Raised when a BhavCopy file cannot be loaded at all; `errors` maps column -> problem."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("Schema validation failed: " + "; ".join(f"{column}: {problem}" for column, problem in errors.items()))
+
+
+def get_schema(sgmt, src):
+    """Return the column -> (type, nullable) schema for a segment and source."""
+    schema = dict(BASE_SCHEMA)
+    schema.update(SCHEMA_OVERRIDES.get((sgmt, src), {}))
+    return schema
+
+
+def reader_dtypes(schema, typed=True):
+    """
+    dtype mapping for pd.read_csv.
+
+    With `typed=False` numeric columns are read as text so that malformed values can be
+    coerced and reported per column instead of failing the whole parse.
+    """
+    return {
+        column: READ_DTYPES[kind] if typed or kind not in (FLOAT, INT) else "str"
+        for column, (kind, _) in schema.items()
+    }
+
+
+def coerce(df, schema):
+    """
+    Bring every schema column to its declared type with vectorized conversions.
+
+    Values that cannot be converted become null. Returns {column: number of values nulled}.
+    """
+    nulled = {}
+    for column, (kind, _) in schema.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if kind == DATE:
+            if pd.api.types.is_datetime64_any_dtype(series):
+                continue
+            converted = pd.to_datetime(series, format=DATE_FORMAT, errors="coerce")
+        elif kind in (FLOAT, INT):
+            if pd.api.types.is_numeric_dtype(series) and (kind == FLOAT or str(series.dtype) == "Int64"):
+                continue
+            converted = series if pd.api.types.is_numeric_dtype(series) else \
+                pd.to_numeric(series.astype("str").str.strip(), errors="coerce")
+            if kind == INT:
+                # Fractional values are not valid integers: null them instead of truncating
+                converted = converted.where(converted.isna() | (converted % 1 == 0)).astype("Int64")
+            else:
+                converted = converted.astype("float64")
+        else:
+            target = "category" if kind == CATEGORY else "str"
+            if series.dtype != target:
+                # e.g. an all-blank column the reader inferred as float; blank cells stay missing
+                df[column] = series.astype("str").where(series.notna()).astype(target)
+            continue
+
+        failed = int((converted.isna() & series.notna()).sum())
+        if failed:
+            nulled[column] = failed
+        df[column] = converted
+    return nulled
+
+
+def validate(df, schema):
+    """
+    Check `df` against `schema`.
+
+    Missing columns raise SchemaValidationError. Rows with nulls in non-nullable columns are
+    dropped. Returns (df, {column: number of rows rejected because of that column}).
+    """
+    missing = {column: "missing column" for column in schema if column not in df.columns}
+    if missing:
+        raise SchemaValidationError(missing)
+
+    rejected = {}
+    keep = pd.Series(True, index=df.index)
+    for column, (_, nullable) in schema.items():
+        if nullable:
+            continue
+        nulls = df[column].isna()
+        if nulls.any():
+            rejected[column] = int(nulls.sum())
+            keep &= ~nulls
+    if rejected:
+        df = df[keep]
+    return df, rejected
@@ -0,0 +1,106 @@
+import os
+import csv
+import time
+import tempfile
+import mysql.connector
+import numpy as np
+import pandas as pd
+
+
+def dataframe_to_rows(df):
+    """
+    Convert a DataFrame into a list of tuples with NaN/NaT mapped to None (vectorized).
+
+    Datetime columns become datetime.date values, converted once per distinct date.
+    """
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            codes, uniques = pd.factorize(series)  # NaT gets code -1, i.e. the trailing None
+            lookup = np.array([value.date() for value in uniques] + [None], dtype=object)
+            columns.append(lookup[codes])
+        else:
+            columns.append(series.astype(object).where(series.notna(), None).to_numpy())
+    return list(zip(*columns))
+
+
+def executemany_batches(conn, query, rows, batch_size):
+    """
+    Run `query` through cursor.executemany in batches, committing each batch.
+
+    A failing batch is rolled back and recorded; the remaining batches still run.
+
+    Returns:
+        dict: rows_inserted, failed_rows and a list of per-batch errors.
+    """
+    stats = {"rows_inserted": 0, "failed_rows": 0, "errors": []}
+    cursor = conn.cursor()
+    try:
+        for batch_no, start in enumerate(range(0, len(rows), batch_size)):
+            batch = rows[start:start + batch_size]
+            try:
+                cursor.executemany(query, batch)
+                conn.commit()
+                stats["rows_inserted"] += len(batch)
+            except mysql.connector.Error as e:
+                conn.rollback()
+                stats["failed_rows"] += len(batch)
+                stats["errors"].append({"batch": batch_no, "rows": len(batch), "error": str(e)})
+                print(f"❌ Batch {batch_no} ({len(batch)} rows) failed: {e}")
+    finally:
+        cursor.close()
+    return stats
+
+
+def load_data_infile(conn, table, columns, df, batch_size, set_clause="created_at = NOW(), updated_at = NOW()"):
+    """
+    Fast path: stream `df` into `table` with LOAD DATA LOCAL INFILE, one temp CSV per batch.
+
+    Rows colliding on a unique key are replaced. The connection must be opened with
+    `allow_local_infile=True` and the server must have `local_infile` enabled.
+    """
+    stats = {"rows_inserted": 0, "failed_rows": 0, "errors": []}
+    column_list = ", ".join(columns)
+    cursor = conn.cursor()
+    try:
+        for batch_no, start in enumerate(range(0, len(df), batch_size)):
+            batch = df.iloc[start:start + batch_size]
+            fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+            try:
+                with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                    batch.to_csv(f, columns=columns, index=False, header=False, na_rep="\\N",
+                                 quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+                cursor.execute(f"""
+                    LOAD DATA LOCAL INFILE %s
+                    REPLACE INTO TABLE {table}
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                    LINES TERMINATED BY '\\n'
+                    ({column_list})
+                    SET {set_clause}
+                """, (tmp_path.replace("\\", "/"),))
+                conn.commit()
+                stats["rows_inserted"] += len(batch)
+            except mysql.connector.Error as e:
+                conn.rollback()
+                stats["failed_rows"] += len(batch)
+                stats["errors"].append({"batch": batch_no, "rows": len(batch), "error": str(e)})
+                print(f"❌ LOAD DATA batch {batch_no} ({len(batch)} rows) failed: {e}")
+            finally:
+                os.remove(tmp_path)
+    finally:
+        cursor.close()
+    return stats
+
+
+def timed_load(load_fn, *args, **kwargs):
+    """Run a loader and add elapsed seconds and rows/sec to its stats dict (a None result is passed through)."""
+    started = time.perf_counter()
+    stats = load_fn(*args, **kwargs)
+    if stats is None:
+        return None
+    elapsed = time.perf_counter() - started
+    stats["elapsed_sec"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows_inserted"] / elapsed, 1) if elapsed > 0 else None
+    return stats
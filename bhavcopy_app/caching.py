@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+
+# Every DateRangeCache created, so a reload can invalidate a date everywhere at once
+_CACHES = []
+
+
+class DateRangeCache:
+    """
+    In-process LRU cache whose entries depend on a date range of one data scope ("bhavcopy" or "mcx").
+
+    Entries expire after `ttl` seconds (None keeps them until evicted) and the least recently used
+    one is evicted beyond `max_entries`. invalidate_date() drops every entry whose range covers a
+    date, which is what a reload of that date calls. Each process has its own copy; the TTL bounds
+    how stale another process's entries can get.
+    """
+
+    def __init__(self, name, max_entries, ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, scope, start, end, expires_at)
+        self._versions = {}  # scope -> invalidation count
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        _CACHES.append(self)
+
+    def get(self, key):
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[4] is not None and entry[4] <= time.monotonic():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def version(self, scope):
+        """
+        Invalidation counter of `scope`. Read it before computing a value and pass it to set(), so a
+        value computed while a reload was invalidating the same scope is not stored.
+        """
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def set(self, key, value, scope, start, end, version=None):
+        """Store `value` as depending on [start, end] of `scope`."""
+        with self._lock:
+            if version is not None and version != self._versions.get(scope, 0):
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (value, scope, start, end, expires_at)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_date(self, scope, day):
+        """Drop the entries of `scope` whose date range includes `day`; returns how many."""
+        return self.invalidate_range(scope, day, day)
+
+    def invalidate_range(self, scope, first, last):
+        """Drop the entries of `scope` whose date range overlaps [first, last]; returns how many."""
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+            stale = [key for key, (_, entry_scope, start, end, _) in self._entries.items()
+                     if entry_scope == scope and start <= last and first <= end]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters since process start, with the hit rate and current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update(max_entries=self.max_entries, ttl=self.ttl,
+                     hit_rate=round(stats["hits"] / lookups, 3) if lookups else None)
+        return stats
+
+
+def invalidate_date(scope, day):
+    """Invalidate `day` of `scope` in every cache; called once a reload has written that day."""
+    dropped = sum(cache.invalidate_date(scope, day) for cache in _CACHES)
+    if dropped:
+        print(f"🧹 Invalidated {dropped} cached {scope} entries covering {day}.")
+    return dropped
+
+
+def invalidate_range(scope, first, last):
+    """Invalidate every date from `first` to `last` of `scope` in every cache, e.g. after old months are retired."""
+    dropped = sum(cache.invalidate_range(scope, first, last) for cache in _CACHES)
+    if dropped:
+        print(f"🧹 Invalidated {dropped} cached {scope} entries covering {first} to {last}.")
+    return dropped
+
+
+def cache_stats():
+    """Stats of every cache, by name."""
+    return {cache.name: cache.stats() for cache in _CACHES}
+
+
+# Serialized get_data / get_data_mcx responses
+RESPONSE_CACHE = DateRangeCache("responses", RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL)
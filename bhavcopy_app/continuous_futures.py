@@ -0,0 +1,237 @@
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+from bhavcopy_app.metrics import REGISTRY
+from config import CONTINUOUS_FUTURES_LOCK_TIMEOUT, CONTINUOUS_FUTURES_RULES, CONTINUOUS_FUTURES_SEGMENTS
+
+# One day's futures contracts of a (segment, source), in CONTRACT_COLUMNS order
+CONTRACT_COLUMNS = ["root", "expiry_date", "contract_id", "open_price", "high_price", "low_price", "close_price",
+                    "settle_price", "volume", "open_interest"]
+BHAVCOPY_FUTURES_QUERY = """
+    SELECT TckrSymb, XpryDt, FinInstrmId, OpnPric, HghPric, LwPric, ClsPric, SttlmPric, TtlTradgVol, OpnIntrst
+    FROM BhavCopy
+    WHERE TradDt = %s AND Sgmt = %s AND Src = %s AND OptnTp IS NULL AND XpryDt IS NOT NULL
+"""
+MCX_FUTURES_QUERY = """
+    SELECT symbol, expiry_date, NULL, open_price, high_price, low_price, close_price, NULL, volume, open_interest
+    FROM bhav_mcx
+    WHERE date = %s AND (option_type IS NULL OR option_type NOT IN ('CE', 'PE'))
+"""
+
+SERIES_COLUMNS = ["dataset", "sgmt", "src", "root", "rule", "trade_date", *CONTRACT_COLUMNS[1:], "adjustment", "rolled"]
+SERIES_INSERT = (f"INSERT INTO continuous_futures ({', '.join(f'`{column}`' for column in SERIES_COLUMNS)}) "
+                 f"VALUES ({', '.join(['%s'] * len(SERIES_COLUMNS))})")
+SERIES_KEY = "dataset = %s AND sgmt = %s AND src = %s"
+
+# Last stored (contract, close, adjustment) per (root, rule) before a date
+STATES_QUERY = f"""
+    SELECT c.root, c.`rule`, c.expiry_date, c.close_price, c.adjustment
+    FROM continuous_futures c
+    JOIN (
+        SELECT root, `rule`, MAX(trade_date) AS last_date
+        FROM continuous_futures
+        WHERE {SERIES_KEY} AND trade_date < %s
+        GROUP BY root, `rule`
+    ) latest ON c.root = latest.root AND c.`rule` = latest.`rule` AND c.trade_date = latest.last_date
+    WHERE c.dataset = %s AND c.sgmt = %s AND c.src = %s
+"""
+
+_series_locks = {}  # (dataset, sgmt, src) -> threading.Lock
+_series_locks_guard = threading.Lock()
+
+
+class SeriesLockTimeout(Exception):
+    """Another replay of the same series held its lock for longer than CONTINUOUS_FUTURES_LOCK_TIMEOUT."""
+
+
+def parse_rule(rule):
+    """("oi" | "volume", None) or ("days", N) for a rule spec "oi", "volume" or "days:N"."""
+    if rule in ("oi", "volume"):
+        return rule, None
+    kind, _, days = rule.partition(":")
+    if kind == "days" and days.isdigit():
+        return kind, int(days)
+    raise ValueError(f"Unknown roll rule '{rule}', expected oi, volume or days:N.")
+
+
+def dataset_for(sgmt, src):
+    """The fact table ("bhavcopy" / "mcx") behind a load_status (segment, source)."""
+    return "mcx" if (sgmt, src) == (MCX_SGMT, MCX_SRC) else "bhavcopy"
+
+
+def choose_contract(contracts, current_expiry, rule, day):
+    """
+    Contract (a CONTRACT_COLUMNS dict) the series holds on `day` under `rule`.
+
+    `contracts` are one root's contracts trading that day, sorted by expiry. The series never
+    moves back to an earlier expiry, and it leaves a contract on its expiry day when a later one
+    trades, so the roll gap can be measured with both prices from the same day.
+    - oi / volume: the next expiry once its open interest / volume exceeds the current contract's.
+    - days:N: the nearest contract more than N calendar days from expiry.
+    """
+    eligible = [contract for contract in contracts if not current_expiry or contract["expiry_date"] >= current_expiry]
+    eligible = [contract for contract in eligible if contract["expiry_date"] > day] or eligible
+    if not eligible:
+        return None
+
+    kind, days = parse_rule(rule)
+    if kind == "days":
+        ahead = [contract for contract in eligible if (contract["expiry_date"] - day).days > days]
+        return ahead[0] if ahead else eligible[-1]
+
+    metric = "open_interest" if kind == "oi" else "volume"
+    current = eligible[0]
+    if len(eligible) > 1 and (eligible[1][metric] or 0) > (current[metric] or 0):
+        return eligible[1]
+    return current
+
+
+def roll_day(day, contracts, rules, states):
+    """
+    Series rows of one day, given that day's contracts and the state left by the previous day.
+
+    `states` maps (root, rule) to (expiry_date, close_price, adjustment) and is updated in place.
+    Prices are forward adjusted: on a roll, the close of the old contract minus the close of the new
+    one (both from `day`) is added to the adjustment, so adjusted prices stay continuous and rows
+    already stored never change.
+    """
+    by_root = {}
+    for contract in sorted(contracts, key=lambda contract: (contract["root"], contract["expiry_date"])):
+        by_root.setdefault(contract["root"], []).append(contract)
+
+    rows = []
+    for root, root_contracts in by_root.items():
+        for rule in rules:
+            previous_expiry, _, adjustment = states.get((root, rule), (None, None, Decimal(0)))
+            chosen = choose_contract(root_contracts, previous_expiry, rule, day)
+            if chosen is None:
+                continue
+            rolled = previous_expiry is not None and chosen["expiry_date"] != previous_expiry
+            if rolled:
+                old = next((contract for contract in root_contracts if contract["expiry_date"] == previous_expiry), None)
+                if old and old["close_price"] is not None and chosen["close_price"] is not None:
+                    adjustment += _decimal(old["close_price"]) - _decimal(chosen["close_price"])
+                # Otherwise the old contract did not trade that day and the gap is unknown; it is left at zero
+            states[(root, rule)] = (chosen["expiry_date"], chosen["close_price"], adjustment)
+            rows.append((root, rule, day, *[chosen[column] for column in CONTRACT_COLUMNS[1:]], adjustment, rolled))
+    return rows
+
+
+@contextmanager
+def series_lock(conn, sgmt, src, timeout=None):
+    """
+    Hold the replay lock of a (segment, source) series for a with-block.
+
+    A replay deletes the series from its first day onwards and re-inserts it, so two replays of the
+    same series (e.g. backfill workers finishing days out of order) must not overlap. A per-process
+    lock orders threads; MySQL GET_LOCK on `conn` orders processes. Commit inside the block.
+    """
+    timeout = CONTINUOUS_FUTURES_LOCK_TIMEOUT if timeout is None else timeout
+    key = (dataset_for(sgmt, src), sgmt, src)
+    with _series_locks_guard:
+        lock = _series_locks.setdefault(key, threading.Lock())
+    if not lock.acquire(timeout=timeout):
+        raise SeriesLockTimeout(f"Timed out waiting for the {sgmt}/{src} continuous futures lock.")
+    try:
+        name = "continuous_futures:" + ":".join(key)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+            if cursor.fetchone()[0] != 1:
+                raise SeriesLockTimeout(f"Timed out waiting for the {sgmt}/{src} continuous futures lock.")
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
+    finally:
+        lock.release()
+
+
+def update_continuous_futures(conn, sgmt, src, trade_date, rules=None):
+    """
+    Bring the continuous series of a (segment, source) up to date after `trade_date` was loaded.
+
+    Normally `trade_date` is the newest day and one row per root and rule is appended. When an
+    older day is reloaded, the stored days from it onwards are replayed from the state before it;
+    nothing earlier is recomputed. Not committed. Returns the number of rows written.
+    """
+    rules = rules or CONTINUOUS_FUTURES_RULES
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT DISTINCT trade_date FROM continuous_futures WHERE {SERIES_KEY} AND trade_date > %s "
+                       f"ORDER BY trade_date", (dataset_for(sgmt, src), sgmt, src, trade_date))
+        later = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+    return replay(conn, sgmt, src, [trade_date, *later], rules)
+
+
+def replay(conn, sgmt, src, days, rules=None):
+    """Recompute the series from days[0] onwards over `days` (ascending), replacing what was stored."""
+    rules = rules or CONTINUOUS_FUTURES_RULES
+    for rule in rules:
+        parse_rule(rule)
+    dataset = dataset_for(sgmt, src)
+    key = (dataset, sgmt, src)
+    rule_filter = f"`rule` IN ({', '.join(['%s'] * len(rules))})"
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM continuous_futures WHERE {SERIES_KEY} AND trade_date >= %s AND {rule_filter}",
+                       (*key, days[0], *rules))
+        cursor.execute(STATES_QUERY, (*key, days[0], *key))
+        states = {(root, rule): (expiry, close, _decimal(adjustment))
+                  for root, rule, expiry, close, adjustment in cursor.fetchall() if rule in rules}
+
+        written = 0
+        for day in days:
+            if dataset == "mcx":
+                cursor.execute(MCX_FUTURES_QUERY, (day,))
+            else:
+                cursor.execute(BHAVCOPY_FUTURES_QUERY, (day, sgmt, src))
+            contracts = [dict(zip(CONTRACT_COLUMNS, row)) for row in cursor.fetchall()]
+            rows = [(*key, *row) for row in roll_day(day, contracts, rules, states)]
+            if rows:
+                cursor.executemany(SERIES_INSERT, rows)
+                written += len(rows)
+        return written
+    finally:
+        cursor.close()
+
+
+def refresh_continuous_futures(sgmt, src, trade_date):
+    """
+    Ingest hook: update_continuous_futures on its own pooled connection and transaction, under series_lock.
+
+    Only segments in CONTINUOUS_FUTURES_SEGMENTS are tracked (None otherwise). Returns
+    {"success": True, "rows_written": N} or {"success": False, "error": ...}; a failure never fails
+    the load itself, is counted in bhavcopy_continuous_futures_refreshes_total, and
+    rebuild_continuous_futures repairs the series afterwards.
+    """
+    if sgmt not in CONTINUOUS_FUTURES_SEGMENTS:
+        return None
+    labels = {"exchange": src, "segment": sgmt}
+    try:
+        with connection() as conn:
+            with series_lock(conn, sgmt, src):
+                written = update_continuous_futures(conn, sgmt, src, trade_date)
+                conn.commit()
+        print(f"📈 Continuous futures for {sgmt}/{src} updated from {trade_date} ({written} rows).")
+        REGISTRY.inc("bhavcopy_continuous_futures_refreshes_total", outcome="success", **labels)
+        return {"success": True, "rows_written": written}
+    except Exception as e:
+        print(f"⚠️ Could not update continuous futures for {sgmt}/{src} {trade_date}: {e}")
+        REGISTRY.inc("bhavcopy_continuous_futures_refreshes_total", outcome="failed", **labels)
+        return {"success": False, "error": f"Continuous futures not updated for {trade_date}: {e}"}
+
+
+def _decimal(value):
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
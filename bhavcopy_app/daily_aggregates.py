@@ -0,0 +1,88 @@
+import pandas as pd
+
+from bhavcopy_app.bulk_loader import dataframe_to_rows
+from config import DAILY_TOP_MOVERS
+
+# BhavCopy columns the aggregates are computed from
+AGGREGATE_COLUMNS = ["FinInstrmId", "TckrSymb", "ClsPric", "PrvsClsgPric", "TtlTradgVol", "TtlTrfVal",
+                     "TtlNbOfTxsExctd", "OpnIntrst"]
+SUMMARY_COLUMNS = ["instruments", "advances", "declines", "unchanged", "total_volume", "total_turnover",
+                   "total_trades", "total_open_interest"]
+MOVER_COLUMNS = ["FinInstrmId", "TckrSymb", "ClsPric", "PrvsClsgPric", "pct_change", "TtlTrfVal"]
+
+SUMMARY_UPSERT = f"""
+    INSERT INTO daily_market_summary (trade_date, sgmt, src, {', '.join(SUMMARY_COLUMNS)}, computed_at)
+    VALUES (%s, %s, %s, {', '.join(['%s'] * len(SUMMARY_COLUMNS))}, NOW())
+    ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in SUMMARY_COLUMNS)},
+        computed_at = VALUES(computed_at)
+"""
+MOVERS_INSERT = f"""
+    INSERT INTO daily_top_movers (trade_date, sgmt, src, category, position, {', '.join(MOVER_COLUMNS)})
+    VALUES (%s, %s, %s, %s, %s, {', '.join(['%s'] * len(MOVER_COLUMNS))})
+"""
+
+
+def compute_daily_aggregates(df, top_n=DAILY_TOP_MOVERS):
+    """
+    Market aggregates of one (date, segment, source) from its cleaned BhavCopy rows.
+
+    Returns (summary, movers): summary maps SUMMARY_COLUMNS to values; movers is a list of
+    (category, position, *MOVER_COLUMNS) rows for the top `top_n` gainers and losers by % change of
+    ClsPric over PrvsClsgPric and the top `top_n` by TtlTrfVal. Rows without both prices count
+    towards the totals but not the advance/decline figures.
+    """
+    close = pd.to_numeric(df["ClsPric"], errors="coerce").astype("float64")
+    previous = pd.to_numeric(df["PrvsClsgPric"], errors="coerce").astype("float64")
+    turnover = pd.to_numeric(df["TtlTrfVal"], errors="coerce").astype("float64")
+    comparable = close.notna() & previous.gt(0)
+    change = (close - previous)[comparable]
+    pct_change = (change / previous[comparable] * 100).round(4)
+
+    summary = {
+        "instruments": len(df),
+        "advances": int(change.gt(0).sum()),
+        "declines": int(change.lt(0).sum()),
+        "unchanged": int(change.eq(0).sum()),
+        "total_volume": _total(df["TtlTradgVol"]),
+        "total_turnover": round(float(turnover.sum()), 2) if turnover.notna().any() else None,
+        "total_trades": _total(df["TtlNbOfTxsExctd"]),
+        "total_open_interest": _total(df["OpnIntrst"]),
+    }
+
+    ranked = {
+        "gainer": pct_change[pct_change.gt(0)].nlargest(top_n).index,
+        "loser": pct_change[pct_change.lt(0)].nsmallest(top_n).index,
+        "turnover": turnover.nlargest(top_n).index,
+    }
+    frame = pd.DataFrame({
+        "FinInstrmId": df["FinInstrmId"],
+        "TckrSymb": df["TckrSymb"],
+        "ClsPric": close,
+        "PrvsClsgPric": previous,
+        "pct_change": pct_change.reindex(df.index),
+        "TtlTrfVal": turnover,
+    })
+    movers = []
+    for category, labels in ranked.items():
+        for position, row in enumerate(dataframe_to_rows(frame.loc[labels, MOVER_COLUMNS]), start=1):
+            movers.append((category, position, *row))
+    return summary, movers
+
+
+def store_daily_aggregates(conn, trade_date, sgmt, src, summary, movers):
+    """Replace the stored aggregates of one cell. Not committed; the caller's load commit covers it."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SUMMARY_UPSERT, (trade_date, sgmt, src, *[summary[column] for column in SUMMARY_COLUMNS]))
+        cursor.execute("DELETE FROM daily_top_movers WHERE trade_date = %s AND sgmt = %s AND src = %s",
+                       (trade_date, sgmt, src))
+        if movers:
+            cursor.executemany(MOVERS_INSERT, [(trade_date, sgmt, src, *mover) for mover in movers])
+    finally:
+        cursor.close()
+
+
+def _total(series):
+    """Sum of a numeric column as an int, or None when it has no values."""
+    values = pd.to_numeric(series, errors="coerce")
+    return int(values.sum()) if values.notna().any() else None
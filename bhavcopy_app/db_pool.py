@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+from config import DB_CONFIG, DB_POOL_HEALTH_CHECK_INTERVAL, DB_POOL_NAME, DB_POOL_SIZE, DB_POOL_TIMEOUT
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of mysql.connector connections built from config.DB_CONFIG.
+
+    The pool is created on first use. A connection idle for longer than `health_check_interval`
+    seconds is pinged (and reconnected if the server dropped it) before being handed out. When every
+    connection is busy, callers wait up to `timeout` seconds for one to be returned.
+    """
+
+    def __init__(self, name, size, timeout, health_check_interval, **db_config):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.db_config = db_config
+        self._pool = None
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._last_used = {}  # id(raw connection) -> monotonic time it was returned
+        self._stats = {"checkouts": 0, "in_use": 0, "peak_in_use": 0, "waits": 0, "wait_time_sec": 0.0,
+                       "timeouts": 0, "health_checks": 0, "reconnects": 0, "direct_connections": 0}
+
+    @contextmanager
+    def connection(self, allow_local_infile=False, dedicated=False):
+        """
+        Borrow a connection for the duration of a with-block; it is rolled back and returned on exit.
+
+        LOAD DATA LOCAL INFILE needs a client flag the pooled connections are not opened with, so
+        `allow_local_infile=True` gets a dedicated connection instead. `dedicated=True` does the same
+        for long-held connections (e.g. streaming exports) that would otherwise starve the pool.
+        """
+        if allow_local_infile or dedicated:
+            with self._lock:
+                self._stats["direct_connections"] += 1
+            conn = mysql.connector.connect(**self.db_config, allow_local_infile=allow_local_infile)
+            try:
+                yield conn
+            finally:
+                if conn.unread_result:
+                    conn.disconnect()  # Abandoned streaming read: drop the socket rather than drain it
+                else:
+                    conn.close()
+            return
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def stats(self):
+        """Usage counters since process start."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(name=self.name, size=self.size, initialized=self._pool is not None,
+                     wait_time_sec=round(stats["wait_time_sec"], 3))
+        return stats
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        started = time.monotonic()
+        with self._available:
+            if self._pool is None:
+                self._pool = pooling.MySQLConnectionPool(pool_name=self.name, pool_size=self.size,
+                                                         pool_reset_session=True, **self.db_config)
+            while True:
+                try:
+                    conn = self._pool.get_connection()
+                    break
+                except PoolError:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise
+                    waited = True
+                    self._available.wait(remaining)
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_time_sec"] += time.monotonic() - started
+            last_used = self._last_used.get(id(conn._cnx))
+
+        if last_used is None or time.monotonic() - last_used > self.health_check_interval:
+            try:
+                self._health_check(conn)
+            except Exception:
+                self._checkin(conn, broken=True)
+                raise
+        return conn
+
+    def _health_check(self, conn):
+        with self._lock:
+            self._stats["health_checks"] += 1
+        if conn.is_connected():
+            return
+        with self._lock:
+            self._stats["reconnects"] += 1
+        conn.reconnect(attempts=2, delay=1)
+
+    def _checkin(self, conn, broken=False):
+        raw = conn._cnx
+        # A streaming read abandoned half way (e.g. a client dropping an export) leaves rows on the
+        # wire; draining them could take minutes, so the session is dropped and reconnected on reuse.
+        # A `broken` connection (failed health check) is dropped the same way.
+        abandoned = raw is not None and (broken or raw.unread_result)
+        if abandoned:
+            raw.disconnect()
+        try:
+            conn.close()  # Returns it to the pool; pool_reset_session rolls back anything left open
+        except mysql.connector.Error:
+            if not abandoned:
+                raise
+        finally:
+            with self._available:
+                if raw is not None and not abandoned:
+                    self._last_used[id(raw)] = time.monotonic()
+                elif raw is not None:
+                    self._last_used.pop(id(raw), None)  # Forces the health check, hence a reconnect
+                self._stats["in_use"] -= 1
+                self._available.notify()
+
+
+DB_POOL = ConnectionPool(DB_POOL_NAME, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_INTERVAL, **DB_CONFIG)
+
+
+def connection(allow_local_infile=False, dedicated=False):
+    """Shortcut for DB_POOL.connection()."""
+    return DB_POOL.connection(allow_local_infile, dedicated)
@@ -0,0 +1,127 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import EXCHANGE_SESSION_TTL, HTTP_POOL_MAXSIZE
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.6834.110 Safari/537.36"
+MCX_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36"
+
+
+def warm_up_nse(session):
+    """Visit the NSE homepage so the archive downloads get the session cookies."""
+    session.get("https://www.nseindia.com", headers={"User-Agent": USER_AGENT}, timeout=30)
+
+
+def warm_up_bse(session):
+    """Visit the BSE homepage and the BhavCopy page to establish a session."""
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Referer": "https://www.bseindia.com/markets/MarketInfo/BhavCopy.aspx",
+        "Accept": "*/*",
+        "Accept-Language": "en-US,en;q=0.9",
+        "X-Requested-With": "XMLHttpRequest"
+    }
+    session.get("https://www.bseindia.com", headers=headers, timeout=30)
+    response = session.get("https://www.bseindia.com/markets/MarketInfo/BhavCopy.aspx", headers=headers, timeout=30)
+    if response.status_code != 200:
+        raise requests.RequestException(f"Unexpected response from BSE ({response.status_code}).")
+
+
+def warm_up_mcx(session):
+    """Visit the MCX BhavCopy page to get the cookies the GetDateWiseBhavCopy endpoint expects."""
+    headers = {
+        "User-Agent": MCX_USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Referer": "https://www.mcxindia.com/",
+        "sec-fetch-site": "same-origin",
+        "sec-fetch-mode": "navigate",
+        "sec-fetch-user": "?1",
+        "X-Requested-With": "XMLHttpRequest"
+    }
+    response = session.get("https://www.mcxindia.com/market-data/bhavcopy", headers=headers, timeout=10)
+    response.raise_for_status()
+
+
+WARM_UPS = {"NSE": warm_up_nse, "BSE": warm_up_bse, "MCX": warm_up_mcx}
+
+
+class ExchangeSession:
+    """One warmed-up requests.Session per exchange, shared by all threads and refreshed on TTL expiry."""
+
+    def __init__(self, exchange, warm_up, ttl):
+        self.exchange = exchange
+        self.warm_up = warm_up
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._session = None
+        self._created = 0.0
+        self.refreshes = 0
+        self.reuses = 0
+
+    def get(self):
+        """Return the shared session, warming up a new one if there is none or it has expired."""
+        with self._lock:
+            if self._session is None or time.monotonic() - self._created > self.ttl:
+                self._replace()
+            else:
+                self.reuses += 1
+            return self._session
+
+    def refresh(self, stale=None):
+        """
+        Replace the session after a 403 / Access Denied.
+
+        Pass the session that was rejected as `stale`; if another thread has already replaced it,
+        the newer session is returned instead of warming up yet another one.
+        """
+        with self._lock:
+            if self._session is None or stale is None or self._session is stale:
+                self._replace()
+            return self._session
+
+    def _replace(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self.warm_up(session)  # Raises requests.RequestException on failure
+        # The old session is not closed: other threads may still be mid-download on it
+        self._session = session
+        self._created = time.monotonic()
+        self.refreshes += 1
+        print(f"✅ {self.exchange} session established.")
+
+
+class SessionPool:
+    """Per-exchange session registry."""
+
+    def __init__(self):
+        self._sessions = {
+            exchange: ExchangeSession(exchange, warm_up, EXCHANGE_SESSION_TTL[exchange])
+            for exchange, warm_up in WARM_UPS.items()
+        }
+
+    def get(self, exchange):
+        return self._sessions[exchange].get()
+
+    def refresh(self, exchange, stale=None):
+        return self._sessions[exchange].refresh(stale)
+
+    def stats(self):
+        return {
+            exchange: {"refreshes": entry.refreshes, "reuses": entry.reuses, "ttl": entry.ttl}
+            for exchange, entry in self._sessions.items()
+        }
+
+
+SESSION_POOL = SessionPool()
+
+
+def is_blocked(response):
+    """True when the exchange answered with a 403 or an Access Denied page instead of the file."""
+    return response.status_code == 403 or b"Access Denied" in response.content or b"403 Forbidden" in response.content
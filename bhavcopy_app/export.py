@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.mcxdownloader import MCX_FIELDS
+from bhavcopy_app.reload_script import BHAVCOPY_COLUMNS
+from config import EXPORT_CHUNK_ROWS
+
+# dataset -> (table, exported columns, date column, segment column, source column)
+DATASETS = {
+    "bhavcopy": ("BhavCopy", ["id", *BHAVCOPY_COLUMNS], "TradDt", "Sgmt", "Src"),
+    "mcx": ("bhav_mcx", ["id", *MCX_FIELDS], "date", None, None),
+}
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_query(dataset, start_date, end_date, segments=None, sources=None):
+    """SELECT and parameters for one export; segment/source filters only apply to BhavCopy."""
+    table, columns, date_column, sgmt_column, src_column = DATASETS[dataset]
+    where = [f"{date_column} BETWEEN %s AND %s"]
+    params = [start_date, end_date]
+    for column, values in ((sgmt_column, segments), (src_column, sources)):
+        if column and values:
+            where.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+    # Ordered by the date column, whose index serves the range in that order, so no sort holds back the first row
+    return (f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(where)} ORDER BY {date_column}",
+            params)
+
+
+def iter_row_chunks(query, params, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Yield lists of up to `chunk_size` row tuples while the query is still running.
+
+    mysql.connector cursors are unbuffered by default, so rows are read off the socket as they are
+    fetched and memory stays at one chunk however large the result is. The connection is held
+    until the generator is exhausted or closed, for as long as the client keeps reading, so it is a
+    dedicated one rather than one of the DB_POOL_SIZE pooled connections reloads and views share.
+    """
+    with connection(dedicated=True) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            if not conn.unread_result:
+                cursor.close()
+
+
+def csv_chunks(columns, row_chunks):
+    """Encode row chunks as CSV text, one string per chunk, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in row_chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(columns, row_chunks):
+    """Encode row chunks as newline-delimited JSON objects, one string per chunk."""
+    for rows in row_chunks:
+        yield "".join(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows)
+
+
+def export_chunks(dataset, fmt, start_date, end_date, segments=None, sources=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """Text chunks of a complete export in `fmt` ("csv" or "ndjson")."""
+    columns = DATASETS[dataset][1]
+    query, params = export_query(dataset, start_date, end_date, segments, sources)
+    encode = csv_chunks if fmt == "csv" else ndjson_chunks
+    return encode(columns, iter_row_chunks(query, params, chunk_size))
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
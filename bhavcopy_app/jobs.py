@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bhavcopy_app.async_downloads import async_downloads_enabled, download_loop, reload_data_for_date_async
+from bhavcopy_app.reload_script import reload_data_for_date, reload_data_for_date_mcx
+from config import RELOAD_WORKERS, RELOAD_JOB_HISTORY
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobConflict(Exception):
+    """A reload that cannot be merged into the job already running for the same cell."""
+
+
+class ReloadJob:
+    """A reload submitted to the worker pool, with the progress reported by the ingest code."""
+
+    def __init__(self, kind, date, sgmt, src, force=False):
+        self.id = uuid.uuid4().hex
+        self.kind = kind  # "bhavcopy" or "mcx"
+        self.date = date
+        self.sgmt = sgmt
+        self.src = src
+        self.force = force  # Read when the job starts, so a queued job can still be upgraded to a forced reload
+        self.status = QUEUED
+        self.stage = "queued"
+        self.rows_inserted = 0
+        self.errors = []
+        self.column_errors = {}  # Schema issues reported by clean_data, by column
+        self.changes = None  # Insert/update/delete summary when the reload was reconciled
+        self.stage_seconds = {}  # Time spent per ingest stage (see bhavcopy_app.metrics)
+        self.message = None
+        self.submitted_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def key(self):
+        return (self.kind, self.date, self.sgmt, self.src)
+
+    def progress(self, stage, rows_inserted=None, error=None):
+        """Progress callback handed to the reload functions."""
+        self.stage = stage
+        if rows_inserted is not None:
+            self.rows_inserted = rows_inserted
+        if error:
+            self.errors.append(error)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "date": self.date,
+            "sgmt": self.sgmt,
+            "src": self.src,
+            "force": self.force,
+            "status": self.status,
+            "stage": self.stage,
+            "rows_inserted": self.rows_inserted,
+            "errors": self.errors,
+            "column_errors": self.column_errors,
+            "changes": self.changes,
+            "stage_seconds": self.stage_seconds,
+            "message": self.message,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=RELOAD_WORKERS, thread_name_prefix="reload")
+_lock = threading.Lock()
+_jobs = OrderedDict()  # job id -> ReloadJob, oldest first
+_in_flight = {}  # (kind, date, sgmt, src) -> ReloadJob still queued or running
+
+
+def submit_reload(date, sgmt="CM", src="NSE", force=False, **options):
+    """
+    Queue an NSE/BSE reload; returns (job, created) where created is False for a collapsed duplicate.
+
+    A forced reload of a cell whose normal reload is still queued upgrades that job to a forced one;
+    if the normal reload is already running, JobConflict is raised.
+
+    With async downloads enabled (see bhavcopy_app.async_downloads) the job runs on the shared download
+    loop, so any number of jobs can wait on the exchange while RELOAD_WORKERS threads parse and insert.
+    """
+    job = ReloadJob("bhavcopy", date, sgmt, src, force)
+    if async_downloads_enabled():
+        return _submit(job, lambda job: reload_data_for_date_async(date, sgmt, src, progress=job.progress,
+                                                                   force=job.force, **options), use_loop=True)
+    return _submit(job, lambda job: reload_data_for_date(date, sgmt, src, progress=job.progress, force=job.force,
+                                                         **options))
+
+
+def submit_reload_mcx(date, **options):
+    """Queue an MCX reload; returns (job, created) where created is False for a collapsed duplicate."""
+    return _submit(ReloadJob("mcx", date, "MCX", "MCX"),
+                   lambda job: reload_data_for_date_mcx(date, progress=job.progress, **options))
+
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def _submit(job, run, use_loop=False):
+    """Register and start a job; `run(job)` returns the result dict, or a coroutine of it when `use_loop`."""
+    with _lock:
+        existing = _in_flight.get(job.key)
+        if existing:
+            if job.force and not existing.force:
+                if existing.status != QUEUED:
+                    raise JobConflict(f"A reload of {job.date} {job.sgmt}/{job.src} is already running without "
+                                      f"force; retry the forced reload once job {existing.id} has finished.")
+                existing.force = True
+            return existing, False
+        _in_flight[job.key] = job
+        _jobs[job.id] = job
+        _trim_history()
+    if use_loop:
+        asyncio.run_coroutine_threadsafe(_run_async(job, run), download_loop())
+    else:
+        _executor.submit(_run, job, run)
+    return job, True
+
+
+def _run(job, run):
+    _start(job)
+    try:
+        _record(job, run(job))
+    except Exception as e:
+        job.status = FAILED
+        job.errors.append(str(e))
+    finally:
+        _finish(job)
+
+
+async def _run_async(job, run):
+    _start(job)
+    try:
+        _record(job, await run(job))
+    except Exception as e:
+        job.status = FAILED
+        job.errors.append(str(e))
+    finally:
+        _finish(job)
+
+
+def _start(job):
+    with _lock:  # After this, _submit no longer upgrades the job to a forced reload
+        job.status = RUNNING
+        job.started_at = datetime.now()
+
+
+def _record(job, result):
+    """Copy a reload result dict onto the job."""
+    job.column_errors = result.get("column_errors", {})
+    job.changes = result.get("changes")
+    job.stage_seconds = result.get("stage_seconds", {})
+    if result.get("success"):
+        job.status = SUCCEEDED
+        job.message = result.get("message")
+        job.rows_inserted = result.get("rows_inserted", job.rows_inserted)
+        job.errors.extend(batch["error"] for batch in result.get("errors", []))
+        continuous_futures = result.get("continuous_futures") or {}
+        if not continuous_futures.get("success", True):
+            job.errors.append(continuous_futures["error"])
+    else:
+        job.status = FAILED
+        job.errors.append(result.get("error"))
+
+
+def _finish(job):
+    job.stage = "done"
+    job.finished_at = datetime.now()
+    with _lock:
+        _in_flight.pop(job.key, None)
+
+
+def _trim_history():
+    """Forget the oldest finished jobs beyond RELOAD_JOB_HISTORY. Caller holds _lock."""
+    finished = [job_id for job_id, job in _jobs.items() if job.status in (SUCCEEDED, FAILED)]
+    for job_id in finished[:max(0, len(_jobs) - RELOAD_JOB_HISTORY)]:
+        del _jobs[job_id]
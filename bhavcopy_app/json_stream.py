@@ -0,0 +1,93 @@
+import codecs
+import json
+import re
+
+WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class ArrayNotFound(Exception):
+    """The stream ended without the requested array; `saw_parent` tells whether its parent key was present."""
+
+    def __init__(self, key, saw_parent):
+        self.saw_parent = saw_parent
+        super().__init__(f"No '{key}' array found in the JSON stream.")
+
+
+def iter_array_items(chunks, key, parent=None, keep_tail=1024):
+    """
+    Yield the items of the JSON array stored under `key` while the document is still arriving.
+
+    `chunks` is an iterable of bytes (e.g. response.iter_content()). Only the item being decoded and
+    a small search window are held in memory, so peak memory does not grow with the array length.
+    `parent` names the object key the array is expected under; it is only used to tell a missing
+    array apart from a malformed document in ArrayNotFound. Items must be objects or arrays.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    array_start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    parent_start = re.compile(rf'"{re.escape(parent)}"\s*:') if parent else None
+    saw_parent = parent is None
+    buf = ""
+    pos = 0
+    in_array = False
+    chunks = iter(chunks)
+    eof = False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buf = buf[pos:] + decoder.decode(b"", final=True)
+        else:
+            buf = buf[pos:] + decoder.decode(chunk)
+        pos = 0
+
+    while True:
+        if not in_array:
+            if not saw_parent and parent_start.search(buf):
+                saw_parent = True
+            match = array_start.search(buf, pos)
+            if match:
+                in_array = True
+                pos = match.end()
+                continue
+            if eof:
+                raise ArrayNotFound(key, saw_parent)
+            pos = max(pos, len(buf) - keep_tail)  # Keep enough to match a key split across chunks
+            read_more()
+            continue
+
+        while pos < len(buf) and buf[pos] in WHITESPACE + ",":
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError(f"JSON stream ended inside the '{key}' array.")
+            read_more()
+            continue
+        if buf[pos] == "]":
+            # Drain the rest of the document so callers hashing or archiving the stream see all of it
+            for _ in chunks:
+                pass
+            return
+        try:
+            item, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()  # The item is split across chunks
+            continue
+        pos = end
+        yield item
+
+
+def batched(items, size):
+    """Group an iterable into lists of at most `size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,64 @@
+import hashlib
+
+# MCX days share the load_status table with NSE/BSE cells under this segment/source
+MCX_SGMT = "MCX"
+MCX_SRC = "MCX"
+
+BHAVCOPY_STATUS_UPSERT = """
+    INSERT INTO load_status (trade_date, sgmt, src, row_count, checksum, loaded_at)
+    SELECT %s, %s, %s, COUNT(*), %s, NOW()
+    FROM BhavCopy WHERE TradDt = %s AND Sgmt = %s AND Src = %s
+    ON DUPLICATE KEY UPDATE
+        row_count = VALUES(row_count),
+        checksum = VALUES(checksum),
+        loaded_at = VALUES(loaded_at)
+"""
+
+MCX_STATUS_UPSERT = """
+    INSERT INTO load_status (trade_date, sgmt, src, row_count, checksum, loaded_at)
+    SELECT %s, %s, %s, COUNT(*), %s, NOW()
+    FROM bhav_mcx WHERE date = %s
+    ON DUPLICATE KEY UPDATE
+        row_count = VALUES(row_count),
+        checksum = VALUES(checksum),
+        loaded_at = VALUES(loaded_at)
+"""
+
+
+def content_checksum(content):
+    """Return the sha256 hex digest of a downloaded file's bytes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def record_bhavcopy_load(conn, trade_date, sgmt, src, checksum=None):
+    """Refresh the load_status row for one NSE/BSE cell from the rows now stored in BhavCopy."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(BHAVCOPY_STATUS_UPSERT, (trade_date, sgmt, src, checksum, trade_date, sgmt, src))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def record_mcx_load(conn, trade_date, checksum=None):
+    """Refresh the load_status row for one MCX date from the rows now stored in bhav_mcx."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(MCX_STATUS_UPSERT, (trade_date, MCX_SGMT, MCX_SRC, checksum, trade_date))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def get_loaded_checksum(conn, trade_date, sgmt, src):
+    """Checksum of the file behind the last successful load of a cell, or None."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT checksum FROM load_status WHERE trade_date = %s AND sgmt = %s AND src = %s AND row_count > 0",
+            (trade_date, sgmt, src),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
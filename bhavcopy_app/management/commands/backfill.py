@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bhavcopy_app import models
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+from bhavcopy_app.management.utils import parse_date
+from bhavcopy_app.reload_script import reload_data_for_date, reload_data_for_date_mcx
+from config import BACKFILL_LIMITS, DATA_DIR
+
+
+class RateLimiter:
+    """Thread-safe limiter enforcing a minimum interval between request starts."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_start - now)
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if delay:
+            time.sleep(delay)
+
+
+class BackfillState:
+    """Resumable progress: cells that loaded or were not published are skipped on the next run."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = json.load(f).get("done", {})
+
+    def mark(self, cell_key, outcome):
+        with self._lock:
+            self.done[cell_key] = outcome
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"done": self.done}, f)
+            os.replace(tmp_path, self.path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reload a date range of BhavCopy and/or MCX data with concurrent downloads. Concurrency and "
+        "request spacing per exchange come from config.BACKFILL_LIMITS. Progress is saved to a state file "
+        "so an interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First date (YYYY-MM-DD).")
+        parser.add_argument("--end", required=True, help="Last date (YYYY-MM-DD).")
+        parser.add_argument("--sgmt", nargs="+", default=["CM", "FO", "CD"], help="Segments to load.")
+        parser.add_argument("--src", nargs="+", default=["NSE", "BSE"], help="Sources to load.")
+        parser.add_argument("--mcx", action="store_true", help="Also load MCX for each date.")
+        parser.add_argument("--mcx-only", action="store_true", help="Load only MCX.")
+        parser.add_argument("--include-weekends", action="store_true", help="Also try Saturdays and Sundays.")
+        parser.add_argument("--force", action="store_true",
+                            help="Reload cells already present in load_status or completed in the state file, "
+                                 "bypassing the raw file cache.")
+        parser.add_argument("--state-file", default=os.path.join(DATA_DIR, "backfill_state.json"),
+                            help="Where progress is kept between runs.")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+        unknown = set(options["src"]) - {"NSE", "BSE"}
+        if unknown:
+            raise CommandError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+
+        os.makedirs(os.path.dirname(options["state_file"]) or ".", exist_ok=True)
+        state = BackfillState(options["state_file"])
+        cells, skipped = self._plan(start, end, options, state)
+
+        summary = {"succeeded": [], "failed": [], "skipped": skipped}
+        limiters = {exchange: RateLimiter(limits["min_interval"]) for exchange, limits in BACKFILL_LIMITS.items()}
+        executors = {exchange: ThreadPoolExecutor(max_workers=limits["concurrency"], thread_name_prefix=f"backfill-{exchange}")
+                     for exchange, limits in BACKFILL_LIMITS.items()}
+        started = time.perf_counter()
+        self.stdout.write(f"Backfilling {len(cells)} cells ({len(skipped)} skipped)...")
+
+        try:
+            futures = {
+                executors[exchange].submit(self._load_cell, limiters[exchange], cell, options["force"]): (exchange, cell)
+                for exchange, cell in cells
+            }
+            for future in as_completed(futures):
+                exchange, cell = futures[future]
+                cell_key = "|".join(cell)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+
+                if result["success"]:
+                    state.mark(cell_key, "loaded")
+                    summary["succeeded"].append(cell_key)
+                    self.stdout.write(self.style.SUCCESS(f"✅ {cell_key}: {result.get('rows_inserted', 0)} rows"))
+                elif result.get("not_found"):
+                    state.mark(cell_key, "not published")
+                    summary["skipped"].append((cell_key, "not published"))
+                    self.stdout.write(f"⏭️ {cell_key}: not published")
+                else:
+                    summary["failed"].append((cell_key, result.get("error")))
+                    self.stdout.write(self.style.ERROR(f"❌ {cell_key}: {result.get('error')}"))
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        self._print_summary(summary, time.perf_counter() - started)
+        if summary["failed"]:
+            raise CommandError(f"{len(summary['failed'])} cells failed; rerun the same command to retry them.")
+
+    def _plan(self, start, end, options, state):
+        """Return ([(exchange, cell)], [(cell_key, reason)]) for the requested range."""
+        load_bhavcopy = not options["mcx_only"]
+        load_mcx = options["mcx"] or options["mcx_only"]
+
+        loaded = set()
+        if not options["force"]:
+            loaded = {
+                (row["trade_date"], row["sgmt"], row["src"])
+                for row in models.LoadStatus.objects.filter(trade_date__range=(start, end), row_count__gt=0)
+                .values("trade_date", "sgmt", "src")
+            }
+
+        cells, skipped = [], []
+        day = start
+        while day <= end:
+            candidates = []
+            if load_bhavcopy:
+                candidates += [(src, ("bhavcopy", day.isoformat(), sgmt, src), (day, sgmt, src))
+                               for sgmt in options["sgmt"] for src in options["src"]]
+            if load_mcx:
+                candidates.append(("MCX", ("mcx", day.isoformat(), MCX_SGMT, MCX_SRC), (day, MCX_SGMT, MCX_SRC)))
+
+            for exchange, cell, status_key in candidates:
+                cell_key = "|".join(cell)
+                if day.weekday() >= 5 and not options["include_weekends"]:
+                    skipped.append((cell_key, "weekend"))
+                elif not options["force"] and status_key in loaded:
+                    skipped.append((cell_key, "already loaded"))
+                elif not options["force"] and cell_key in state.done:
+                    skipped.append((cell_key, state.done[cell_key]))
+                else:
+                    cells.append((exchange, cell))
+            day += timedelta(days=1)
+        return cells, skipped
+
+    def _load_cell(self, limiter, cell, force):
+        kind, date, sgmt, src = cell
+        limiter.wait()
+        if kind == "mcx":
+            return reload_data_for_date_mcx(date)
+        return reload_data_for_date(date, sgmt, src, force=force)
+
+    def _print_summary(self, summary, elapsed):
+        reasons = {}
+        for _, reason in summary["skipped"]:
+            reasons[reason] = reasons.get(reason, 0) + 1
+        self.stdout.write("")
+        self.stdout.write(f"Backfill finished in {elapsed:.1f}s")
+        self.stdout.write(f"  Succeeded: {len(summary['succeeded'])}")
+        self.stdout.write(f"  Failed:    {len(summary['failed'])}")
+        self.stdout.write(f"  Skipped:   {len(summary['skipped'])} "
+                          f"({', '.join(f'{reason}: {count}' for reason, count in sorted(reasons.items())) or 'none'})")
+        for cell_key, error in summary["failed"]:
+            self.stdout.write(f"    {cell_key}: {error}")
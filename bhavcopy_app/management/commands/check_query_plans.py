@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+
+# name -> (SQL, builder of its parameters from the sample values picked by _samples())
+HOT_QUERIES = {
+    "coverage": (
+        "SELECT trade_date, sgmt, src, row_count FROM load_status "
+        "WHERE trade_date BETWEEN %s AND %s AND sgmt IN (%s, %s) AND src IN (%s, %s) AND row_count > 0 "
+        "ORDER BY trade_date, sgmt, src",
+        lambda s: [s["start"], s["end"], "CM", "FO", "NSE", "BSE"],
+    ),
+    "coverage_mcx": (
+        "SELECT trade_date, row_count FROM load_status "
+        "WHERE trade_date BETWEEN %s AND %s AND sgmt = %s AND src = %s AND row_count > 0 ORDER BY trade_date",
+        lambda s: [s["start"], s["end"], MCX_SGMT, MCX_SRC],
+    ),
+    "bhavcopy_day": (
+        "SELECT id FROM BhavCopy WHERE TradDt = %s AND Sgmt = %s AND Src = %s",
+        lambda s: [s["end"], "CM", "NSE"],
+    ),
+    "bhavcopy_range_counts": (
+        "SELECT TradDt, Sgmt, Src, COUNT(*) FROM BhavCopy "
+        "WHERE TradDt BETWEEN %s AND %s AND Sgmt IN (%s, %s) AND Src IN (%s, %s) GROUP BY TradDt, Sgmt, Src",
+        lambda s: [s["start"], s["end"], "CM", "FO", "NSE", "BSE"],
+    ),
+    "bhavcopy_symbol_history": (
+        "SELECT TradDt, OpnPric, HghPric, LwPric, ClsPric, TtlTradgVol FROM BhavCopy "
+        "WHERE TckrSymb = %s AND TradDt BETWEEN %s AND %s",
+        lambda s: [s["symbol"], s["start"], s["end"]],
+    ),
+    "bhavcopy_instrument_history": (
+        "SELECT TradDt, ClsPric FROM BhavCopy WHERE FinInstrmId = %s AND TradDt BETWEEN %s AND %s",
+        lambda s: [s["instrument"], s["start"], s["end"]],
+    ),
+    "bhavcopy_expiry": (
+        "SELECT StrkPric, OptnTp, OpnIntrst FROM BhavCopy WHERE TckrSymb = %s AND XpryDt = %s AND TradDt = %s",
+        lambda s: [s["symbol"], s["expiry"], s["end"]],
+    ),
+    "mcx_day": (
+        "SELECT 1 FROM bhav_mcx WHERE date = %s LIMIT 1",
+        lambda s: [s["end"]],
+    ),
+    "mcx_symbol_history": (
+        "SELECT date, close_price, open_interest FROM bhav_mcx WHERE symbol = %s AND date BETWEEN %s AND %s",
+        lambda s: [s["mcx_symbol"], s["start"], s["end"]],
+    ),
+    "mcx_expiry": (
+        "SELECT strike_price, option_type, open_interest FROM bhav_mcx "
+        "WHERE symbol = %s AND expiry_date = %s AND date = %s",
+        lambda s: [s["mcx_symbol"], s["mcx_expiry"], s["end"]],
+    ),
+}
+
+# EXPLAIN access types that read the whole table or a whole index
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot queries (dashboard coverage, per-day reload, per-symbol history, per-expiry "
+        "lookups) and fail when any of them falls back to a full table or index scan. Sample values are "
+        "taken from the latest loaded day; plans are only meaningful on a populated database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--query", action="append", choices=list(HOT_QUERIES),
+                            help="Check only this query (repeatable).")
+        parser.add_argument("--days", type=int, default=30, help="Width of the date ranges explained.")
+
+    def handle(self, *args, **options):
+        samples = self._samples(options["days"])
+        names = options["query"] or list(HOT_QUERIES)
+        failures = []
+
+        for name in names:
+            sql, params = HOT_QUERIES[name]
+            plan = self._explain(sql, params(samples))
+            scans = [row for row in plan if row.get("type") in FULL_SCAN_TYPES]
+            status = self.style.ERROR("FULL SCAN") if scans else self.style.SUCCESS("ok")
+            self.stdout.write(f"{name}: {status}")
+            for row in plan:
+                self.stdout.write(
+                    f"    {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                    f"rows={row.get('rows')} partitions={row.get('partitions')} extra={row.get('Extra')}"
+                )
+            if scans:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Full scans in: {', '.join(failures)}. Apply SQL/migrations/004_query_indexes.sql.")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(names)} query plans use indexes."))
+
+    def _explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _samples(self, days):
+        """Realistic parameter values: the latest loaded day and a symbol/expiry traded on it."""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT MAX(trade_date) FROM load_status WHERE row_count > 0")
+            end = cursor.fetchone()[0] or date.today()
+            cursor.execute(
+                "SELECT TckrSymb, FinInstrmId, XpryDt FROM BhavCopy WHERE TradDt = %s AND XpryDt IS NOT NULL LIMIT 1",
+                [end],
+            )
+            symbol, instrument, expiry = cursor.fetchone() or ("NIFTY", 0, end)
+            cursor.execute("SELECT symbol, expiry_date FROM bhav_mcx WHERE date = %s LIMIT 1", [end])
+            mcx_symbol, mcx_expiry = cursor.fetchone() or ("GOLD", end)
+        return {
+            "start": end - timedelta(days=days),
+            "end": end,
+            "symbol": symbol,
+            "instrument": instrument,
+            "expiry": expiry,
+            "mcx_symbol": mcx_symbol,
+            "mcx_expiry": mcx_expiry,
+        }
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from bhavcopy_app.management.utils import parse_date
+
+NATURAL_KEY = ["TradDt", "Sgmt", "Src", "FinInstrmId", "SsnId"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove duplicate BhavCopy rows (same TradDt/Sgmt/Src/FinInstrmId/SsnId), keeping the most "
+        "recently inserted copy. Works one trade date at a time in bounded chunks so it can run on a live table. "
+        "Run this before applying SQL/migrations/001_bhavcopy_natural_key.sql."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First trade date to process (YYYY-MM-DD). Default: earliest date.")
+        parser.add_argument("--end", help="Last trade date to process (YYYY-MM-DD). Default: latest date.")
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Maximum rows deleted per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count duplicates, do not delete.")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        chunk_size = options["chunk_size"]
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be positive.")
+
+        key_join = " AND ".join(f"b.{column} = k.{column}" for column in NATURAL_KEY)
+        key_list = ", ".join(NATURAL_KEY)
+        duplicate_ids_sql = f"""
+            SELECT b.id FROM BhavCopy b
+            JOIN (
+                SELECT {key_list}, MAX(id) AS keep_id
+                FROM BhavCopy WHERE TradDt = %s
+                GROUP BY {key_list} HAVING COUNT(*) > 1
+            ) k ON {key_join} AND b.id < k.keep_id
+            WHERE b.TradDt = %s
+            LIMIT %s
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM BhavCopy WHERE TradDt IS NULL")
+            null_dates = cursor.fetchone()[0]
+            if null_dates:
+                self.stderr.write(f"⚠️ {null_dates} rows have no TradDt; delete or fix them before adding the natural key.")
+
+            filters, params = ["TradDt IS NOT NULL"], []
+            if start:
+                filters.append("TradDt >= %s")
+                params.append(start)
+            if end:
+                filters.append("TradDt <= %s")
+                params.append(end)
+            cursor.execute(f"SELECT DISTINCT TradDt FROM BhavCopy WHERE {' AND '.join(filters)} ORDER BY TradDt", params)
+            trade_dates = [row[0] for row in cursor.fetchall()]
+
+        total_deleted = 0
+        for trade_date in trade_dates:
+            deleted_for_date = 0
+            while True:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(duplicate_ids_sql, [trade_date, trade_date, chunk_size])
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if not ids or options["dry_run"]:
+                        deleted_for_date += len(ids)
+                        break
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    cursor.execute(f"DELETE FROM BhavCopy WHERE id IN ({placeholders})", ids)
+                    deleted_for_date += len(ids)
+                if len(ids) < chunk_size:
+                    break
+            if deleted_for_date:
+                verb = "Found" if options["dry_run"] else "Deleted"
+                more = "+" if options["dry_run"] and deleted_for_date == chunk_size else ""
+                self.stdout.write(f"{trade_date}: {verb} {deleted_for_date}{more} duplicate rows")
+            total_deleted += deleted_for_date
+
+        verb = "would be deleted" if options["dry_run"] else "deleted"
+        self.stdout.write(self.style.SUCCESS(f"✅ {total_deleted} duplicate rows {verb} across {len(trade_dates)} trade dates."))
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bhavcopy_app.export import DATASETS, FORMATS, export_chunks
+from bhavcopy_app.management.utils import parse_date
+from config import EXPORT_CHUNK_ROWS
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream stored BhavCopy or MCX rows for a date range to a CSV or NDJSON file (or stdout). "
+        "Memory use stays at one chunk of rows regardless of the range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", choices=list(DATASETS), default="bhavcopy")
+        parser.add_argument("--format", choices=list(FORMATS), default="csv")
+        parser.add_argument("--start", required=True, help="First trade date (YYYY-MM-DD).")
+        parser.add_argument("--end", required=True, help="Last trade date (YYYY-MM-DD).")
+        parser.add_argument("--sgmt", action="append", help="Segment to include (repeatable, BhavCopy only).")
+        parser.add_argument("--src", action="append", help="Source to include (repeatable, BhavCopy only).")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_ROWS, help="Rows fetched per round trip.")
+        parser.add_argument("--output", help="File to write. Default: stdout.")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+
+        chunks = export_chunks(options["dataset"], options["format"], start, end,
+                               options["sgmt"], options["src"], options["chunk_size"])
+        out = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else sys.stdout
+        written = 0
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            chunks.close()
+            if out is not sys.stdout:
+                out.close()
+
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"✅ Exported {options['dataset']} {start} to {end} "
+                                                 f"({written:,} characters) to {options['output']}."))
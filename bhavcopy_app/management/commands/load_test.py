@@ -0,0 +1,75 @@
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and latency of a running server, e.g. the same endpoints served through "
+        "wsgi.py (gunicorn) and asgi.py (uvicorn). Each client thread keeps one keep-alive connection "
+        "and cycles through the given URLs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", required=True,
+                            help="URL to request (repeatable; requests are spread across them in turn).")
+        parser.add_argument("--concurrency", type=int, default=32, help="Client threads sending requests at once.")
+        parser.add_argument("--requests", type=int, default=2000, help="Measured requests in total.")
+        parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests sent first.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be positive.")
+        urls, timeout = options["url"], options["timeout"]
+
+        self._run(urls, options["concurrency"], options["warmup"], timeout)
+        started = time.perf_counter()
+        results = self._run(urls, options["concurrency"], options["requests"], timeout)
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _, _ in results if latency is not None)
+        statuses = Counter(status for _, status, _ in results)
+        cache = Counter(cache for _, _, cache in results if cache)
+        if not latencies:
+            raise CommandError(f"No request succeeded: {dict(statuses)}")
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+        self.stdout.write(f"{len(results)} requests, {options['concurrency']} concurrent, in {elapsed:.2f}s")
+        self.stdout.write(f"  Throughput: {len(results) / elapsed:.1f} req/s")
+        self.stdout.write(f"  Latency ms: mean {statistics.fmean(latencies) * 1000:.1f}, p50 {percentile(0.5):.1f}, "
+                          f"p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, max {latencies[-1] * 1000:.1f}")
+        self.stdout.write(f"  Status: {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))}")
+        if cache:
+            self.stdout.write(f"  X-Cache: {', '.join(f'{value}: {count}' for value, count in sorted(cache.items()))}")
+
+    def _run(self, urls, concurrency, total, timeout):
+        """Send `total` requests from `concurrency` threads; returns [(seconds or None, status, X-Cache)]."""
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def client():
+            session = requests.Session()
+            results = []
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return results
+                started = time.perf_counter()
+                try:
+                    response = session.get(urls[index % len(urls)], timeout=timeout)
+                    results.append((time.perf_counter() - started, response.status_code, response.headers.get("X-Cache")))
+                except requests.RequestException as e:
+                    results.append((None, type(e).__name__, None))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(client) for _ in range(concurrency)]
+            return [result for future in futures for result in future.result()]
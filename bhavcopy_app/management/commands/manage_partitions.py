@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bhavcopy_app.caching import invalidate_range
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+from bhavcopy_app.management.utils import parse_date
+from config import PARTITION_MONTHS_AHEAD, PARTITION_RETENTION_MONTHS
+
+# target -> (table, load_status rows describing it)
+TABLES = {
+    "bhavcopy": ("BhavCopy", "src <> %s", [MCX_SRC]),
+    "mcx": ("bhav_mcx", "sgmt = %s AND src = %s", [MCX_SGMT, MCX_SRC]),
+}
+# Tables derived from the retired rows, keyed by trade_date / sgmt / src like load_status
+DERIVED_TABLES = ["daily_market_summary", "daily_top_movers"]
+CATCH_ALL = "p_future"
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the monthly partitions of BhavCopy and bhav_mcx (SQL/migrations/003_partition_by_month.sql): "
+        "split months off p_future ahead of time and, with a retention period, drop or archive old months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=list(TABLES), help="Maintain only one of the two tables.")
+        parser.add_argument("--ahead", type=int, default=PARTITION_MONTHS_AHEAD,
+                            help="Months after the current one that must have their own partition.")
+        parser.add_argument("--retain-months", type=int, default=PARTITION_RETENTION_MONTHS,
+                            help="Retire partitions wholly older than this many months. Default: keep everything.")
+        parser.add_argument("--archive", action="store_true",
+                            help="Move retired partitions into <table>_archive_<partition> tables instead of dropping them.")
+        parser.add_argument("--today", help="Reference date (YYYY-MM-DD) instead of today.")
+        parser.add_argument("--list", action="store_true", help="Only show the current partitions.")
+        parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them.")
+
+    def handle(self, *args, **options):
+        today = parse_date(options["today"]) or date.today()
+        targets = [options["only"]] if options["only"] else list(TABLES)
+
+        for target in targets:
+            table, status_filter, status_params = TABLES[target]
+            partitions = self._partitions(table)
+            if not partitions:
+                raise CommandError(f"{table} is not partitioned; apply SQL/migrations/003_partition_by_month.sql first.")
+            if options["list"]:
+                for name, bound, rows in partitions:
+                    self.stdout.write(f"{table}.{name}: < {bound or 'MAXVALUE'} (~{rows} rows)")
+                continue
+
+            self._extend(table, partitions, self._add_months(self._month_start(today), options["ahead"] + 1),
+                         options["dry_run"])
+            if options["retain_months"] is not None:
+                cutoff = self._add_months(self._month_start(today), -options["retain_months"])
+                self._retire(target, partitions, cutoff, options["archive"], options["dry_run"])
+
+        self.stdout.write(self.style.SUCCESS("✅ Partitions up to date."))
+
+    def _partitions(self, table):
+        """[(name, upper bound date or None for MAXVALUE, approximate rows)] in partition order."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+                FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = LOWER(%s) AND PARTITION_NAME IS NOT NULL
+                ORDER BY PARTITION_ORDINAL_POSITION
+                """,
+                [table],
+            )
+            rows = cursor.fetchall()
+        return [(name, None if description == "MAXVALUE" else parse_date(description.strip("'")), count)
+                for name, description, count in rows]
+
+    def _extend(self, table, partitions, until, dry_run):
+        """Split monthly partitions off the catch-all partition so that every month before `until` has its own."""
+        if partitions[-1][0] != CATCH_ALL or partitions[-1][1] is not None:
+            raise CommandError(f"{table} must end with a '{CATCH_ALL}' MAXVALUE partition.")
+        start = max((bound for _, bound, _ in partitions[:-1]), default=None)
+        if start is None:
+            raise CommandError(f"{table} has no bounded partition to extend from.")
+
+        new = []
+        while start < until:
+            end = self._add_months(start, 1)
+            new.append(f"PARTITION p{start:%Y%m} VALUES LESS THAN ('{end.isoformat()}')")
+            start = end
+        if not new:
+            self.stdout.write(f"{table}: partitions already reach {until}.")
+            return
+
+        new.append(f"PARTITION {CATCH_ALL} VALUES LESS THAN (MAXVALUE)")
+        self._run(f"ALTER TABLE {table} REORGANIZE PARTITION {CATCH_ALL} INTO (\n  " + ",\n  ".join(new) + "\n)",
+                  dry_run)
+        self.stdout.write(f"{table}: added {len(new) - 1} monthly partitions up to {until}.")
+
+    def _retire(self, target, partitions, cutoff, archive, dry_run):
+        """
+        Drop (or exchange into archive tables) every partition whose rows all predate `cutoff`.
+
+        The load_status, aggregate and continuous futures rows of the retired days are deleted (the
+        derived rows can be rebuilt from an archive), and cached responses covering them are invalidated.
+        """
+        table, status_filter, status_params = TABLES[target]
+        retired = [(name, bound) for name, bound, _ in partitions if bound is not None and bound <= cutoff]
+        if not retired:
+            self.stdout.write(f"{table}: nothing older than {cutoff} to retire.")
+            return
+
+        for name, bound in retired:
+            if archive:
+                archive_table = f"{table.lower()}_archive_{name}"
+                self._run(f"CREATE TABLE {archive_table} LIKE {table}", dry_run)
+                self._run(f"ALTER TABLE {archive_table} REMOVE PARTITIONING", dry_run)
+                self._run(f"ALTER TABLE {table} EXCHANGE PARTITION {name} WITH TABLE {archive_table}", dry_run)
+            self._run(f"ALTER TABLE {table} DROP PARTITION {name}", dry_run)
+            self.stdout.write(f"{table}: {'archived' if archive else 'dropped'} {name} (< {bound}).")
+
+        # The dashboard must not report the retired days as loaded any more, nor serve figures derived from them
+        before = retired[-1][1]
+        for status_table in ["load_status", *DERIVED_TABLES]:
+            self._run(f"DELETE FROM {status_table} WHERE trade_date < %s AND {status_filter}", dry_run,
+                      [before, *status_params])
+        self._run("DELETE FROM continuous_futures WHERE trade_date < %s AND dataset = %s", dry_run, [before, target])
+        if not dry_run:
+            # Only this process's caches; other web processes drop theirs within the cache TTLs
+            invalidate_range(target, date.min, before - timedelta(days=1))
+
+    def _run(self, sql, dry_run, params=None):
+        if dry_run:
+            self.stdout.write(f"[dry-run] {sql};" + (f"  -- {params}" if params else ""))
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def _month_start(self, day):
+        return day.replace(day=1)
+
+    def _add_months(self, day, months):
+        """First day of the month `months` after the month of `day`."""
+        index = day.year * 12 + day.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
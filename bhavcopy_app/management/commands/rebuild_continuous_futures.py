@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection as django_connection
+
+from bhavcopy_app.continuous_futures import SeriesLockTimeout, parse_rule, replay, series_lock
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.management.utils import parse_date
+from config import CONTINUOUS_FUTURES_RULES, CONTINUOUS_FUTURES_SEGMENTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the continuous futures series from a date onwards, for every loaded day after it. "
+        "Adjustments carry on from the state stored before --start, so earlier history is kept as is."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First trade date to recompute (YYYY-MM-DD).")
+        parser.add_argument("--sgmt", action="append", choices=CONTINUOUS_FUTURES_SEGMENTS,
+                            help="Segment to rebuild (repeatable). Default: all tracked segments.")
+        parser.add_argument("--rule", action="append", help="Roll rule to rebuild (repeatable). Default: config.")
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"])
+        rules = options["rule"] or CONTINUOUS_FUTURES_RULES
+        try:
+            for rule in rules:
+                parse_rule(rule)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        segments = options["sgmt"] or CONTINUOUS_FUTURES_SEGMENTS
+        with django_connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT DISTINCT sgmt, src FROM load_status WHERE sgmt IN ({', '.join(['%s'] * len(segments))}) "
+                f"AND trade_date >= %s AND row_count > 0 ORDER BY sgmt, src",
+                [*segments, start],
+            )
+            cells = cursor.fetchall()
+
+        for sgmt, src in cells:
+            with django_connection.cursor() as cursor:
+                cursor.execute("SELECT trade_date FROM load_status WHERE sgmt = %s AND src = %s AND trade_date >= %s "
+                               "AND row_count > 0 ORDER BY trade_date", [sgmt, src, start])
+                days = [row[0] for row in cursor.fetchall()]
+            with connection() as conn:
+                try:
+                    with series_lock(conn, sgmt, src):
+                        written = replay(conn, sgmt, src, days, rules)
+                        conn.commit()
+                except SeriesLockTimeout as e:
+                    raise CommandError(str(e))
+            self.stdout.write(f"{sgmt}/{src}: {len(days)} days, {written} rows")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Continuous futures rebuilt from {start}."))
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection as django_connection
+
+from bhavcopy_app.daily_aggregates import AGGREGATE_COLUMNS, compute_daily_aggregates, store_daily_aggregates
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.load_status import MCX_SRC
+from bhavcopy_app.management.utils import parse_date
+from config import DAILY_AGGREGATE_WORKERS, DAILY_TOP_MOVERS, DB_POOL_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily_market_summary and daily_top_movers from the stored BhavCopy rows for a date range. "
+        "Each (date, segment, source) is read, aggregated and written in its own transaction, several at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First trade date (YYYY-MM-DD).")
+        parser.add_argument("--end", required=True, help="Last trade date (YYYY-MM-DD).")
+        parser.add_argument("--sgmt", action="append", help="Segment to rebuild (repeatable). Default: all.")
+        parser.add_argument("--src", action="append", help="Source to rebuild (repeatable). Default: all.")
+        parser.add_argument("--workers", type=int, default=DAILY_AGGREGATE_WORKERS,
+                            help=f"Cells processed at once (at most the pool size, {DB_POOL_SIZE}).")
+        parser.add_argument("--top", type=int, default=DAILY_TOP_MOVERS, help="Movers kept per category.")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+
+        cells = self._cells(start, end, options["sgmt"], options["src"])
+        if not cells:
+            self.stdout.write("No loaded BhavCopy days in range, nothing to rebuild.")
+            return
+
+        workers = max(1, min(options["workers"], DB_POOL_SIZE))
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._rebuild_cell, *cell, options["top"]): cell for cell in cells}
+            for future in as_completed(futures):
+                trade_date, sgmt, src = futures[future]
+                try:
+                    rows = future.result()
+                    self.stdout.write(f"{trade_date} {sgmt}/{src}: aggregated {rows} rows")
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"❌ {trade_date} {sgmt}/{src}: {e}")
+
+        if failed:
+            raise CommandError(f"{failed} of {len(cells)} cells failed.")
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt daily aggregates for {len(cells)} cells."))
+
+    def _cells(self, start, end, segments, sources):
+        """Loaded (date, segment, source) cells in range, from load_status."""
+        query = "SELECT trade_date, sgmt, src FROM load_status WHERE trade_date BETWEEN %s AND %s AND src <> %s AND row_count > 0"
+        params = [start, end, MCX_SRC]
+        for column, values in (("sgmt", segments), ("src", sources)):
+            if values:
+                query += f" AND {column} IN ({', '.join(['%s'] * len(values))})"
+                params.extend(values)
+        with django_connection.cursor() as cursor:
+            cursor.execute(query + " ORDER BY trade_date, sgmt, src", params)
+            return cursor.fetchall()
+
+    def _rebuild_cell(self, trade_date, sgmt, src, top_n):
+        with connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT {', '.join(AGGREGATE_COLUMNS)} FROM BhavCopy WHERE TradDt = %s AND Sgmt = %s AND Src = %s",
+                               (trade_date, sgmt, src))
+                df = pd.DataFrame(cursor.fetchall(), columns=AGGREGATE_COLUMNS)
+            finally:
+                cursor.close()
+            summary, movers = compute_daily_aggregates(df, top_n)
+            store_daily_aggregates(conn, trade_date, sgmt, src, summary, movers)
+            conn.commit()
+        return len(df)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+from bhavcopy_app.management.utils import parse_date
+
+# Checksums are left untouched: they describe a downloaded file, which a rebuild does not see.
+BHAVCOPY_REBUILD_SQL = """
+    INSERT INTO load_status (trade_date, sgmt, src, row_count, loaded_at)
+    SELECT TradDt, Sgmt, Src, COUNT(*), MAX(updated_at)
+    FROM BhavCopy WHERE TradDt BETWEEN %s AND %s
+    GROUP BY TradDt, Sgmt, Src
+    ON DUPLICATE KEY UPDATE row_count = VALUES(row_count), loaded_at = VALUES(loaded_at)
+"""
+
+MCX_REBUILD_SQL = """
+    INSERT INTO load_status (trade_date, sgmt, src, row_count, loaded_at)
+    SELECT date, %s, %s, COUNT(*), MAX(updated_at)
+    FROM bhav_mcx WHERE date BETWEEN %s AND %s
+    GROUP BY date
+    ON DUPLICATE KEY UPDATE row_count = VALUES(row_count), loaded_at = VALUES(loaded_at)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill or repair the load_status summary table from BhavCopy and bhav_mcx. "
+        "Works one calendar month per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD). Default: earliest stored date.")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD). Default: latest stored date.")
+        parser.add_argument("--only", choices=["bhavcopy", "mcx"], help="Rebuild only one of the two sources.")
+
+    def handle(self, *args, **options):
+        targets = [options["only"]] if options["only"] else ["bhavcopy", "mcx"]
+        for target in targets:
+            table, column = ("BhavCopy", "TradDt") if target == "bhavcopy" else ("bhav_mcx", "date")
+            start, end = self._resolve_range(table, column, options["start"], options["end"])
+            if not start:
+                self.stdout.write(f"{table}: no rows, nothing to rebuild.")
+                continue
+
+            for chunk_start, chunk_end in self._months(start, end):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    # Cells whose rows have since disappeared drop back to zero
+                    if target == "bhavcopy":
+                        cursor.execute(
+                            "UPDATE load_status SET row_count = 0 WHERE trade_date BETWEEN %s AND %s AND src <> %s",
+                            [chunk_start, chunk_end, MCX_SRC],
+                        )
+                        cursor.execute(BHAVCOPY_REBUILD_SQL, [chunk_start, chunk_end])
+                    else:
+                        cursor.execute(
+                            "UPDATE load_status SET row_count = 0 WHERE trade_date BETWEEN %s AND %s AND sgmt = %s AND src = %s",
+                            [chunk_start, chunk_end, MCX_SGMT, MCX_SRC],
+                        )
+                        cursor.execute(MCX_REBUILD_SQL, [MCX_SGMT, MCX_SRC, chunk_start, chunk_end])
+                self.stdout.write(f"{table}: rebuilt {chunk_start} to {chunk_end}")
+
+        self.stdout.write(self.style.SUCCESS("✅ load_status rebuilt."))
+
+    def _resolve_range(self, table, column, start, end):
+        start, end = parse_date(start), parse_date(end)
+        if not start or not end:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+                first, last = cursor.fetchone()
+            start, end = start or first, end or last
+        if start and end and start > end:
+            raise CommandError("--start must not be after --end.")
+        return start, end
+
+    def _months(self, start, end):
+        """Yield (first, last) date pairs covering [start, end] one calendar month at a time."""
+        chunk_start = start
+        while chunk_start <= end:
+            next_month = (chunk_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            chunk_end = min(end, next_month - timedelta(days=1))
+            yield chunk_start, chunk_end
+            chunk_start = next_month
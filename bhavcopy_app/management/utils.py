@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from django.core.management.base import CommandError
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD command option; an unset option stays None."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
@@ -1,157 +1,302 @@
 import requests
+import contextlib
+import hashlib
+import itertools
 import json
 import time
 import mysql.connector
+import pandas as pd
 from datetime import datetime
-import gc  # Import garbage collector
-from config import DB_CONFIG, BASE_URLS
+from config import INGEST_RECONCILE, MCX_ARCHIVE_RESPONSES, MCX_INSERT_BATCH_SIZE, MCX_STREAM_CHUNK_BYTES
+from bhavcopy_app.bulk_loader import dataframe_to_rows
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.exchange_sessions import SESSION_POOL, MCX_USER_AGENT, is_blocked
+from bhavcopy_app.json_stream import ArrayNotFound, batched, iter_array_items
+from bhavcopy_app.load_status import MCX_SGMT, record_mcx_load
+from bhavcopy_app.metrics import REGISTRY, stage_timer
+from bhavcopy_app.raw_cache import RAW_CACHE
+from bhavcopy_app.reconcile import reconcile_mcx
 
-def get_bhavcopy_data(date, instrument_name="ALL"):
+def get_bhavcopy_data(date, instrument_name="ALL", progress=None):
     """
-    Fetches MCX BhavCopy data via POST request, extracts JSON data, and inserts it into MySQL.
-    """
-    session = requests.Session()
-    homepage_url = "https://www.mcxindia.com/market-data/bhavcopy"
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Referer": "https://www.mcxindia.com/",
-        "sec-fetch-site": "same-origin",
-        "sec-fetch-mode": "navigate",
-        "sec-fetch-user": "?1",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+    Fetches MCX BhavCopy data via POST request, streams the records out of the JSON response and inserts them into MySQL.
 
-    try:
-        print("🔄 Fetching homepage to get session cookies...")
-        response = session.get(homepage_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        time.sleep(2)
+    Returns a result dict with "success" and either "rows_inserted" plus the reject report
+    (see insert_into_db) or "error".
+    `progress(stage, rows_inserted=None, error=None)` is called as the reload moves through its stages.
+    Stage timings (cookies, download up to the first batch, streamed parse and insert) and bytes
+    received go to bhavcopy_app.metrics; the result carries the timings as "stage_seconds".
+    """
+    timer, owned = stage_timer("MCX", MCX_SGMT, progress)
+    result = _get_bhavcopy_data(date, instrument_name, timer)
+    return timer.finish(result) if owned else result
 
-        cookies = session.cookies.get_dict()
-        cookie_string = "; ".join([f"{key}={value}" for key, value in cookies.items()])
-        print(f"✅ Cookies Obtained: {cookie_string}")
 
+def _get_bhavcopy_data(date, instrument_name, progress):
+    """get_bhavcopy_data without the reload-level metrics; `progress` is its StageTimer."""
+    try:
+        progress("cookies")
+        session = SESSION_POOL.get("MCX")  # Shared session, cookies refreshed on TTL expiry
     except requests.exceptions.RequestException as e:
         print(f"❌ Error fetching cookies: {e}")
-        return
+        return {"success": False, "error": f"Error fetching MCX cookies: {e}"}
 
     url = "https://www.mcxindia.com/backpage.aspx/GetDateWiseBhavCopy"
     post_headers = {
         "Accept": "application/json, text/javascript, */*; q=0.01",
         "Content-Type": "application/json",
         "X-Requested-With": "XMLHttpRequest",
-        "Cookie": cookie_string,  # Pass cookies
         "Referer": "https://www.mcxindia.com/market-data/bhavcopy",
-        "User-Agent": headers["User-Agent"],
+        "User-Agent": MCX_USER_AGENT,
     }
 
     payload = json.dumps({"Date": date, "InstrumentName": instrument_name})
 
     try:
+        progress("download")
         print(f"📡 Sending POST request for BhavCopy: Date={date}, Instrument={instrument_name}")
-        response = session.post(url, headers=post_headers, data=payload, timeout=10)
+        response = post_bhavcopy_request(session, url, post_headers, payload)
+        if response_blocked(response):
+            print("🚫 MCX rejected the session. Retrying with fresh cookies...")
+            session = SESSION_POOL.refresh("MCX", stale=session)
+            response = post_bhavcopy_request(session, url, post_headers, payload)
         response.raise_for_status()
-        response_json = response.json()
 
-        with open("mcx_response.json", "w", encoding="utf-8") as f:
-            json.dump(response_json, f, indent=4)
+        # d.Data is parsed record by record as the body arrives and inserted in batches, so the
+        # payload is never held in memory whole; the raw body is optionally archived on the way
+        hasher = hashlib.sha256()
+        archive = RAW_CACHE.writer("MCX", instrument_name, date) if MCX_ARCHIVE_RESPONSES else contextlib.nullcontext()
+        with archive, response:
+            def body_chunks():
+                for chunk in response.iter_content(chunk_size=MCX_STREAM_CHUNK_BYTES):
+                    hasher.update(chunk)
+                    progress.count("bhavcopy_ingest_bytes_total", len(chunk), source="download")
+                    if MCX_ARCHIVE_RESPONSES:
+                        archive.write(chunk)
+                    yield chunk
 
-        print("🔍 Response JSON saved to mcx_response.json.")
-
-        if isinstance(response_json, dict) and "d" in response_json:
-            data_json = response_json["d"]  # ✅ FIX: Do NOT parse again with json.loads()
-
-            if "Data" in data_json and isinstance(data_json["Data"], list):
-                print(f"✅ {len(data_json['Data'])} records found. Inserting into database...")
-                insert_into_db(data_json["Data"])
-            else:
+            records = iter_array_items(body_chunks(), "Data", parent="d")
+            first_chunk = next(batched(records, MCX_INSERT_BATCH_SIZE), None)
+            if first_chunk is None:
                 print("⚠️ No data found in JSON response.")
+                return {"success": False, "not_found": True, "error": f"No MCX data found for {date}."}
 
-        else:
-            print("⚠️ Expected key 'd' not found in response.")
+            progress("insert")
+            trade_date = datetime.strptime(date, "%Y%m%d").date()
+            chunks = itertools.chain([first_chunk], batched(records, MCX_INSERT_BATCH_SIZE))
+            stats = insert_chunks(chunks, trade_date, checksum=hasher.hexdigest, progress=progress)
+        progress("insert", rows_inserted=stats["rows_inserted"])
+        return stats
 
+    except ArrayNotFound as e:
+        if e.saw_parent:
+            print("⚠️ No data found in JSON response.")
+            return {"success": False, "not_found": True, "error": f"No MCX data found for {date}."}
+        print("⚠️ Expected key 'd' not found in response.")
+        return {"success": False, "error": "Expected key 'd' not found in MCX response."}
     except requests.exceptions.RequestException as e:
         print(f"❌ Error during request: {e}")
-    except json.JSONDecodeError as e:
+        return {"success": False, "error": f"Error during MCX request: {e}"}
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
         print(f"❌ Error decoding JSON: {e}")
+        return {"success": False, "error": f"Error decoding MCX JSON: {e}"}
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def post_bhavcopy_request(session, url, headers, payload):
+    """POST the BhavCopy query without reading the body, so it can be streamed."""
+    return session.post(url, headers=headers, data=payload, timeout=10, stream=True)
+
+
+def response_blocked(response):
+    """is_blocked() for a streamed response; only a non-JSON reply (the access-denied page) is read in full."""
+    if response.status_code == 403:
+        return True
+    if "json" in response.headers.get("Content-Type", ""):
+        return False
+    return is_blocked(response)
+
+
+# bhav_mcx columns in insert order, with the MCX JSON field each one comes from
+MCX_FIELDS = {
+    "date": "Date",
+    "symbol": "Symbol",
+    "expiry_date": "ExpiryDate",
+    "open_price": "Open",
+    "high_price": "High",
+    "low_price": "Low",
+    "close_price": "Close",
+    "previous_close": "PreviousClose",
+    "volume": "Volume",
+    "volume_in_thousands": "VolumeInThousands",
+    "value": "Value",
+    "open_interest": "OpenInterest",
+    "date_display": "DateDisplay",
+    "instrument_name": "InstrumentName",
+    "strike_price": "StrikePrice",
+    "option_type": "OptionType",
+}
+MCX_DATE_FORMATS = {"date": "%m/%d/%Y", "expiry_date": "%d%b%Y"}
+MCX_INT_COLUMNS = ["volume", "open_interest"]
+MCX_DECIMAL_COLUMNS = ["open_price", "high_price", "low_price", "close_price", "previous_close", "value", "strike_price"]
+MCX_TEXT_COLUMNS = ["symbol", "volume_in_thousands", "date_display", "instrument_name", "option_type"]
+MCX_REQUIRED_COLUMNS = ["date", "symbol", "expiry_date"]
+
+MCX_INSERT_QUERY = f"""
+    INSERT INTO bhav_mcx ({", ".join(MCX_FIELDS)}, created_at, updated_at)
+    VALUES ({", ".join(["%s"] * len(MCX_FIELDS))}, NOW(), NOW())
+    ON DUPLICATE KEY UPDATE
+        open_price = VALUES(open_price),
+        high_price = VALUES(high_price),
+        low_price = VALUES(low_price),
+        close_price = VALUES(close_price),
+        previous_close = VALUES(previous_close),
+        volume = VALUES(volume),
+        value = VALUES(value),
+        open_interest = VALUES(open_interest),
+        updated_at = NOW()
+"""
+
+def records_to_frame(bhavcopy_data, offset=0):
+    """
+    Convert MCX JSON records to a bhav_mcx-shaped DataFrame in one vectorized pass.
+
+    `offset` is the position of the first record in the whole response, used for reject indexes.
+
+    Returns:
+        tuple: (DataFrame of valid rows, list of rejects as {"index", "symbol", "reason"})
+    """
+    raw = pd.DataFrame.from_records(bhavcopy_data, columns=list(MCX_FIELDS.values()))
+    df = pd.DataFrame(index=raw.index)
+    problems = pd.Series("", index=raw.index)
 
+    for column, field in MCX_FIELDS.items():
+        source = raw[field]
+        if column in MCX_DATE_FORMATS:
+            df[column] = pd.to_datetime(source, format=MCX_DATE_FORMATS[column], errors="coerce")
+        elif column in MCX_TEXT_COLUMNS:
+            df[column] = source.astype("str").str.strip().where(source.notna())
+        else:
+            df[column] = pd.to_numeric(source, errors="coerce")
+            if column in MCX_INT_COLUMNS:
+                df[column] = df[column].astype("Int64")
+
+        # A required value that is absent or any value that failed conversion rejects the record
+        bad = df[column].isna() & (source.notna() | (column in MCX_REQUIRED_COLUMNS))
+        if bad.any():
+            values = source[bad].map(str).where(source[bad].notna(), "missing")  # astype("str") would keep NaN
+            problems[bad] += field + "=" + values + "; "
+
+    rejected = problems != ""
+    symbols = raw["Symbol"].astype(object).where(raw["Symbol"].notna(), None)
+    rejects = [
+        {"index": offset + int(index), "symbol": symbols[index], "reason": reason.rstrip("; ")}
+        for index, reason in problems[rejected].items()
+    ]
+    return df[~rejected], rejects
+
+
+def insert_into_db(bhavcopy_data, trade_date=None, checksum=None, batch_size=MCX_INSERT_BATCH_SIZE):
+    """Insert a list of MCX BhavCopy records; see insert_chunks."""
+    return insert_chunks(batched(bhavcopy_data, batch_size), trade_date, checksum)
+
+
+def insert_chunks(chunks, trade_date=None, checksum=None, progress=None, reconcile=None):
+    """
+    Insert chunks of MCX BhavCopy records into bhav_mcx, one executemany per chunk, within one transaction.
+
+    Malformed records are left out and listed in the reject report instead of failing their chunk.
+    When `trade_date` is given, the load_status row for that MCX date is refreshed in the same transaction.
+    `checksum` may be a callable, evaluated once every chunk has been consumed (e.g. a running hash of
+    a streamed response).
+    When `reconcile` is set (default: config.INGEST_RECONCILE) and `trade_date` already has rows, the
+    day is collected and diffed instead, and only the needed inserts, updates and deletes are written.
+
+    Returns:
+        dict: success, rows_inserted, rejected_rows, rejects, elapsed_sec, rows_per_sec, changes when
+        reconciled (or error)
+    """
+    if reconcile is None:
+        reconcile = INGEST_RECONCILE
+    with connection() as conn:
+        return _insert_chunks(conn, chunks, trade_date, checksum, progress, reconcile)
 
-def insert_into_db(bhavcopy_data):
-    """Inserts MCX BhavCopy data into MySQL using batch insert with memory optimization."""
-    
+
+def _insert_chunks(conn, chunks, trade_date, checksum, progress, reconcile):
+    started = time.perf_counter()
+    inserted, seen, rejects, frames = 0, 0, [], []
+    changes = None
+
+    cursor = conn.cursor()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor(buffered=True)  # ✅ Use buffered cursor to optimize memory usage
-
-        insert_query = """
-        INSERT INTO bhav_mcx (
-            date, symbol, expiry_date, open_price, high_price, low_price, close_price, 
-            previous_close, volume, volume_in_thousands, value, open_interest, 
-            date_display, instrument_name, strike_price, option_type, created_at, updated_at
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
-        )
-        ON DUPLICATE KEY UPDATE 
-            open_price = VALUES(open_price),
-            high_price = VALUES(high_price),
-            low_price = VALUES(low_price),
-            close_price = VALUES(close_price),
-            previous_close = VALUES(previous_close),
-            volume = VALUES(volume),
-            value = VALUES(value),
-            open_interest = VALUES(open_interest),
-            updated_at = NOW();
-        """
-
-        batch_size = 50  # ✅ Further reduced batch size to 50 records
-        records = []
-
-        for record in bhavcopy_data:
-            try:
-                records.append((
-                    datetime.strptime(record["Date"], "%m/%d/%Y").date(),
-                    record["Symbol"].strip(),
-                    datetime.strptime(record["ExpiryDate"], "%d%b%Y").date(),
-                    record["Open"], record["High"], record["Low"], record["Close"],
-                    record["PreviousClose"], record["Volume"], record["VolumeInThousands"].strip(),
-                    record["Value"], record["OpenInterest"], record["DateDisplay"].strip(),
-                    record["InstrumentName"].strip(), record["StrikePrice"], record["OptionType"].strip()
-                ))
-
-                # ✅ Insert in batches of 50 records
-                if len(records) >= batch_size:
-                    cursor.executemany(insert_query, records)
-                    conn.commit()
-                    print(f"✅ Inserted {len(records)} records into mcx_bhavcopy.")
-
-                    records = []  # Clear batch
-                    gc.collect()  # ✅ Force garbage collection to free memory
-
-            except mysql.connector.Error as e:
-                print(f"❌ Error inserting record: {record} - {e}")
-
-        # Insert any remaining records
-        if records:
-            cursor.executemany(insert_query, records)
+        collect = reconcile and trade_date and day_has_rows(conn, trade_date)
+        for chunk in chunks:
+            df, chunk_rejects = records_to_frame(chunk, offset=seen)
+            seen += len(chunk)
+            for reject in chunk_rejects:
+                print(f"⚠️ Rejected MCX record {reject['index']} ({reject['symbol']}): {reject['reason']}")
+            rejects.extend(chunk_rejects)
+            if collect:
+                frames.append(df)
+                continue
+            cursor.executemany(MCX_INSERT_QUERY, dataframe_to_rows(df))
+            inserted += len(df)
+            if progress:
+                progress("insert", rows_inserted=inserted)
+        if collect and frames:
+            stats = reconcile_mcx(conn, pd.concat(frames, ignore_index=True), trade_date, MCX_INSERT_BATCH_SIZE)
+            if stats is None:
+                # Rows that cannot be matched one-to-one: replace the stored day instead of appending to it
+                cursor.execute("DELETE FROM bhav_mcx WHERE date = %s", (trade_date,))
+                for df in frames:
+                    cursor.executemany(MCX_INSERT_QUERY, dataframe_to_rows(df))
+                    inserted += len(df)
+            else:
+                inserted, changes = stats["rows_inserted"], stats["changes"]
+        if trade_date:
+            # Commits the inserts together with the status row
+            record_mcx_load(conn, trade_date, checksum() if callable(checksum) else checksum)
+        else:
             conn.commit()
-            print(f"✅ Inserted {len(records)} remaining records into mcx_bhavcopy.")
-            gc.collect()  # ✅ Free memory explicitly
-
     except mysql.connector.Error as err:
         print(f"❌ Database error: {err}")
-        conn.rollback()  # Rollback the last transaction
+        conn.rollback()
+        return {"success": False, "error": f"Database error while inserting MCX data: {err}",
+                "rows_inserted": 0, "rejected_rows": len(rejects), "rejects": rejects}
+    except Exception:
+        conn.rollback()  # e.g. the response stream broke off mid-way: keep the previous load intact
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Inserted {inserted} records into bhav_mcx ({len(rejects)} rejected) in {elapsed:.2f}s.")
+    for kind, count in (("parsed", seen), ("rejected", len(rejects)), ("inserted", inserted)):
+        if count:
+            REGISTRY.inc("bhavcopy_ingest_rows_total", count, exchange="MCX", segment=MCX_SGMT, kind=kind)
+    result = {
+        "success": True,
+        "rows_inserted": inserted,
+        "rejected_rows": len(rejects),
+        "rejects": rejects,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(inserted / elapsed, 1) if elapsed > 0 else None,
+    }
+    if changes is not None:
+        result["changes"] = changes
+    return result
 
+
+def day_has_rows(conn, trade_date):
+    """True when bhav_mcx already holds rows for `trade_date`."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1 FROM bhav_mcx WHERE date = %s LIMIT 1", (trade_date,))
+        return cursor.fetchone() is not None
     finally:
         cursor.close()
-        conn.close()
-        print("🔄 MySQL connection closed.")  # Log when connection closes
 
 
 # Example Usage
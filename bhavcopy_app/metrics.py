@@ -0,0 +1,159 @@
+import threading
+import time
+from bisect import bisect_left
+
+from config import METRICS_STAGE_BUCKETS
+
+# name -> (type, help); every metric recorded must be declared here
+METRICS = {
+    "bhavcopy_ingest_stage_seconds": ("histogram", "Time spent in one ingest stage of a reload."),
+    "bhavcopy_ingest_reload_seconds": ("histogram", "Wall time of a whole reload, download to commit."),
+    "bhavcopy_ingest_reloads_total": ("counter", "Reloads finished, by outcome (success, skipped, not_found, failed)."),
+    "bhavcopy_ingest_bytes_total": ("counter", "Raw file bytes ingested, by source (download or cache)."),
+    "bhavcopy_ingest_rows_total": ("counter", "Rows seen by the ingest, by kind (parsed, rejected, inserted, failed)."),
+    "bhavcopy_continuous_futures_refreshes_total": ("counter", "Continuous futures updates after a load, by outcome (success, failed)."),
+}
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms, labelled by exchange / segment / stage, rendered as Prometheus text.
+
+    Each web or command process keeps its own registry; scrape every process (or worker) separately.
+    """
+
+    def __init__(self, definitions, buckets):
+        self.definitions = definitions
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., count above the last bucket, sum]
+
+    def inc(self, name, amount=1, **labels):
+        """Add `amount` to a counter."""
+        key = self._key(name, "counter", labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one value in a histogram."""
+        key = self._key(name, "histogram", labels)
+        with self._lock:
+            counts = self._histograms.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4) of everything recorded so far."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in self.definitions.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip([*self.buckets, "+Inf"], counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(counts[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _key(self, name, kind, labels):
+        if self.definitions.get(name, (None,))[0] != kind:
+            raise KeyError(f"{name} is not a declared {kind}.")
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class StageTimer:
+    """
+    Progress callback that times the ingest stages reported between report_progress() calls.
+
+    Each new stage name closes the previous stage and observes its duration in
+    bhavcopy_ingest_stage_seconds{exchange, segment, stage}; calls are forwarded to the wrapped
+    `progress` callback (e.g. a ReloadJob's). finish() closes the last stage and counts the reload.
+    """
+
+    def __init__(self, exchange, segment, progress=None, registry=None):
+        self.exchange = exchange
+        self.segment = segment
+        self.progress = progress
+        self.registry = registry or REGISTRY
+        self.durations = {}  # stage -> seconds, in the order the stages ran
+        self.stage = None
+        self._started = self._stage_started = time.perf_counter()
+
+    def __call__(self, stage, **counters):
+        if stage != self.stage:
+            self._close_stage()
+            self.stage, self._stage_started = stage, time.perf_counter()
+        if self.progress:
+            self.progress(stage, **counters)
+
+    def count(self, name, amount, **labels):
+        """Add to an ingest counter labelled with this reload's exchange and segment."""
+        if amount:
+            self.registry.inc(name, amount, exchange=self.exchange, segment=self.segment, **labels)
+
+    def finish(self, result):
+        """Record the reload's outcome and total time; adds the stage timings to `result` as stage_seconds."""
+        self._close_stage()
+        if result.get("success"):
+            outcome = "skipped" if result.get("skipped") else "success"
+        else:
+            outcome = "not_found" if result.get("not_found") else "failed"
+        labels = {"exchange": self.exchange, "segment": self.segment}
+        self.registry.inc("bhavcopy_ingest_reloads_total", outcome=outcome, **labels)
+        self.registry.observe("bhavcopy_ingest_reload_seconds", time.perf_counter() - self._started, **labels)
+        result["stage_seconds"] = {stage: round(seconds, 3) for stage, seconds in self.durations.items()}
+        return result
+
+    def _close_stage(self):
+        if self.stage is None:
+            return
+        elapsed = time.perf_counter() - self._stage_started
+        self.durations[self.stage] = self.durations.get(self.stage, 0.0) + elapsed
+        self.registry.observe("bhavcopy_ingest_stage_seconds", elapsed, exchange=self.exchange, segment=self.segment,
+                              stage=self.stage)
+        self.stage = None
+
+
+def stage_timer(exchange, segment, progress=None):
+    """
+    (timer, owned): a new StageTimer around `progress`, or `progress` itself when an outer caller
+    is already timing this reload (owned False: that caller finishes it).
+    """
+    if isinstance(progress, StageTimer):
+        return progress, False
+    return StageTimer(exchange, segment, progress), True
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry(METRICS, METRICS_STAGE_BUCKETS)
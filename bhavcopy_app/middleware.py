@@ -1,5 +1,151 @@
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import Resolver404, resolve
 from django.utils.deprecation import MiddlewareMixin
 
+from config import PROFILE_DIR, PROFILE_ENDPOINTS, PROFILE_SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+# One sampled cProfile at a time per process: profilers of concurrent requests on one thread would clash
+_profiling = threading.Lock()
+# RequestProfile of the request being handled; asgiref carries it into the threads sync code runs in
+_current_profile = ContextVar("current_profile", default=None)
+
+
 class DisableCSRF(MiddlewareMixin):
     def process_request(self, request):
         setattr(request, '_dont_enforce_csrf_checks', True)
+
+
+class RequestProfiler:
+    """
+    Time each request and the Django queries it runs, and report them in a Server-Timing header.
+
+    Requests over config.PROFILE_SLOW_REQUEST_MS are logged with their query count and database
+    time. URL names listed in config.PROFILE_ENDPOINTS have that fraction of their requests run
+    under cProfile, dumped to PROFILE_DIR/<url name>/. Queries on the ingest pool (bhavcopy_app.db_pool)
+    bypass Django and are not counted. Works for sync and async views; under ASGI a sampled profile
+    covers the event-loop thread only, so it sees async views (and whatever else ran on the loop
+    meanwhile) but not sync views, which Django runs in a worker thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this middleware loaded (e.g. by system checks) missed connection_created
+        for connection in connections.all(initialized_only=True):
+            if connection.connection is not None:
+                install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile(sampled_url_name(request))
+        with profile:
+            response = self.get_response(request)
+        return profile.finish(request, response)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(sampled_url_name(request))
+        with profile:
+            response = await self.get_response(request)
+        return profile.finish(request, response)
+
+
+def sampled_url_name(request):
+    """URL name of the request when it is picked for a cProfile run by PROFILE_ENDPOINTS, else None."""
+    if not PROFILE_ENDPOINTS:
+        return None
+    try:
+        url_name = resolve(request.path_info).url_name
+    except Resolver404:
+        return None
+    rate = PROFILE_ENDPOINTS.get(url_name, 0)
+    return url_name if rate and random.random() < rate else None
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query's duration to the current request's RequestProfile."""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_seconds += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Add time_query to every Django connection once, when it connects. Connections are per thread,
+    so a wrapper scoped to the request's thread would miss the queries of views run under ASGI.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(install_query_timer)
+
+
+class RequestProfile:
+    """Wall time, query count and query time of one request, plus its cProfile when sampled."""
+
+    def __init__(self, url_name=None):
+        self.url_name = url_name  # Set when the request is to be profiled
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.profiler = None
+        self._token = None
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._token = _current_profile.set(self)
+        if self.url_name and _profiling.acquire(blocking=False):
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._started
+        _current_profile.reset(self._token)
+        if self.profiler:
+            self.profiler.disable()
+            _profiling.release()
+
+    def finish(self, request, response):
+        elapsed_ms, db_ms = self.elapsed * 1000, self.db_seconds * 1000
+        response["Server-Timing"] = f'app;dur={elapsed_ms:.1f}, db;dur={db_ms:.1f};desc="{self.queries} queries"'
+        if elapsed_ms > PROFILE_SLOW_REQUEST_MS:
+            logger.warning("Slow request %s %s: %.1f ms, %d queries, %.1f ms in the database",
+                           request.method, request.get_full_path(), elapsed_ms, self.queries, db_ms)
+        if self.profiler:
+            self._dump()
+        return response
+
+    def _dump(self):
+        directory = os.path.join(PROFILE_DIR, self.url_name)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{datetime.now():%Y%m%d_%H%M%S_%f}.prof")
+            self.profiler.dump_stats(path)
+            logger.info("Profile of %s written to %s", self.url_name, path)
+        except OSError as e:
+            logger.error("Could not write the profile of %s: %s", self.url_name, e)
@@ -12,6 +12,20 @@ class BhavCopy(models.Model):
     TckrSymb = models.CharField(max_length=10)  # Ticker Symbol
     SctySrs = models.CharField(max_length=5, null=True, blank=True)  # Security Series
     XpryDt = models.DateField(null=True, blank=True)  # Expiry Date
+    FininstrmActlXpryDt = models.DateField(null=True, blank=True)  # Actual Expiry Date
+    StrkPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Strike Price
+    OptnTp = models.CharField(max_length=10, null=True, blank=True)  # Option Type (CE/PE)
+    FinInstrmNm = models.CharField(max_length=100)  # Financial Instrument Name
+    OpnPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Open Price
+    HghPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # High Price
+    LwPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Low Price
+    ClsPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Close Price
+    LastPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Last Traded Price
+    PrvsClsgPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Previous Close
+    UndrlygPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Underlying Price
+    SttlmPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # Settlement Price
+    OpnIntrst = models.BigIntegerField(null=True, blank=True)  # Open Interest
+    ChngInOpnIntrst = models.BigIntegerField(null=True, blank=True)  # Change in Open Interest
     TtlTradgVol = models.IntegerField()  # Total Trading Volume
     TtlTrfVal = models.FloatField()  # Total Transfer Value
     TtlNbOfTxsExctd = models.IntegerField()  # Total Number of Transactions Executed
@@ -26,6 +40,16 @@ class BhavCopy(models.Model):
     class Meta:
         db_table = 'BhavCopy'  # Use the existing 'BhavCopy' table
         managed = False  # Prevent Django from creating/modifying this table
+        constraints = [
+            # Natural key, see SQL/migrations/001_bhavcopy_natural_key.sql
+            models.UniqueConstraint(fields=['TradDt', 'Sgmt', 'Src', 'FinInstrmId', 'SsnId'], name='uq_bhavcopy_natural'),
+        ]
+        indexes = [
+            # See SQL/migrations/004_query_indexes.sql
+            models.Index(fields=['TckrSymb', 'TradDt'], name='ix_bhavcopy_symbol_date'),
+            models.Index(fields=['FinInstrmId', 'TradDt'], name='ix_bhavcopy_instrument_date'),
+            models.Index(fields=['TckrSymb', 'XpryDt', 'TradDt'], name='ix_bhavcopy_expiry'),
+        ]
 
     def __str__(self):
         return f"{self.TradDt} - {self.TckrSymb}"
@@ -56,6 +80,121 @@ class BhavMCX(models.Model):
 
     class Meta:
         db_table = "bhav_mcx"
+        indexes = [
+            # See SQL/migrations/004_query_indexes.sql
+            models.Index(fields=["date"], name="ix_bhav_mcx_date"),
+            models.Index(fields=["symbol", "date"], name="ix_bhav_mcx_symbol_date"),
+            models.Index(fields=["symbol", "expiry_date", "date"], name="ix_bhav_mcx_expiry"),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.symbol} ({self.instrument_name})"
+
+
+# Per (date, segment, source) load summary maintained by the ingest code.
+# MCX days are stored with sgmt = src = "MCX".
+class LoadStatus(models.Model):
+    id = models.AutoField(primary_key=True)
+    trade_date = models.DateField()
+    sgmt = models.CharField(max_length=10)
+    src = models.CharField(max_length=10)
+    row_count = models.IntegerField(default=0)
+    checksum = models.CharField(max_length=64, null=True, blank=True)  # sha256 of the source file
+    loaded_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "load_status"  # Created by SQL/migrations/002_load_status.sql
+        managed = False
+        constraints = [
+            models.UniqueConstraint(fields=["trade_date", "sgmt", "src"], name="uq_load_status_cell"),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_date} - {self.sgmt}/{self.src} ({self.row_count})"
+
+
+# Per (date, segment, source) market aggregates computed at ingest (bhavcopy_app.daily_aggregates)
+class DailyMarketSummary(models.Model):
+    id = models.AutoField(primary_key=True)
+    trade_date = models.DateField()
+    sgmt = models.CharField(max_length=10)
+    src = models.CharField(max_length=10)
+    instruments = models.IntegerField(default=0)
+    advances = models.IntegerField(default=0)
+    declines = models.IntegerField(default=0)
+    unchanged = models.IntegerField(default=0)
+    total_volume = models.BigIntegerField(null=True, blank=True)
+    total_turnover = models.DecimalField(max_digits=22, decimal_places=2, null=True, blank=True)
+    total_trades = models.BigIntegerField(null=True, blank=True)
+    total_open_interest = models.BigIntegerField(null=True, blank=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "daily_market_summary"  # Created by SQL/migrations/005_daily_aggregates.sql
+        managed = False
+        constraints = [
+            models.UniqueConstraint(fields=["trade_date", "sgmt", "src"], name="uq_daily_market_summary_cell"),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_date} - {self.sgmt}/{self.src} (+{self.advances}/-{self.declines})"
+
+
+class DailyTopMover(models.Model):
+    id = models.AutoField(primary_key=True)
+    trade_date = models.DateField()
+    sgmt = models.CharField(max_length=10)
+    src = models.CharField(max_length=10)
+    category = models.CharField(max_length=10)  # gainer, loser or turnover
+    position = models.SmallIntegerField()  # 1-based rank within the category
+    FinInstrmId = models.IntegerField()
+    TckrSymb = models.CharField(max_length=20)
+    ClsPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    PrvsClsgPric = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    pct_change = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True)
+    TtlTrfVal = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        db_table = "daily_top_movers"  # Created by SQL/migrations/005_daily_aggregates.sql
+        managed = False
+        constraints = [
+            models.UniqueConstraint(fields=["trade_date", "sgmt", "src", "category", "position"],
+                                    name="uq_daily_top_movers_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_date} - {self.sgmt}/{self.src} {self.category} #{self.position} {self.TckrSymb}"
+
+
+# Rolled continuous futures, one row per (root, roll rule, day); see bhavcopy_app.continuous_futures
+class ContinuousFuture(models.Model):
+    id = models.AutoField(primary_key=True)
+    dataset = models.CharField(max_length=10)  # bhavcopy or mcx
+    sgmt = models.CharField(max_length=10)
+    src = models.CharField(max_length=10)
+    root = models.CharField(max_length=50)  # TckrSymb / MCX symbol
+    rule = models.CharField(max_length=20)  # oi, volume or days:N
+    trade_date = models.DateField()
+    expiry_date = models.DateField()  # Contract the series holds on trade_date
+    contract_id = models.IntegerField(null=True, blank=True)  # FinInstrmId (BhavCopy only)
+    open_price = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    high_price = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    low_price = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    close_price = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    settle_price = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    volume = models.BigIntegerField(null=True, blank=True)
+    open_interest = models.BigIntegerField(null=True, blank=True)
+    adjustment = models.DecimalField(max_digits=18, decimal_places=2, default=0)  # Added to raw prices
+    rolled = models.BooleanField(default=False)  # First day on a new contract
+
+    class Meta:
+        db_table = "continuous_futures"  # Created by SQL/migrations/006_continuous_futures.sql
+        managed = False
+        constraints = [
+            models.UniqueConstraint(fields=["dataset", "sgmt", "src", "root", "rule", "trade_date"],
+                                    name="uq_continuous_futures_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_date} - {self.root} [{self.rule}] {self.expiry_date}"
@@ -0,0 +1,99 @@
+import pandas as pd
+
+from bhavcopy_app import models
+from bhavcopy_app.caching import DateRangeCache
+from config import OPTION_CHAIN_CACHE_MAX_ENTRIES, OPTION_CHAIN_CACHE_TTL
+
+OPTION_TYPES = ["CE", "PE"]
+CHAIN_COLUMNS = ["oi", "chg_oi", "volume", "close"]
+INTEGER_COLUMNS = {"oi", "chg_oi", "volume"}
+
+# dataset -> (model, underlying, trade date, expiry, strike, option type, underlying price, filters allowed,
+#             field per CHAIN_COLUMNS entry; None when the dataset does not carry it).
+# Served by ix_bhavcopy_expiry (TckrSymb, XpryDt, TradDt) / ix_bhav_mcx_expiry (symbol, expiry_date, date).
+CHAINS = {
+    "bhavcopy": (models.BhavCopy, "TckrSymb", "TradDt", "XpryDt", "StrkPric", "OptnTp", "UndrlygPric", ("Sgmt", "Src"),
+                 ["OpnIntrst", "ChngInOpnIntrst", "TtlTradgVol", "ClsPric"]),
+    "mcx": (models.BhavMCX, "symbol", "date", "expiry_date", "strike_price", "option_type", None, (),
+            ["open_interest", None, "volume", "close_price"]),
+}
+AGGREGATIONS = {"oi": "sum", "chg_oi": "sum", "volume": "sum", "close": "last"}
+
+# One entry per (dataset, date, underlying, expiry, filters); reloading the date drops it
+CHAIN_CACHE = DateRangeCache("option_chain", OPTION_CHAIN_CACHE_MAX_ENTRIES, OPTION_CHAIN_CACHE_TTL)
+
+
+def nearest_expiry(dataset, underlying, trade_date, filters=None):
+    """First option expiry on or after `trade_date` traded for `underlying` that day, or None."""
+    model, underlying_field, date_field, expiry_field, _, type_field, *_ = CHAINS[dataset]
+    return (
+        model.objects.filter(**{underlying_field: underlying, date_field: trade_date, f"{expiry_field}__gte": trade_date,
+                                f"{type_field}__in": OPTION_TYPES}, **(filters or {}))
+        .order_by(expiry_field)
+        .values_list(expiry_field, flat=True)
+        .first()
+    )
+
+
+def get_option_chain(dataset, underlying, trade_date, expiry, filters=None):
+    """
+    CE/PE-by-strike matrix of one underlying, trade date and expiry.
+
+    Returns a dict with the ascending strikes and, per option type, one list per CHAIN_COLUMNS entry
+    aligned with the strikes (None where that side has no contract), plus OI totals and the put-call
+    ratio. Cached per (dataset, date, underlying, expiry, filters).
+    """
+    filters = filters or {}
+    key = (dataset, trade_date, underlying, expiry, tuple(sorted(filters.items())))
+    cached = CHAIN_CACHE.get(key)
+    if cached is not None:
+        return cached
+    version = CHAIN_CACHE.version(dataset)
+
+    model, underlying_field, date_field, expiry_field, strike_field, type_field, price_field, _, fields = CHAINS[dataset]
+    selected = [strike_field, type_field, *[field for field in fields if field], *([price_field] if price_field else [])]
+    rows = model.objects.filter(
+        **{underlying_field: underlying, date_field: trade_date, expiry_field: expiry, f"{type_field}__in": OPTION_TYPES},
+        **filters,
+    ).values_list(*selected)
+    chain = pivot_chain(pd.DataFrame.from_records(list(rows), columns=selected), strike_field, type_field, fields, price_field)
+    chain.update(dataset=dataset, underlying=underlying, date=trade_date.isoformat(), expiry=expiry.isoformat())
+
+    CHAIN_CACHE.set(key, chain, dataset, trade_date, trade_date, version)
+    return chain
+
+
+def pivot_chain(df, strike_field, type_field, fields, price_field=None):
+    """Vectorized pivot of option rows into the strike x (CE, PE) matrix returned by get_option_chain()."""
+    frame = pd.DataFrame({"strike": pd.to_numeric(df[strike_field], errors="coerce"), "option_type": df[type_field]})
+    for column, field in zip(CHAIN_COLUMNS, fields):
+        frame[column] = pd.to_numeric(df[field], errors="coerce") if field else float("nan")
+    frame = frame.dropna(subset=["strike"])
+
+    matrix = (
+        frame.groupby(["strike", "option_type"], sort=True)
+        .agg(AGGREGATIONS)
+        .unstack("option_type")
+        .reindex(columns=pd.MultiIndex.from_product([CHAIN_COLUMNS, OPTION_TYPES]))
+    )
+    for column, field in zip(CHAIN_COLUMNS, fields):
+        if not field:
+            matrix[column] = float("nan")  # sum() would report a column the dataset lacks as zeros
+    totals = {option_type: matrix[("oi", option_type)].sum() for option_type in OPTION_TYPES}
+    underlying_price = pd.to_numeric(df[price_field], errors="coerce").dropna() if price_field else pd.Series(dtype=float)
+    return {
+        "strikes": matrix.index.tolist(),
+        **{option_type: {column: _json_list(matrix[(column, option_type)], column in INTEGER_COLUMNS)
+                         for column in CHAIN_COLUMNS}
+           for option_type in OPTION_TYPES},
+        "underlying_price": float(underlying_price.iloc[0]) if len(underlying_price) else None,
+        "total_oi": {option_type: int(total) for option_type, total in totals.items()},
+        "pcr": round(float(totals["PE"] / totals["CE"]), 4) if totals["CE"] else None,
+    }
+
+
+def _json_list(series, integer=False):
+    """Values with gaps as None; counts as ints rather than the floats NaN gaps force on them."""
+    if integer:
+        series = series.round().astype("Int64")
+    return series.astype(object).where(series.notna(), None).tolist()
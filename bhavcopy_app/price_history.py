@@ -0,0 +1,84 @@
+from datetime import date
+from decimal import Decimal
+
+from bhavcopy_app import models
+from bhavcopy_app.caching import DateRangeCache
+from bhavcopy_app.option_chain import OPTION_TYPES
+from config import PRICE_HISTORY_CACHE_MAX_ENTRIES, PRICE_HISTORY_CACHE_MAX_ROWS, PRICE_HISTORY_CACHE_TTL
+
+# (dataset, identifier kind) -> (model, identifier field, date field, extra filters allowed,
+# option type field whose options are left out, series columns).
+# Lookups are served by ix_bhavcopy_symbol_date / ix_bhavcopy_instrument_date / ix_bhav_mcx_symbol_date.
+# A symbol has hundreds of option contracts a day, so symbol series are the underlying's equity and
+# futures rows only; an option's history is asked for by its FinInstrmId.
+SERIES = {
+    ("bhavcopy", "symbol"): (models.BhavCopy, "TckrSymb", "TradDt", ("Sgmt", "Src"), "OptnTp", [
+        "TradDt", "FinInstrmId", "XpryDt", "OpnPric", "HghPric", "LwPric", "ClsPric",
+        "SttlmPric", "PrvsClsgPric", "OpnIntrst", "ChngInOpnIntrst", "TtlTradgVol", "TtlTrfVal",
+    ]),
+    ("bhavcopy", "instrument"): (models.BhavCopy, "FinInstrmId", "TradDt", ("Sgmt", "Src"), None, [
+        "TradDt", "TckrSymb", "XpryDt", "StrkPric", "OptnTp", "OpnPric", "HghPric", "LwPric", "ClsPric",
+        "SttlmPric", "PrvsClsgPric", "OpnIntrst", "ChngInOpnIntrst", "TtlTradgVol", "TtlTrfVal",
+    ]),
+    ("mcx", "symbol"): (models.BhavMCX, "symbol", "date", (), "option_type", [
+        "date", "instrument_name", "expiry_date", "open_price", "high_price",
+        "low_price", "close_price", "previous_close", "volume", "open_interest", "value",
+    ]),
+}
+
+# One entry per (series, filters, date range); a reload of any date in the range drops it
+HISTORY_CACHE = DateRangeCache("price_history", PRICE_HISTORY_CACHE_MAX_ENTRIES, PRICE_HISTORY_CACHE_TTL)
+
+
+def get_price_history(dataset, kind, identifiers, start_date, end_date, filters=None):
+    """
+    Columnar price history of each identifier over [start_date, end_date].
+
+    Returns ({identifier: {column: [values in date order]}}, cache counters of this call). Cached
+    series are reused per identifier, and the rest are fetched together in one indexed query.
+    Derivative symbols have one row per contract and date; FinInstrmId/expiry columns tell them apart.
+    Series longer than PRICE_HISTORY_CACHE_MAX_ROWS are returned but not cached.
+    """
+    model, id_field, date_field, _, option_field, columns = SERIES[(dataset, kind)]
+    filters = filters or {}
+    filter_key = tuple(sorted(filters.items()))
+
+    series, missing = {}, []
+    for identifier in identifiers:
+        cached = HISTORY_CACHE.get((dataset, kind, identifier, filter_key, start_date, end_date))
+        if cached is None:
+            missing.append(identifier)
+        else:
+            series[identifier] = cached
+
+    if missing:
+        version = HISTORY_CACHE.version(dataset)
+        rows = (
+            model.objects.filter(**{f"{id_field}__in": missing, f"{date_field}__range": (start_date, end_date)},
+                                 **filters)
+            .exclude(**({f"{option_field}__in": OPTION_TYPES} if option_field else {}))
+            .order_by(id_field, date_field)
+            .values_list(id_field, *columns)
+        )
+        fetched = {identifier: {column: [] for column in columns} for identifier in missing}
+        for identifier, *values in rows:
+            target = fetched[identifier]
+            for column, value in zip(columns, values):
+                target[column].append(_plain(value))
+        for identifier, data in fetched.items():
+            if len(data[date_field]) <= PRICE_HISTORY_CACHE_MAX_ROWS:
+                HISTORY_CACHE.set((dataset, kind, identifier, filter_key, start_date, end_date), data,
+                                  dataset, start_date, end_date, version)
+            series[identifier] = data
+
+    return ({identifier: series[identifier] for identifier in identifiers},
+            {"hits": len(identifiers) - len(missing), "misses": len(missing)})
+
+
+def _plain(value):
+    """JSON-ready scalar: DECIMAL as float, dates as ISO strings."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
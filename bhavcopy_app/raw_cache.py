@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from config import RAW_CACHE_DIR
+
+
+class RawFileCache:
+    """
+    Gzip-compressed archive of raw exchange downloads keyed by (exchange, segment, date).
+
+    Each file has a .sha256 sidecar holding the checksum of the uncompressed content, the same
+    value load_status.checksum records for the load. Entries failing verification count as misses.
+    Both files are replaced atomically, sidecar first, and a reader that catches an entry between the
+    two replaces reads it again, so overwriting an entry never looks like corruption.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def path(self, exchange, segment, date_str):
+        """Archive path for a download; `date_str` is YYYYMMDD."""
+        return os.path.join(self.root, exchange, segment, f"{date_str}.gz")
+
+    def get(self, exchange, segment, date_str):
+        """Return the cached bytes, or None when absent or failing checksum verification."""
+        path = self.path(exchange, segment, date_str)
+        for attempt in range(2):
+            try:
+                with open(f"{path}.sha256", encoding="ascii") as f:
+                    expected = f.read().strip()
+                with gzip.open(path, "rb") as f:
+                    content = f.read()
+            except (OSError, EOFError):
+                self._count(exchange, "misses")
+                return None
+            if hashlib.sha256(content).hexdigest() == expected:
+                break
+            # Otherwise a put() may have replaced one file of the pair between the two reads: read again
+        else:
+            # Left in place: the re-download that follows a miss overwrites it
+            print(f"⚠️ Cached {exchange}/{segment}/{date_str} failed checksum verification, ignoring it.")
+            self._count(exchange, "corrupt")
+            self._count(exchange, "misses")
+            return None
+
+        self._count(exchange, "hits")
+        return content
+
+    def put(self, exchange, segment, date_str, content):
+        """Store a download atomically and return its sha256 checksum."""
+        path = self.path(exchange, segment, date_str)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        checksum = hashlib.sha256(content).hexdigest()
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(content)
+        self._publish(tmp_path, path, checksum)
+        self._count(exchange, "stores")
+        return checksum
+
+    def writer(self, exchange, segment, date_str):
+        """
+        Streaming counterpart of put() for downloads too large to hold in memory.
+
+        Use as a context manager and write() the chunks as they arrive; the entry is only published
+        when the block exits cleanly. The checksum is available as `.checksum` afterwards.
+        """
+        return _CacheWriter(self, exchange, segment, date_str)
+
+    def discard(self, exchange, segment, date_str):
+        """Drop an entry whose content turned out to be unusable (e.g. a bad zip)."""
+        self._remove(self.path(exchange, segment, date_str))
+
+    def stats(self):
+        """Hit/miss counters per exchange since process start, with hit rates."""
+        with self._lock:
+            stats = {exchange: dict(counters) for exchange, counters in self._stats.items()}
+        for counters in stats.values():
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            counters["hit_rate"] = round(counters.get("hits", 0) / lookups, 3) if lookups else None
+        return stats
+
+    def _count(self, exchange, counter):
+        with self._lock:
+            counters = self._stats.setdefault(exchange, {"hits": 0, "misses": 0, "corrupt": 0, "stores": 0})
+            counters[counter] += 1
+
+    def _publish(self, tmp_path, path, checksum):
+        """Move a finished temporary archive into place, after its sidecar; both replaces are atomic."""
+        sidecar_tmp_path = f"{path}.sha256.{threading.get_ident()}.tmp"
+        with open(sidecar_tmp_path, "w", encoding="ascii") as f:
+            f.write(checksum)
+        os.replace(sidecar_tmp_path, f"{path}.sha256")
+        os.replace(tmp_path, path)
+
+    def _remove(self, path):
+        for stale in (path, f"{path}.sha256"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+class _CacheWriter:
+    def __init__(self, cache, exchange, segment, date_str):
+        self.cache = cache
+        self.exchange = exchange
+        self.path = cache.path(exchange, segment, date_str)
+        self.tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        self.checksum = None
+        self._hash = hashlib.sha256()
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = gzip.open(self.tmp_path, "wb")
+        return self
+
+    def write(self, chunk):
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is not None:
+            self.cache._remove(self.tmp_path)
+            return False
+        self.checksum = self._hash.hexdigest()
+        self.cache._publish(self.tmp_path, self.path, self.checksum)
+        self.cache._count(self.exchange, "stores")
+        return False
+
+
+RAW_CACHE = RawFileCache(RAW_CACHE_DIR)
@@ -0,0 +1,170 @@
+from collections import Counter
+
+import pandas as pd
+
+from bhavcopy_app.bulk_loader import dataframe_to_rows
+
+# Identity of a row within one stored day. BhavCopy days are further scoped by (Sgmt, Src).
+BHAVCOPY_KEY = ["FinInstrmId", "SsnId"]
+BHAVCOPY_SCOPE = ["TradDt", "Sgmt", "Src"]
+MCX_KEY = ["symbol", "expiry_date", "instrument_name", "strike_price", "option_type"]
+MCX_SCOPE = ["date"]
+
+# DECIMAL scale of the price/value columns in both tables; values are compared at this precision
+DECIMAL_PLACES = 2
+
+
+def reconcile_bhavcopy(conn, df, trade_date, sgmt, src, batch_size):
+    """
+    Bring the stored BhavCopy rows for (trade_date, sgmt, src) in line with `df` (BHAVCOPY_COLUMNS order).
+
+    Only new rows are inserted, rows whose values changed are updated and rows missing from `df`
+    are deleted. Nothing is committed. Returns None when nothing is stored for the cell yet, or when
+    rows of `df` cannot be matched one-to-one (other cells, repeated keys), so the caller can use
+    the plain bulk load instead.
+    """
+    if not _matchable(df, BHAVCOPY_SCOPE, (trade_date, sgmt, src), BHAVCOPY_KEY):
+        return None
+    existing = fetch_existing(conn, "BhavCopy", list(df.columns),
+                              "TradDt = %s AND Sgmt = %s AND Src = %s", (trade_date, sgmt, src))
+    if existing.empty:
+        return None
+    return apply_diff(conn, "BhavCopy", df, existing, BHAVCOPY_KEY, BHAVCOPY_SCOPE, trade_date, batch_size)
+
+
+def reconcile_mcx(conn, df, trade_date, batch_size):
+    """reconcile_bhavcopy for one bhav_mcx date; `df` is in mcxdownloader.MCX_FIELDS column order."""
+    if not _matchable(df, MCX_SCOPE, (trade_date,), MCX_KEY):
+        return None
+    existing = fetch_existing(conn, "bhav_mcx", list(df.columns), "date = %s", (trade_date,))
+    if existing.empty:
+        return None
+    return apply_diff(conn, "bhav_mcx", df, existing, MCX_KEY, MCX_SCOPE, trade_date, batch_size)
+
+
+def fetch_existing(conn, table, columns, where, params):
+    """Load the stored rows of one day, with their ids, into a DataFrame."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT id, {', '.join(columns)} FROM {table} WHERE {where}", params)
+        return pd.DataFrame(cursor.fetchall(), columns=["id", *columns])
+    finally:
+        cursor.close()
+
+
+def diff(incoming, existing, key, compare):
+    """
+    Compare incoming rows with stored rows on `key`.
+
+    Returns a dict with the incoming index labels to insert, (incoming label, stored id) pairs to
+    update, stored ids to delete, the unchanged count and how often each column changed.
+    Incoming keys must be distinct. Stored duplicates of a key (possible in bhav_mcx, which has no
+    unique key) are deleted.
+    """
+    columns = key + compare
+    new = _normalized(incoming, columns, incoming)
+    old = _normalized(existing, columns, incoming)
+    old["_id"] = existing["id"].to_numpy()
+    new["_label"] = incoming.index
+
+    duplicate_ids = old.loc[old.duplicated(key, keep="first"), "_id"].tolist()
+    old = old.drop_duplicates(key, keep="first")
+
+    merged = new.merge(old, on=key, how="outer", suffixes=("", "_old"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+    changed = pd.Series(False, index=both.index)
+    changed_columns = Counter()
+    for column in compare:
+        a, b = both[column], both[f"{column}_old"]
+        differs = ~(a.eq(b).fillna(False).astype(bool) | (a.isna() & b.isna()))
+        if differs.any():
+            changed_columns[column] = int(differs.sum())
+            changed |= differs
+
+    updated = both[changed]
+    return {
+        "insert": merged.loc[merged["_merge"] == "left_only", "_label"].tolist(),
+        "update": list(zip(updated["_label"], updated["_id"].astype(int))),
+        "delete": [int(row_id) for row_id in merged.loc[merged["_merge"] == "right_only", "_id"]] + duplicate_ids,
+        "unchanged": int((~changed).sum()),
+        "changed_columns": dict(changed_columns),
+    }
+
+
+def apply_diff(conn, table, incoming, existing, key, scope, trade_date, batch_size):
+    """
+    Diff one day and write just the inserts, updates and deletes it calls for (uncommitted).
+
+    Updates and deletes also filter on the date column (scope[0]) so that they prune to the day's
+    partition of the monthly-partitioned tables.
+    """
+    compare = [column for column in incoming.columns if column not in key and column not in scope]
+    changes = diff(incoming, existing, key, compare)
+    date_column = scope[0]
+
+    columns = list(incoming.columns)
+    insert_query = (f"INSERT INTO {table} ({', '.join(columns)}, created_at, updated_at) "
+                    f"VALUES ({', '.join(['%s'] * len(columns))}, NOW(), NOW())")
+    update_query = (f"UPDATE {table} SET {', '.join(f'{column} = %s' for column in compare)}, updated_at = NOW() "
+                    f"WHERE {date_column} = %s AND id = %s")
+
+    cursor = conn.cursor()
+    try:
+        inserts = dataframe_to_rows(incoming.loc[changes["insert"], columns])
+        for start in range(0, len(inserts), batch_size):
+            cursor.executemany(insert_query, inserts[start:start + batch_size])
+
+        labels = [label for label, _ in changes["update"]]
+        values = dataframe_to_rows(incoming.loc[labels, compare])
+        updates = [row + (trade_date, row_id) for row, (_, row_id) in zip(values, changes["update"])]
+        for start in range(0, len(updates), batch_size):
+            cursor.executemany(update_query, updates[start:start + batch_size])
+
+        for start in range(0, len(changes["delete"]), batch_size):
+            ids = changes["delete"][start:start + batch_size]
+            cursor.execute(f"DELETE FROM {table} WHERE {date_column} = %s AND id IN ({', '.join(['%s'] * len(ids))})",
+                           [trade_date, *ids])
+    finally:
+        cursor.close()
+
+    summary = {
+        "inserted": len(changes["insert"]),
+        "updated": len(changes["update"]),
+        "deleted": len(changes["delete"]),
+        "unchanged": changes["unchanged"],
+        "changed_columns": changes["changed_columns"],
+    }
+    print(f"🔁 Reconciled {table}: {summary['inserted']} inserted, {summary['updated']} updated, "
+          f"{summary['deleted']} deleted, {summary['unchanged']} unchanged.")
+    return {"rows_inserted": summary["inserted"] + summary["updated"], "failed_rows": 0, "errors": [],
+            "changes": summary}
+
+
+def _matchable(df, scope, values, key):
+    """True when every row of `df` belongs to the day/cell being reconciled and has a distinct key."""
+    for column, value in zip(scope, values):
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.date
+        if not (series.astype(object) == value).all():
+            return False
+    return not df.duplicated(key).any()
+
+
+def _normalized(df, columns, reference):
+    """
+    Comparable copy of `columns`: dates as datetime64, numbers as floats rounded to DECIMAL_PLACES,
+    everything else as text. Types follow the incoming frame `reference`, so stored DECIMAL/date
+    values compare equal to the parsed values they were written from.
+    """
+    out = pd.DataFrame(index=df.index)
+    for column in columns:
+        kind = reference[column]
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(kind):
+            out[column] = pd.to_datetime(series, errors="coerce")
+        elif pd.api.types.is_numeric_dtype(kind):
+            out[column] = pd.to_numeric(series, errors="coerce").astype("float64").round(DECIMAL_PLACES)
+        else:
+            out[column] = series.astype("str").where(series.notna())
+    return out
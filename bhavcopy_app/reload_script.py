@@ -2,49 +2,84 @@ import pandas as pd
 import zipfile
 import io
 import os
+import re
 from datetime import datetime
 from bhavcopy_app.mcxdownloader import get_bhavcopy_data
-from config import DB_CONFIG, BASE_URLS
+from bhavcopy_app.exchange_sessions import SESSION_POOL, is_blocked
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC, content_checksum, get_loaded_checksum, record_bhavcopy_load
+from bhavcopy_app.bulk_loader import dataframe_to_rows, executemany_batches, load_data_infile, timed_load
+from bhavcopy_app.raw_cache import RAW_CACHE
+from bhavcopy_app.reconcile import reconcile_bhavcopy
+from bhavcopy_app.db_pool import connection
+from bhavcopy_app.caching import invalidate_date
+from bhavcopy_app.daily_aggregates import compute_daily_aggregates, store_daily_aggregates
+from bhavcopy_app.continuous_futures import refresh_continuous_futures
+from bhavcopy_app.metrics import stage_timer
+from bhavcopy_app.bhavcopy_schema import SchemaValidationError, coerce, get_schema, reader_dtypes, validate
+from config import (BASE_URLS, DATA_DIR, INGEST_BATCH_SIZE, INGEST_USE_LOAD_DATA, INGEST_RECONCILE, INGEST_DAILY_AGGREGATES,
+                    KEEP_EXTRACTED_FILES)
 import time
-import mysql.connector
-import numpy as np
 import requests
 
-DATA_DIR = "D:/bhavcopy_data/"
+# BhavCopy CSV columns, in the order they are written to the BhavCopy table
+BHAVCOPY_COLUMNS = [
+    "TradDt", "BizDt", "Sgmt", "Src", "FinInstrmTp", "FinInstrmId", "ISIN",
+    "TckrSymb", "SctySrs", "XpryDt", "FininstrmActlXpryDt", "StrkPric", "OptnTp",
+    "FinInstrmNm", "OpnPric", "HghPric", "LwPric", "ClsPric", "LastPric", "PrvsClsgPric",
+    "UndrlygPric", "SttlmPric", "OpnIntrst", "ChngInOpnIntrst", "TtlTradgVol",
+    "TtlTrfVal", "TtlNbOfTxsExctd", "SsnId", "NewBrdLotQty", "Rmks", "Rsvd1", "Rsvd2", "Rsvd3", "Rsvd4",
+]
+
+# Upserts on the natural key uq_bhavcopy_natural (TradDt, Sgmt, Src, FinInstrmId, SsnId)
+BHAVCOPY_INSERT_QUERY = """
+    INSERT INTO BhavCopy (
+        TradDt, BizDt, Sgmt, Src, FinInstrmTp, FinInstrmId, ISIN,
+        TckrSymb, SctySrs, XpryDt, FininstrmActlXpryDt, StrkPric, OptnTp,
+        FinInstrmNm, OpnPric, HghPric, LwPric, ClsPric, LastPric, PrvsClsgPric,
+        UndrlygPric, SttlmPric, OpnIntrst, ChngInOpnIntrst, TtlTradgVol,
+        TtlTrfVal, TtlNbOfTxsExctd, SsnId, NewBrdLotQty, Rmks, Rsvd1, Rsvd2, Rsvd3, Rsvd4,
+        created_at, updated_at
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
+    )
+    ON DUPLICATE KEY UPDATE
+        BizDt = VALUES(BizDt),
+        FinInstrmTp = VALUES(FinInstrmTp),
+        ISIN = VALUES(ISIN),
+        TckrSymb = VALUES(TckrSymb),
+        SctySrs = VALUES(SctySrs),
+        XpryDt = VALUES(XpryDt),
+        FininstrmActlXpryDt = VALUES(FininstrmActlXpryDt),
+        StrkPric = VALUES(StrkPric),
+        OptnTp = VALUES(OptnTp),
+        FinInstrmNm = VALUES(FinInstrmNm),
+        OpnPric = VALUES(OpnPric),
+        HghPric = VALUES(HghPric),
+        LwPric = VALUES(LwPric),
+        ClsPric = VALUES(ClsPric),
+        LastPric = VALUES(LastPric),
+        PrvsClsgPric = VALUES(PrvsClsgPric),
+        UndrlygPric = VALUES(UndrlygPric),
+        SttlmPric = VALUES(SttlmPric),
+        OpnIntrst = VALUES(OpnIntrst),
+        ChngInOpnIntrst = VALUES(ChngInOpnIntrst),
+        TtlTradgVol = VALUES(TtlTradgVol),
+        TtlTrfVal = VALUES(TtlTrfVal),
+        TtlNbOfTxsExctd = VALUES(TtlNbOfTxsExctd),
+        NewBrdLotQty = VALUES(NewBrdLotQty),
+        Rmks = VALUES(Rmks),
+        Rsvd1 = VALUES(Rsvd1),
+        Rsvd2 = VALUES(Rsvd2),
+        Rsvd3 = VALUES(Rsvd3),
+        Rsvd4 = VALUES(Rsvd4),
+        updated_at = NOW()
+"""
 
 def fetch_cookies(src):
-    """Fetch cookies from NSE or BSE to establish a valid session."""
+    """Return the shared, warmed-up session for NSE or BSE, reusing its cookies and keep-alive connections."""
     try:
-        session = requests.Session()
-
-        if src == "NSE":
-            session.get("https://www.nseindia.com", headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.6834.110 Safari/537.36"
-            })
-
-        elif src == "BSE":
-            headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.6834.110 Safari/537.36",
-            "Referer": "https://www.bseindia.com/markets/MarketInfo/BhavCopy.aspx",
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "X-Requested-With": "XMLHttpRequest"
-        }
-
-            # Step 1: Visit the BSE homepage
-            session.get("https://www.bseindia.com", headers=headers)
-
-            # Step 2: Visit Market Info to establish session
-            response = session.get("https://www.bseindia.com/markets/MarketInfo/BhavCopy.aspx", headers=headers)
-
-            if response.status_code == 200:
-                print("✅ BSE Cookies Fetched Successfully!")
-                return session  # Return full session instead of just cookies
-            else:
-                print(f"⚠️ Warning: Unexpected response from BSE ({response.status_code}).")
-                return None
-
-        return session
+        return SESSION_POOL.get(src)
     except requests.RequestException as e:
         print(f"❌ Failed to fetch cookies for {src}: {e}")
         return None
@@ -71,175 +106,291 @@ def get_headers(src):
         "Referrer-Policy": "strict-origin-when-cross-origin"
     }
 
-def clean_data(df):
-    """Clean and preprocess the DataFrame."""
-    try:
-        # Replace NaN values with a default value (e.g., None for MySQL compatibility)
-        #df = df.fillna(None)
-        
-        # Ensure numeric columns are properly handled
-        numeric_columns = ['TtlTrfVal', 'TtlNbOfTxsExctd']
-        for column in numeric_columns:
-            if column in df.columns:
-                df[column] = df[column].apply(lambda x: float(x) if pd.notna(x) else None)
-
-        return df
-    except Exception as e:
-        print(f"Error in clean_data: {e}")
-        raise
-
-
-def reload_data_for_date(date_str, sgmt="CM", src="NSE"):
-    """Reload data for the specified date with detailed error handling and MySQL insertion."""
+def clean_data(df, sgmt="CM", src="NSE"):
+    """
+    Coerce the DataFrame to the declared schema for `sgmt`/`src` (see bhavcopy_app.bhavcopy_schema).
+
+    All conversions are vectorized. Unparseable values in nullable columns become NULL and rows with
+    nulls in non-nullable columns are dropped; both are reported per column.
+
+    Returns:
+        tuple: (cleaned DataFrame, {column: {"nulled": n} and/or {"rejected_rows": n}})
+    Raises:
+        SchemaValidationError: when required columns are missing.
+    """
+    schema = get_schema(sgmt, src)
+    column_errors = {}
+    for column, count in coerce(df, schema).items():
+        column_errors.setdefault(column, {})["nulled"] = count
+    df, rejected = validate(df, schema)
+    for column, count in rejected.items():
+        column_errors.setdefault(column, {})["rejected_rows"] = count
+    if column_errors:
+        print(f"⚠️ Schema issues by column: {column_errors}")
+    return df, column_errors
+
+
+def report_progress(progress, stage, **counters):
+    """Forward a stage change to an optional progress callback (see bhavcopy_app.jobs)."""
+    if progress:
+        progress(stage, **counters)
+
+
+def read_bhavcopy_csv(content, src, sgmt, date_str_formatted, extract_dir=None, dtype=None):
+    """
+    Parse a downloaded BhavCopy into a DataFrame without touching the disk.
+
+    NSE files are zips: the CSV member is found by pattern and streamed from memory into the parser.
+    BSE files are plain CSV. When `extract_dir` is given, a copy of the CSV is also written there.
+    `dtype` is passed to pd.read_csv (see bhavcopy_schema.reader_dtypes).
+    """
+    if src == "NSE":
+        with zipfile.ZipFile(io.BytesIO(content)) as z:
+            members = [name for name in z.namelist() if name.lower().endswith(".csv")]
+            preferred = [name for name in members if re.search(rf"BhavCopy_NSE_{sgmt}_", name, re.IGNORECASE)]
+            if not members:
+                raise FileNotFoundError(f"No CSV member found in the {src} {sgmt} zip for {date_str_formatted}.")
+            member = (preferred or members)[0]
+            print(f"CSV member located: {member}")
+            if extract_dir:
+                z.extract(member, extract_dir)
+            with z.open(member) as csv_file:
+                return pd.read_csv(csv_file, dtype=dtype)
+
+    if extract_dir:
+        os.makedirs(extract_dir, exist_ok=True)
+        file_path = os.path.join(extract_dir, f"BhavCopy_{src}_{sgmt}_{date_str_formatted}.csv")
+        with open(file_path, "wb") as f:
+            f.write(content)
+        print(f"File saved successfully for {date_str_formatted} at {file_path}")
+    return pd.read_csv(io.BytesIO(content), dtype=dtype)
+
+
+# Attempts per download; request errors back off 1s, 2s, ... between them
+DOWNLOAD_ATTEMPTS = 3
+# download_outcome() result asking for a fresh exchange session before the next attempt
+REFRESH_SESSION = "refresh_session"
+
+
+def download_outcome(response, src, date_str_formatted):
+    """
+    Classify one download attempt; shared by download_file and async_downloads.download_file_async.
+
+    Returns the (content, error) result to hand back, REFRESH_SESSION when the exchange blocked the
+    session, or None to simply try again.
+    """
+    if response.status_code == 404:
+        return None, {"success": False, "not_found": True,
+                      "error": f"❌ File for {date_str_formatted} not found on {src} server."}
+    if is_blocked(response):
+        print(f"🚫 Access denied ({response.status_code}) for {date_str_formatted}. Retrying with a fresh {src} session...")
+        return REFRESH_SESSION
+    if response.status_code == 200:
+        print(f"✅ File downloaded successfully for {date_str_formatted}.")
+        return response.content, None
+    print(f"⚠️ Unexpected response ({response.status_code}) for {date_str_formatted}.")
+    return None
+
+
+def download_backoff(attempt):
+    """Seconds to wait after a request error on `attempt` (0-based), or None once attempts are used up."""
+    return 2 ** attempt if attempt < DOWNLOAD_ATTEMPTS - 1 else None
+
+
+def download_failure(src, date_str_formatted, response=None, timed_out=False):
+    """(None, error) result of a download that used up its attempts; `response` is the last one."""
+    if timed_out:
+        return None, {"success": False, "error": f"❌ Timeout after multiple retries for {date_str_formatted}."}
+    if response is not None and is_blocked(response):
+        print(f"🚫 Error: {src} blocked access for {date_str_formatted}.")
+        return None, {"success": False, "error": f"{src} blocked access for {date_str_formatted}."}
+    status_code = response.status_code if response is not None else "no response"
+    return None, {"success": False, "error": f"Download failed for {date_str_formatted} ({status_code})."}
+
+
+def download_file(file_url, src, date_str_formatted, progress=None):
+    """
+    Download a BhavCopy file with the shared exchange session, retrying with backoff.
+
+    Returns:
+        tuple: (content bytes, None) on success, or (None, error result dict).
+    """
+    report_progress(progress, "cookies")
+    session = fetch_cookies(src)
+    if not session:
+        return None, {"success": False, "error": f"Failed to fetch cookies from {src}."}
+
+    headers = get_headers(src)
+
+    # Attempt to download the file with retry logic
+    report_progress(progress, "download")
+    response = None
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        try:
+            # Use the shared session, which already carries the exchange cookies
+            response = session.get(file_url, headers=headers, timeout=30)
+        except requests.RequestException:
+            delay = download_backoff(attempt)
+            if delay is None:
+                return download_failure(src, date_str_formatted, timed_out=True)
+            time.sleep(delay)
+            continue
+
+        outcome = download_outcome(response, src, date_str_formatted)
+        if outcome is REFRESH_SESSION:
+            session = SESSION_POOL.refresh(src, stale=session)
+        elif outcome is not None:
+            return outcome
+
+    return download_failure(src, date_str_formatted, response)
+
+
+def reload_data_for_date(date_str, sgmt="CM", src="NSE", batch_size=INGEST_BATCH_SIZE, use_load_data=None,
+                         progress=None, force=False, reconcile=None, content=None):
+    """
+    Reload data for the specified date with detailed error handling and MySQL insertion.
+
+    Rows are written in batches of `batch_size`, either via multi-row executemany or, when
+    `use_load_data` is set (default: config.INGEST_USE_LOAD_DATA), via LOAD DATA LOCAL INFILE.
+    `progress(stage, rows_inserted=None, error=None)` is called as the reload moves through its stages.
+    The raw file is served from RAW_CACHE when present, and the insert is skipped when its checksum
+    matches the last successful load; `force=True` re-downloads and re-inserts regardless.
+    When `reconcile` is set (default: config.INGEST_RECONCILE) and the cell already has rows, only the
+    inserts, updates and deletes needed to match the file are written, summarised under "changes".
+    `content` is the raw file when the caller already has it (see bhavcopy_app.async_downloads); the
+    cache lookup and download are then skipped.
+    Per-stage timings and byte/row counters go to bhavcopy_app.metrics; the result carries the
+    timings as "stage_seconds".
+    """
+    timer, owned = stage_timer(src, sgmt, progress)
+    result = _reload_data_for_date(date_str, sgmt, src, batch_size, use_load_data, timer, force, reconcile, content)
+    return timer.finish(result) if owned else result
+
+
+def _reload_data_for_date(date_str, sgmt, src, batch_size, use_load_data, progress, force, reconcile, content):
+    """reload_data_for_date without the reload-level metrics; `progress` is its StageTimer."""
     try:
         # Format date for NSE URL
         reload_date = datetime.strptime(date_str, '%Y-%m-%d')
         date_str_formatted = reload_date.strftime("%Y%m%d")
         print(f"Starting reload for date: {date_str} (formatted: {date_str_formatted})")
 
-        # Fetch cookies
-        session = fetch_cookies(src)
-        if not session:
-            return {"success": False, "error": f"Failed to fetch cookies from {src}."}
-
-        # Define headers
-        headers = get_headers(src)
-
         # Determine the correct file URL
         url_key = f"{sgmt}_{src}"  # Example: CM_NSE, FO_NSE, CD_NSE
         if url_key not in BASE_URLS:
             print(f"Error: No matching URL for segment {sgmt} and source {src}")
             return {"success": False, "error": f"No URL defined for Sgmt={sgmt}, Src={src}"}
-        
-        # File download URL
-        file_url = BASE_URLS[url_key].format(date=date_str_formatted)
-
-        print(f"Selected URL: {file_url}")
 
-        # Attempt to download the file with retry logic
-        # Attempt to download the file with retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Use the same session and headers from fetching cookies
-                response = session.get(file_url, headers=headers, cookies=session.cookies, timeout=30)
-
-                if response.status_code == 200:
-                    print(f"✅ File downloaded successfully for {date_str_formatted}.")
-                    break
-                elif response.status_code == 403:
-                    print(f"🚫 Forbidden (403) error for {date_str_formatted}. Retrying with updated session...")
-                    cookies = fetch_cookies(src)  # Re-fetch cookies and try again
-                elif response.status_code == 404:
-                    return {"success": False, "error": f"❌ File for {date_str_formatted} not found on {src} server."}
-
-            except requests.RequestException:
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    return {"success": False, "error": f"❌ Timeout after multiple retries for {date_str_formatted}."}
-                
-        # Check if the response contains an error page
-        if b"Access Denied" in response.content or b"403 Forbidden" in response.content:
-            print(f"🚫 Error: BSE blocked access for {date_str_formatted}.")
-            return {"success": False, "error": f"BSE blocked access for {date_str_formatted}."}
-
-        # Extract the file
-        output_dir = os.path.join(DATA_DIR, date_str_formatted)
-        os.makedirs(output_dir, exist_ok=True)
-
-        if src == "NSE":
+        # Use the archived copy unless a fresh download is forced
+        if content is None and not force:
+            report_progress(progress, "cache")
+            content = RAW_CACHE.get(src, sgmt, date_str_formatted)
+            if content is not None:
+                print(f"📦 Using cached {src} {sgmt} file for {date_str_formatted}.")
+                progress.count("bhavcopy_ingest_bytes_total", len(content), source="cache")
+        if content is None:
+            file_url = BASE_URLS[url_key].format(date=date_str_formatted)
+            print(f"Selected URL: {file_url}")
+            content, error = download_file(file_url, src, date_str_formatted, progress)
+            if error:
+                return error
+            RAW_CACHE.put(src, sgmt, date_str_formatted, content)
+            progress.count("bhavcopy_ingest_bytes_total", len(content), source="download")
+        checksum = content_checksum(content)
+
+        # Skip the database entirely when this exact file is what was last loaded
+        if not force:
+            report_progress(progress, "checksum")
+            with connection() as conn:
+                loaded_checksum = get_loaded_checksum(conn, reload_date.date(), sgmt, src)
+            if loaded_checksum == checksum:
+                print(f"⏭️ {src} {sgmt} file for {date_str_formatted} unchanged since the last load, skipping insert.")
+                return {"success": True, "skipped": True, "rows_inserted": 0,
+                        "message": f"Data for {date_str_formatted} is already up to date."}
+
+        # Parse the CSV straight from the downloaded bytes
+        report_progress(progress, "parse")
+        extract_dir = os.path.join(DATA_DIR, date_str_formatted) if KEEP_EXTRACTED_FILES else None
+        schema = get_schema(sgmt, src)
+        try:
             try:
-                with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-                    z.extractall(output_dir)
-                print(f"File extracted successfully for {date_str_formatted}.")
-            except zipfile.BadZipFile:
-                print(f"BadZipFile error occurred while extracting {date_str_formatted}.")
-                return {"success": False, "error": "Failed to extract ZIP file. File might be corrupted."}
-        elif src == "BSE":
-            file_name = f"BhavCopy_{src}_{sgmt}_{date_str_formatted}.csv"
-            file_path = os.path.join(output_dir, file_name)
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-            print(f"File saved successfully for {date_str_formatted} at {file_path}")
-
-        # Locate the specific downloaded CSV file
-        if src == "NSE":
-            csv_file = os.path.join(output_dir, f"BhavCopy_NSE_{sgmt}_0_0_0_{date_str_formatted}_F_0000.csv")
-        elif src == "BSE":
-            csv_file = os.path.join(output_dir, f"BhavCopy_{src}_{sgmt}_{date_str_formatted}.csv")
-
-        if not os.path.exists(csv_file):
-            print(f"No matching CSV file found for {date_str_formatted}.")
-            return {"success": False, "error": f"No matching CSV file found for {date_str_formatted}."}
-        print(f"CSV file located: {csv_file}")
-
-        # Insert data into MySQL database
-        df = pd.read_csv(csv_file)
-        df = clean_data(df)
+                df = read_bhavcopy_csv(content, src, sgmt, date_str_formatted, extract_dir, reader_dtypes(schema))
+            except (ValueError, TypeError):
+                # A malformed number fails the typed parse: read numbers as text and let clean_data null them per column
+                print(f"⚠️ Typed parse failed for {date_str_formatted}, re-reading numeric columns as text.")
+                df = read_bhavcopy_csv(content, src, sgmt, date_str_formatted, extract_dir,
+                                       reader_dtypes(schema, typed=False))
+        except zipfile.BadZipFile:
+            print(f"BadZipFile error occurred while extracting {date_str_formatted}.")
+            RAW_CACHE.discard(src, sgmt, date_str_formatted)
+            return {"success": False, "error": "Failed to extract ZIP file. File might be corrupted."}
+        except FileNotFoundError as e:
+            print(e)
+            return {"success": False, "error": str(e)}
+
+        df.columns = df.columns.str.strip()
+        parsed_rows = len(df)
+        progress.count("bhavcopy_ingest_rows_total", parsed_rows, kind="parsed")
+        report_progress(progress, "clean")
+        try:
+            df, column_errors = clean_data(df, sgmt, src)
+        except SchemaValidationError as e:
+            return {"success": False, "error": f"CSV for {date_str_formatted} does not match the {sgmt}/{src} schema: {e}",
+                    "column_errors": e.errors}
         print(f"Data cleaned for {date_str_formatted}. Preparing for database insertion...")
-        
-        with mysql.connector.connect(**DB_CONFIG) as conn:
-            cursor = conn.cursor()
-            for _, row in df.iterrows():
-                try:
-                    # Replace NaN values with None for MySQL compatibility
-                    row = row.replace({np.nan: None})
-                    cursor.execute("""
-                                                INSERT INTO BhavCopy (
-                            TradDt, BizDt, Sgmt, Src, FinInstrmTp, FinInstrmId, ISIN,
-                            TckrSymb, SctySrs, XpryDt, FininstrmActlXpryDt, StrkPric, OptnTp,
-                            FinInstrmNm, OpnPric, HghPric, LwPric, ClsPric, LastPric, PrvsClsgPric,
-                            UndrlygPric, SttlmPric, OpnIntrst, ChngInOpnIntrst, TtlTradgVol,
-                            TtlTrfVal, TtlNbOfTxsExctd, SsnId, NewBrdLotQty, Rmks, Rsvd1, Rsvd2, Rsvd3, Rsvd4, 
-                            created_at, updated_at
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
-                        )
-                        ON DUPLICATE KEY UPDATE
-                            TradDt = VALUES(TradDt),
-                            BizDt = VALUES(BizDt),
-                            Sgmt = VALUES(Sgmt),
-                            Src = VALUES(Src),
-                            FinInstrmTp = VALUES(FinInstrmTp),
-                            ISIN = VALUES(ISIN),
-                            TckrSymb = VALUES(TckrSymb),
-                            SctySrs = VALUES(SctySrs),
-                            XpryDt = VALUES(XpryDt),
-                            FininstrmActlXpryDt = VALUES(FininstrmActlXpryDt),
-                            StrkPric = VALUES(StrkPric),
-                            OptnTp = VALUES(OptnTp),
-                            FinInstrmNm = VALUES(FinInstrmNm),
-                            OpnPric = VALUES(OpnPric),
-                            HghPric = VALUES(HghPric),
-                            LwPric = VALUES(LwPric),
-                            ClsPric = VALUES(ClsPric),
-                            LastPric = VALUES(LastPric),
-                            PrvsClsgPric = VALUES(PrvsClsgPric),
-                            UndrlygPric = VALUES(UndrlygPric),
-                            SttlmPric = VALUES(SttlmPric),
-                            OpnIntrst = VALUES(OpnIntrst),
-                            ChngInOpnIntrst = VALUES(ChngInOpnIntrst),
-                            TtlTradgVol = VALUES(TtlTradgVol),
-                            TtlTrfVal = VALUES(TtlTrfVal),
-                            TtlNbOfTxsExctd = VALUES(TtlNbOfTxsExctd),
-                            SsnId = VALUES(SsnId),
-                            NewBrdLotQty = VALUES(NewBrdLotQty),
-                            Rmks = VALUES(Rmks),
-                            Rsvd1 = VALUES(Rsvd1),
-                            Rsvd2 = VALUES(Rsvd2),
-                            Rsvd3 = VALUES(Rsvd3),
-                            Rsvd4 = VALUES(Rsvd4),
-                            updated_at = NOW();
-                    """, tuple(row))
-                except mysql.connector.Error as e:
-                    print(f"Error inserting/updating row: {row} - {e}")
-            conn.commit()
+        progress.count("bhavcopy_ingest_rows_total", parsed_rows - len(df), kind="rejected")
 
+        # Market aggregates come from the parsed day while it is in memory; a failure here must not block the load
+        aggregates = None
+        if INGEST_DAILY_AGGREGATES:
+            report_progress(progress, "aggregate")
+            try:
+                aggregates = compute_daily_aggregates(df)
+            except Exception as e:
+                print(f"⚠️ Could not compute daily aggregates for {date_str_formatted}: {e}")
+
+        if use_load_data is None:
+            use_load_data = INGEST_USE_LOAD_DATA
+        if reconcile is None:
+            reconcile = INGEST_RECONCILE
+        rows = df.reindex(columns=BHAVCOPY_COLUMNS)
+        report_progress(progress, "insert")
+
+        with connection(allow_local_infile=use_load_data) as conn:
+            # A corrected republish only touches the rows that changed; a first load goes in bulk
+            load_stats = None
+            if reconcile:
+                load_stats = timed_load(reconcile_bhavcopy, conn, rows, reload_date.date(), sgmt, src, batch_size)
+            if load_stats is None:
+                if use_load_data:
+                    load_stats = timed_load(load_data_infile, conn, "BhavCopy", BHAVCOPY_COLUMNS, rows, batch_size)
+                else:
+                    load_stats = timed_load(executemany_batches, conn, BHAVCOPY_INSERT_QUERY,
+                                            dataframe_to_rows(rows), batch_size)
+            all_failed = load_stats["rows_inserted"] == 0 and load_stats["failed_rows"]
+            if not all_failed:
+                if aggregates:
+                    store_daily_aggregates(conn, reload_date.date(), sgmt, src, *aggregates)
+                # Keep the dashboard's load_status summary in step with the rows just written. Batches commit
+                # one by one, so after a partial failure the checksum is left out and the next reload retries the day
+                record_bhavcopy_load(conn, reload_date.date(), sgmt, src,
+                                     checksum if load_stats["failed_rows"] == 0 else None)
+        invalidate_date("bhavcopy", reload_date.date())
+
+        report_progress(progress, "insert", rows_inserted=load_stats["rows_inserted"])
+        progress.count("bhavcopy_ingest_rows_total", load_stats["rows_inserted"], kind="inserted")
+        progress.count("bhavcopy_ingest_rows_total", load_stats["failed_rows"], kind="failed")
+        print(f"Inserted {load_stats['rows_inserted']} rows for {date_str_formatted} "
+              f"({load_stats['rows_per_sec']} rows/sec, {load_stats['failed_rows']} failed).")
+        if all_failed:
+            return {"success": False, "error": f"All batches failed for {date_str_formatted}: {load_stats['errors'][0]['error']}",
+                    "column_errors": column_errors, **load_stats}
 
         print(f"Data for {date_str_formatted} successfully inserted into the database.")
-        return {"success": True, "message": f"Data for {date_str_formatted} successfully reloaded."}
+        report_progress(progress, "continuous_futures")
+        continuous_futures = refresh_continuous_futures(sgmt, src, reload_date.date())
+        return {"success": True, "message": f"Data for {date_str_formatted} successfully reloaded.",
+                "column_errors": column_errors, "continuous_futures": continuous_futures, **load_stats}
 
     except Exception as e:
         print(f"Unexpected error occurred for {date_str}: {e}")
@@ -261,7 +412,7 @@ if __name__ == "__main__":
 
 
 ################################################################## MCX.html START ######################################################
-def reload_data_for_date_mcx(date_str):
+def reload_data_for_date_mcx(date_str, progress=None):
     """Reload data for the specified date with detailed error handling and MySQL insertion."""
     try:
         # Format date for NSE URL
@@ -269,9 +420,14 @@ def reload_data_for_date_mcx(date_str):
         date_str_formatted = reload_date.strftime("%Y%m%d")
         print(f"Starting reload for date: {date_str} (formatted: {date_str_formatted})")
 
-        get_bhavcopy_data(date_str_formatted)
+        result = get_bhavcopy_data(date_str_formatted, progress=progress)
+        if not result["success"]:
+            return result
+        invalidate_date("mcx", reload_date.date())
+        continuous_futures = refresh_continuous_futures(MCX_SGMT, MCX_SRC, reload_date.date())
 
-        return {"success": True, "message": f"Data for {date_str_formatted} successfully reloaded."}
+        return {"success": True, "message": f"Data for {date_str_formatted} successfully reloaded.",
+                "continuous_futures": continuous_futures, **result}
 
     except Exception as e:
         print(f"Unexpected error occurred for {date_str}: {e}")
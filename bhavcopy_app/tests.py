@@ -1,3 +1,882 @@
-from django.test import TestCase
+import calendar
+import gzip
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import asyncio
+import mysql.connector
+import numpy as np
+import pandas as pd
+import requests
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from mysql.connector.errors import PoolError
+
+from bhavcopy_app import bhavcopy_schema, db_pool, export, jobs, middleware, price_history, raw_cache, reload_script
+from bhavcopy_app.bhavcopy_schema import coerce, get_schema, SchemaValidationError, validate
+from bhavcopy_app.bulk_loader import dataframe_to_rows
+from bhavcopy_app.caching import DateRangeCache
+from bhavcopy_app.continuous_futures import choose_contract, roll_day
+from bhavcopy_app.daily_aggregates import compute_daily_aggregates
+from bhavcopy_app.db_pool import ConnectionPool
+from bhavcopy_app.json_stream import ArrayNotFound, iter_array_items
+from bhavcopy_app.management.commands.backfill import BackfillState, RateLimiter
+from bhavcopy_app.management.utils import parse_date
+from bhavcopy_app.mcxdownloader import records_to_frame
+from bhavcopy_app.metrics import MetricsRegistry
+from bhavcopy_app.middleware import RequestProfiler, time_query
+from bhavcopy_app.option_chain import pivot_chain
+from bhavcopy_app.raw_cache import RawFileCache
+from bhavcopy_app.reconcile import diff
+from bhavcopy_app.views import paginate_coverage
+
+
+class DataframeToRowsTests(SimpleTestCase):
+    def test_missing_values_become_none(self):
+        df = pd.DataFrame({
+            "day": pd.to_datetime(["2025-01-02", None, "2025-01-02"]),
+            "price": [1.5, np.nan, 3.0],
+            "count": pd.array([1, None, 3], dtype="Int64"),
+            "text": ["a", None, np.nan],
+            "category": pd.Categorical(["x", None, "y"]),
+        })
+        rows = dataframe_to_rows(df)
+        self.assertEqual(rows[1], (None, None, None, None, None))
+        self.assertEqual(rows[0][0], date(2025, 1, 2))
+        self.assertIs(type(rows[0][0]), date)
+        self.assertEqual(rows[0][1:], (1.5, 1, "a", "x"))
+        self.assertEqual(rows[2][3], None)
+        self.assertFalse(any(isinstance(value, float) and math.isnan(value) for row in rows for value in row))
+
+    def test_empty_frame(self):
+        self.assertEqual(dataframe_to_rows(pd.DataFrame({"a": []})), [])
+
+
+def build_coverage_list(date_range, segments, sources, db_results, status):
+    """The list get_data built before paginate_coverage: every record of the grid, then sliced."""
+    def missing(day, segment, source):
+        return {"TradDt": day, "Weekday": calendar.day_name[day.weekday()], "Sgmt": segment, "Src": source,
+                "RecordCount": 0, "Status": "Failed/Not Present"}
+
+    final_results = []
+    if status == "Success":
+        for record in db_results:
+            if record["RecordCount"] > 0:
+                record["Weekday"] = calendar.day_name[record["TradDt"].weekday()]
+                final_results.append(record)
+    elif status == "Failed/Not Present":
+        for day in date_range:
+            for segment in segments:
+                for source in sources:
+                    if not any(record["TradDt"] == day and record["Sgmt"] == segment and record["Src"] == source
+                               for record in db_results):
+                        final_results.append(missing(day, segment, source))
+    else:
+        for day in date_range:
+            for segment in segments:
+                for source in sources:
+                    match = next((record for record in db_results if record["TradDt"] == day
+                                  and record["Sgmt"] == segment and record["Src"] == source), None)
+                    if match:
+                        match["Weekday"] = calendar.day_name[match["TradDt"].weekday()]
+                        final_results.append(match)
+                    else:
+                        final_results.append(missing(day, segment, source))
+    return final_results
+
+
+class PaginateCoverageTests(SimpleTestCase):
+    segments = ["CM", "FO", "CD"]
+    sources = ["NSE", "BSE"]
+    start = date(2025, 1, 1)
+    num_days = 9
+
+    def setUp(self):
+        combos = [(segment, source) for segment in self.segments for source in self.sources]
+        self.db_results = [
+            {"TradDt": self.start + timedelta(days=index // len(combos)), "Sgmt": combo[0], "Src": combo[1],
+             "RecordCount": 100 + index, "Status": "Success"}
+            for index, combo in enumerate(combos * self.num_days)
+            if index % 4 != 1 and index // len(combos) != 3  # Scattered gaps plus one whole missing day
+        ]
+
+    def paginate(self, status, page, page_size):
+        combos = [(segment, source) for segment in self.segments for source in self.sources]
+        present = {(record["TradDt"], record["Sgmt"], record["Src"]): record for record in self.db_results}
+
+        def missing_record(day, combo):
+            return {"TradDt": day, "Weekday": calendar.day_name[day.weekday()], "Sgmt": combo[0], "Src": combo[1],
+                    "RecordCount": 0, "Status": "Failed/Not Present"}
+
+        return paginate_coverage(self.start, self.num_days, combos, present, status, page, page_size, "TradDt",
+                                 missing_record)
+
+    def test_pages_match_the_full_list(self):
+        date_range = [self.start + timedelta(days=day) for day in range(self.num_days)]
+        for status in ("Success", "Failed/Not Present", "All"):
+            expected = build_coverage_list(date_range, self.segments, self.sources, self.db_results, status)
+            for page_size in (1, 4, 10, 25):
+                pages = (len(expected) + page_size - 1) // page_size
+                for page in range(1, pages + 2):
+                    with self.subTest(status=status, page_size=page_size, page=page):
+                        records, total_pages = self.paginate(status, page, page_size)
+                        self.assertEqual(total_pages, pages)
+                        self.assertEqual(records, expected[(page - 1) * page_size:page * page_size])
+
+    def test_empty_range(self):
+        self.num_days, self.db_results = 0, []
+        self.assertEqual(self.paginate("All", 1, 10), ([], 0))
+        self.assertEqual(self.paginate("Failed/Not Present", 1, 10), ([], 0))
+
+
+class ReloadJobDedupeTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = []
+        self.forced = {}
+        self.addCleanup(self.release.set)
+        patches = [mock.patch.object(jobs, "async_downloads_enabled", return_value=False),
+                   mock.patch.object(jobs, "reload_data_for_date", self.fake_reload)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_reload(self, date, sgmt, src, progress=None, force=False, **options):
+        self.started.append(date)
+        self.forced[date] = force
+        self.release.wait(5)
+        return {"success": True, "message": "ok"}
+
+    def wait_for(self, condition):
+        for _ in range(500):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail("Timed out waiting for the reload workers.")
+
+    def test_force_upgrades_a_queued_duplicate(self):
+        # Occupy every worker so the next job stays queued
+        busy = [jobs.submit_reload(f"2001-01-{day:02d}", "CM", "NSE")[0] for day in range(1, jobs.RELOAD_WORKERS + 1)]
+        self.wait_for(lambda: len(self.started) == len(busy))
+        queued, created = jobs.submit_reload("2001-02-01", "FO", "NSE")
+        self.assertTrue(created)
+
+        again, created = jobs.submit_reload("2001-02-01", "FO", "NSE", force=True)
+        self.assertIs(again, queued)
+        self.assertFalse(created)
+        self.assertTrue(queued.force)
+
+        self.release.set()
+        self.wait_for(lambda: queued.status == jobs.SUCCEEDED)
+        self.assertTrue(self.forced["2001-02-01"])
+
+    def test_force_conflicts_with_a_running_reload(self):
+        running, _ = jobs.submit_reload("2001-03-01", "CM", "BSE")
+        self.wait_for(lambda: running.status == jobs.RUNNING)
+        with self.assertRaises(jobs.JobConflict):
+            jobs.submit_reload("2001-03-01", "CM", "BSE", force=True)
+        self.assertEqual(jobs.submit_reload("2001-03-01", "CM", "BSE"), (running, False))
+        self.release.set()
+        self.wait_for(lambda: running.status == jobs.SUCCEEDED)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_spaces_request_starts(self):
+        clock = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(round(seconds, 6))
+            clock[0] += seconds
+
+        limiter = RateLimiter(0.5)
+        with mock.patch.object(time, "monotonic", lambda: clock[0]), mock.patch.object(time, "sleep", sleep):
+            limiter.wait()
+            limiter.wait()
+            clock[0] += 0.2
+            limiter.wait()
+            clock[0] += 5  # Idle for longer than the interval: no catching up with a burst
+            limiter.wait()
+            limiter.wait()
+        self.assertEqual(sleeps, [0.5, 0.3, 0.5])
+
+
+class BackfillStateTests(SimpleTestCase):
+    def test_marks_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.json")
+            state = BackfillState(path)
+            self.assertEqual(state.done, {})
+            state.mark("2025-01-02|FO|NSE", "loaded")
+            state.mark("2025-01-03|FO|NSE", "not_found")
+
+            resumed = BackfillState(path)
+            self.assertEqual(resumed.done, {"2025-01-02|FO|NSE": "loaded", "2025-01-03|FO|NSE": "not_found"})
+            self.assertEqual(os.listdir(directory), ["state.json"])  # The temporary file was renamed into place
+
+
+class RawFileCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = RawFileCache(directory.name)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("NSE", "FO", "20250102"))
+        checksum = self.cache.put("NSE", "FO", "20250102", b"csv,data\n")
+        self.assertEqual(self.cache.get("NSE", "FO", "20250102"), b"csv,data\n")
+        path = self.cache.path("NSE", "FO", "20250102")
+        with open(f"{path}.sha256", encoding="ascii") as f:
+            self.assertEqual(f.read(), checksum)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(path))), ["20250102.gz", "20250102.gz.sha256"])
+        self.assertEqual(self.cache.stats()["NSE"],
+                         {"hits": 1, "misses": 1, "corrupt": 0, "stores": 1, "hit_rate": 0.5})
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("NSE", "FO", "20250102", b"original")
+        with gzip.open(self.cache.path("NSE", "FO", "20250102"), "wb") as f:
+            f.write(b"tampered")
+        self.assertIsNone(self.cache.get("NSE", "FO", "20250102"))
+        self.assertEqual(self.cache.stats()["NSE"]["corrupt"], 1)
+
+    def test_overwrite_between_reads_is_not_corrupt(self):
+        self.cache.put("NSE", "FO", "20250102", b"old")
+        real_open = gzip.open
+        overwritten = []
+
+        def open_after_overwrite(*args, **kwargs):
+            # The sidecar has been read already: replace the whole entry before the archive is
+            if not overwritten:
+                overwritten.append(True)
+                self.cache.put("NSE", "FO", "20250102", b"new")
+            return real_open(*args, **kwargs)
+
+        with mock.patch.object(raw_cache.gzip, "open", open_after_overwrite):
+            self.assertEqual(self.cache.get("NSE", "FO", "20250102"), b"new")
+        self.assertEqual(self.cache.stats()["NSE"]["corrupt"], 0)
+
+    def test_writer_publishes_on_clean_exit_only(self):
+        with self.cache.writer("BSE", "CM", "20250102") as writer:
+            writer.write(b"part one,")
+            writer.write(b"part two")
+        self.assertEqual(self.cache.get("BSE", "CM", "20250102"), b"part one,part two")
+        self.assertEqual(writer.checksum, self.cache.put("BSE", "CM", "20250103", b"part one,part two"))
+
+        with self.assertRaises(ValueError):
+            with self.cache.writer("BSE", "CM", "20250106") as writer:
+                writer.write(b"partial")
+                raise ValueError("connection dropped")
+        self.assertIsNone(self.cache.get("BSE", "CM", "20250106"))
+        self.assertEqual(sorted(os.listdir(os.path.dirname(writer.path))),
+                         ["20250102.gz", "20250102.gz.sha256", "20250103.gz", "20250103.gz.sha256"])
+
+    def test_discard(self):
+        self.cache.put("NSE", "CM", "20250102", b"bad zip")
+        self.cache.discard("NSE", "CM", "20250102")
+        self.assertIsNone(self.cache.get("NSE", "CM", "20250102"))
+        self.assertEqual(os.listdir(os.path.dirname(self.cache.path("NSE", "CM", "20250102"))), [])
+
+
+class BhavcopySchemaTests(SimpleTestCase):
+    schema = {
+        "TradDt": (bhavcopy_schema.DATE, False),
+        "Sgmt": (bhavcopy_schema.CATEGORY, False),
+        "TckrSymb": (bhavcopy_schema.STRING, False),
+        "ClsPric": (bhavcopy_schema.FLOAT, True),
+        "OpnIntrst": (bhavcopy_schema.INT, True),
+    }
+
+    def frame(self):
+        return pd.DataFrame({
+            "TradDt": ["2025-01-02", "02/01/2025", "2025-01-03", None],
+            "Sgmt": ["FO", "FO", None, "FO"],
+            "TckrSymb": ["NIFTY", "BANKNIFTY", "INFY", "TCS"],
+            "ClsPric": [" 101.5 ", "n/a", "99", None],
+            "OpnIntrst": ["10", "2.5", "x", "40"],
+        })
+
+    def test_coerce_nulls_and_counts_bad_values(self):
+        df = self.frame()
+        nulled = coerce(df, self.schema)
+        self.assertEqual(nulled, {"TradDt": 1, "ClsPric": 1, "OpnIntrst": 2})
+        self.assertEqual(df["TradDt"].iloc[0], pd.Timestamp("2025-01-02"))
+        self.assertTrue(pd.isna(df["TradDt"].iloc[1]))
+        self.assertEqual(df["ClsPric"].tolist()[0], 101.5)
+        self.assertEqual(str(df["OpnIntrst"].dtype), "Int64")
+        self.assertEqual(df["OpnIntrst"].tolist()[::3], [10, 40])
+        self.assertIsInstance(df["Sgmt"].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.isna(df["Sgmt"].iloc[2]))
+
+    def test_coerce_leaves_typed_columns_alone(self):
+        df = pd.DataFrame({"ClsPric": [1.0, None], "OpnIntrst": pd.array([1, None], dtype="Int64")})
+        self.assertEqual(coerce(df, self.schema), {})
+        self.assertEqual(str(df["OpnIntrst"].dtype), "Int64")
+
+    def test_validate_drops_rows_missing_required_values(self):
+        df = self.frame()
+        coerce(df, self.schema)
+        valid, rejected = validate(df, self.schema)
+        self.assertEqual(rejected, {"TradDt": 2, "Sgmt": 1})
+        self.assertEqual(valid["TckrSymb"].tolist(), ["NIFTY"])
+
+    def test_validate_rejects_missing_columns(self):
+        with self.assertRaises(SchemaValidationError) as raised:
+            validate(self.frame().drop(columns=["ClsPric", "Sgmt"]), self.schema)
+        self.assertEqual(raised.exception.errors, {"Sgmt": "missing column", "ClsPric": "missing column"})
+
+    def test_derivative_schemas_require_expiry(self):
+        self.assertEqual(get_schema("CM", "NSE")["XpryDt"], (bhavcopy_schema.DATE, True))
+        self.assertEqual(get_schema("FO", "BSE")["XpryDt"], (bhavcopy_schema.DATE, False))
+
+
+class RecordsToFrameTests(SimpleTestCase):
+    def record(self, **overrides):
+        record = {"Date": "01/02/2025", "Symbol": "GOLD", "ExpiryDate": "05FEB2025", "Open": "100.5", "High": 101,
+                  "Low": 99, "Close": 100, "PreviousClose": 98, "Volume": "12", "VolumeInThousands": "0.012",
+                  "Value": 1200.5, "OpenInterest": 40, "DateDisplay": "02 Jan 2025", "InstrumentName": "FUTCOM",
+                  "StrikePrice": None, "OptionType": None}
+        record.update(overrides)
+        return record
+
+    def test_valid_records(self):
+        df, rejects = records_to_frame([self.record(), self.record(Symbol=" SILVER ", Volume=None)])
+        self.assertEqual(rejects, [])
+        self.assertEqual(df["symbol"].tolist(), ["GOLD", "SILVER"])
+        self.assertEqual(df["date"].iloc[0], pd.Timestamp(2025, 1, 2))
+        self.assertEqual(df["expiry_date"].iloc[0], pd.Timestamp(2025, 2, 5))
+        self.assertEqual(str(df["volume"].dtype), "Int64")
+        self.assertTrue(pd.isna(df["volume"].iloc[1]))  # Optional and absent: kept as NULL
+        self.assertTrue(pd.isna(df["strike_price"].iloc[0]))
+
+    def test_rejects(self):
+        records = [self.record(), self.record(Symbol=None), self.record(Open="abc", ExpiryDate="31FOO2025"),
+                   self.record(Symbol="CRUDE")]
+        df, rejects = records_to_frame(records, offset=500)
+        self.assertEqual(df["symbol"].tolist(), ["GOLD", "CRUDE"])
+        self.assertEqual(rejects, [
+            {"index": 501, "symbol": None, "reason": "Symbol=missing"},
+            {"index": 502, "symbol": "GOLD", "reason": "ExpiryDate=31FOO2025; Open=abc"},
+        ])
+
+
+class IterArrayItemsTests(SimpleTestCase):
+    document = ('{"d": {"Summary": {"Count": 3}, "Data": [{"Symbol": "GOLD", "Note": "a, ] b"}, '
+                '{"Symbol": "CRUDEé", "Values": [1, 2.5, null]},\n {"Symbol": "[ZINC]"}]}, "tail": true}')
+    items = [{"Symbol": "GOLD", "Note": "a, ] b"}, {"Symbol": "CRUDEé", "Values": [1, 2.5, None]},
+             {"Symbol": "[ZINC]"}]
+
+    def chunked(self, size):
+        data = self.document.encode("utf-8")
+        return [data[offset:offset + size] for offset in range(0, len(data), size)]
+
+    def test_every_chunk_size(self):
+        # Sizes from 1 byte up split keys, strings, numbers and the two-byte character at every position
+        for size in range(1, len(self.document) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_array_items(self.chunked(size), "Data", parent="d", keep_tail=16)),
+                                 self.items)
+
+    def test_stream_is_drained(self):
+        chunks = iter(self.chunked(7))
+        self.assertEqual(len(list(iter_array_items(chunks, "Data"))), 3)
+        self.assertIsNone(next(chunks, None))
+
+    def test_missing_array(self):
+        with self.assertRaises(ArrayNotFound) as raised:
+            list(iter_array_items(self.chunked(5), "Rows", parent="d"))
+        self.assertTrue(raised.exception.saw_parent)
+        with self.assertRaises(ArrayNotFound) as raised:
+            list(iter_array_items([b'{"error": "none"}'], "Data", parent="d"))
+        self.assertFalse(raised.exception.saw_parent)
+
+    def test_truncated_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_array_items([b'{"Data": [{"a": 1}, {"b"'], "Data"))
+
+
+class ReconcileDiffTests(SimpleTestCase):
+    def test_insert_update_delete_and_unchanged(self):
+        incoming = pd.DataFrame({
+            "FinInstrmId": [1, 2, 3, 5],
+            "SsnId": ["F1", "F1", "F1", "F1"],
+            "ClsPric": [10.0, 20.5, np.nan, 50.0],
+            "TckrSymb": ["A", "B", "C", "E"],
+        })
+        existing = pd.DataFrame({
+            "id": [101, 102, 103, 104, 105],
+            "FinInstrmId": [1, 2, 3, 4, 1],
+            "SsnId": ["F1", "F1", "F1", "F1", "F1"],
+            "ClsPric": [Decimal("10.00"), Decimal("20.00"), None, Decimal("40.00"), Decimal("10.00")],
+            "TckrSymb": ["A", "B", "C", "D", "A"],
+        })
+        result = diff(incoming, existing, ["FinInstrmId", "SsnId"], ["ClsPric", "TckrSymb"])
+
+        self.assertEqual(result["insert"], [3])  # Label of FinInstrmId 5
+        self.assertEqual(result["update"], [(1, 102)])
+        self.assertEqual(sorted(result["delete"]), [104, 105])  # Gone from the file, and a stored duplicate
+        self.assertEqual(result["unchanged"], 2)  # Stored DECIMAL equals the parsed float; NaN equals NULL
+        self.assertEqual(result["changed_columns"], {"ClsPric": 1})
+
+    def test_identical_frames(self):
+        incoming = pd.DataFrame({"FinInstrmId": [1, 2], "SsnId": ["F1", "F1"], "ClsPric": [1.234, 5.0]})
+        existing = incoming.assign(id=[7, 8], ClsPric=[1.23, 5.0])  # Stored at two decimal places
+        result = diff(incoming, existing, ["FinInstrmId", "SsnId"], ["ClsPric"])
+        self.assertEqual((result["insert"], result["update"], result["delete"]), ([], [], []))
+        self.assertEqual(result["unchanged"], 2)
+
+
+class FakeRawConnection:
+    def __init__(self):
+        self.unread_result = False
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+
+class FakePooledConnection:
+    def __init__(self, pool, raw):
+        self.pool = pool
+        self._cnx = raw
+        self.reconnect_error = None
+
+    def is_connected(self):
+        return self._cnx.connected
+
+    def reconnect(self, attempts, delay):
+        if self.reconnect_error:
+            raise self.reconnect_error
+        self._cnx.connected = True
+
+    def close(self):
+        self.pool.idle.append(self._cnx)
+        self._cnx = None
+
+
+class FakeMySQLConnectionPool:
+    def __init__(self, pool_name, pool_size, pool_reset_session, **db_config):
+        self.idle = [FakeRawConnection() for _ in range(pool_size)]
+
+    def get_connection(self):
+        if not self.idle:
+            raise PoolError("Failed getting connection; pool exhausted")
+        return FakePooledConnection(self, self.idle.pop())
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        patch = mock.patch.object(db_pool.pooling, "MySQLConnectionPool", FakeMySQLConnectionPool)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.pool = ConnectionPool("test", 2, 0.05, 60)
+
+    def test_checkout_and_checkin(self):
+        with self.pool.connection(), self.pool.connection():
+            self.assertEqual(self.pool.stats()["in_use"], 2)
+        stats = self.pool.stats()
+        self.assertEqual((stats["checkouts"], stats["in_use"], stats["peak_in_use"]), (2, 0, 2))
+        self.assertEqual(stats["health_checks"], 2)  # Fresh connections are checked once
+
+        with self.pool.connection():
+            pass
+        self.assertEqual(len(self.pool._pool.idle), 2)
+        self.assertEqual(self.pool.stats()["health_checks"], 2)  # Recently used: not pinged again
+
+    def test_exhausted_pool_times_out(self):
+        with self.pool.connection(), self.pool.connection():
+            with self.assertRaises(PoolError):
+                with self.pool.connection():
+                    pass
+        stats = self.pool.stats()
+        self.assertEqual((stats["timeouts"], stats["in_use"]), (1, 0))
+
+    def test_failed_health_check_releases_the_connection(self):
+        with self.pool.connection():
+            pass
+        self.pool._last_used.clear()  # Due for a health check
+
+        def broken_connection():
+            conn = FakePooledConnection(self.pool._pool, self.pool._pool.idle.pop())
+            conn._cnx.connected = False  # The server dropped it while idle
+            conn.reconnect_error = mysql.connector.errors.InterfaceError("Can't connect to MySQL server")
+            return conn
+
+        with mock.patch.object(self.pool._pool, "get_connection", broken_connection):
+            for _ in range(3):  # More attempts than the pool has connections
+                with self.assertRaises(mysql.connector.errors.InterfaceError):
+                    with self.pool.connection():
+                        pass
+        stats = self.pool.stats()
+        self.assertEqual((stats["in_use"], stats["reconnects"]), (0, 3))
+        self.assertEqual(len(self.pool._pool.idle), 2)
+        with self.pool.connection(), self.pool.connection():
+            self.assertEqual(self.pool.stats()["in_use"], 2)
+
+
+class DateRangeCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = DateRangeCache("test", max_entries=3)
+        self.addCleanup(self._unregister)
+
+    def _unregister(self):
+        from bhavcopy_app import caching
+        caching._CACHES.remove(self.cache)
+
+    def test_invalidate_date_drops_covering_entries_only(self):
+        self.cache.set("jan", 1, "bhavcopy", date(2025, 1, 1), date(2025, 1, 31))
+        self.cache.set("feb", 2, "bhavcopy", date(2025, 2, 1), date(2025, 2, 28))
+        self.cache.set("mcx-jan", 3, "mcx", date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(self.cache.invalidate_date("bhavcopy", date(2025, 1, 31)), 1)
+        self.assertIsNone(self.cache.get("jan"))
+        self.assertEqual(self.cache.get("feb"), 2)
+        self.assertEqual(self.cache.get("mcx-jan"), 3)
+
+    def test_invalidate_range(self):
+        self.cache.set("jan", 1, "bhavcopy", date(2025, 1, 1), date(2025, 1, 31))
+        self.cache.set("feb", 2, "bhavcopy", date(2025, 2, 1), date(2025, 2, 28))
+        self.assertEqual(self.cache.invalidate_range("bhavcopy", date.min, date(2025, 1, 1)), 1)
+        self.assertEqual(self.cache.get("feb"), 2)
+
+    def test_stale_version_is_not_stored(self):
+        version = self.cache.version("bhavcopy")
+        self.cache.invalidate_date("bhavcopy", date(2025, 1, 2))  # A reload lands while the value is computed
+        self.cache.set("jan", 1, "bhavcopy", date(2025, 1, 1), date(2025, 1, 31), version)
+        self.assertIsNone(self.cache.get("jan"))
+        self.cache.set("jan", 1, "bhavcopy", date(2025, 1, 1), date(2025, 1, 31), self.cache.version("bhavcopy"))
+        self.assertEqual(self.cache.get("jan"), 1)
+
+    def test_lru_eviction(self):
+        for key in "abc":
+            self.cache.set(key, key, "mcx", date(2025, 1, 1), date(2025, 1, 1))
+        self.cache.get("a")
+        self.cache.set("d", "d", "mcx", date(2025, 1, 1), date(2025, 1, 1))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), "a")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+
+class ExportEncoderTests(SimpleTestCase):
+    columns = ["TradDt", "TckrSymb", "ClsPric", "OpnIntrst"]
+    chunks = [[(date(2025, 1, 2), "NIFTY", Decimal("23500.05"), 100)],
+              [(date(2025, 1, 3), "A, B \"quoted\"", None, None), (date(2025, 1, 3), "INFY", Decimal("1.5"), 7)]]
+
+    def test_csv_chunks(self):
+        output = list(export.csv_chunks(self.columns, iter(self.chunks)))
+        self.assertEqual(output, [
+            "TradDt,TckrSymb,ClsPric,OpnIntrst\r\n",
+            "2025-01-02,NIFTY,23500.05,100\r\n",
+            "2025-01-03,\"A, B \"\"quoted\"\"\",,\r\n2025-01-03,INFY,1.5,7\r\n",
+        ])
+
+    def test_ndjson_chunks(self):
+        output = list(export.ndjson_chunks(self.columns, iter(self.chunks)))
+        self.assertEqual(len(output), 2)
+        records = [json.loads(line) for chunk in output for line in chunk.splitlines()]
+        self.assertEqual(records[0], {"TradDt": "2025-01-02", "TckrSymb": "NIFTY", "ClsPric": 23500.05,
+                                      "OpnIntrst": 100})
+        self.assertEqual(records[1]["ClsPric"], None)
+        self.assertEqual(records[1]["TckrSymb"], "A, B \"quoted\"")
+
+    def test_ndjson_rejects_unknown_types(self):
+        with self.assertRaises(TypeError):
+            list(export.ndjson_chunks(["value"], [[(object(),)]]))
+
+    def test_export_query(self):
+        query, params = export.export_query("bhavcopy", "2025-01-01", "2025-01-31", ["FO", "CM"], ["NSE"])
+        self.assertTrue(query.endswith("FROM BhavCopy WHERE TradDt BETWEEN %s AND %s AND Sgmt IN (%s, %s) "
+                                       "AND Src IN (%s) ORDER BY TradDt"))
+        self.assertEqual(params, ["2025-01-01", "2025-01-31", "FO", "CM", "NSE"])
+
+        query, params = export.export_query("mcx", "2025-01-01", "2025-01-31", ["FO"], ["NSE"])
+        self.assertTrue(query.endswith("FROM bhav_mcx WHERE date BETWEEN %s AND %s ORDER BY date"))
+        self.assertEqual(params, ["2025-01-01", "2025-01-31"])
+
+    def test_export_chunks_streams_the_query(self):
+        with mock.patch.object(export, "iter_row_chunks", return_value=iter(self.chunks[:1])) as rows:
+            output = "".join(export.export_chunks("mcx", "csv", "2025-01-01", "2025-01-31", chunk_size=10))
+        _, params, chunk_size = rows.call_args.args
+        self.assertEqual((params, chunk_size), (["2025-01-01", "2025-01-31"], 10))
+        self.assertEqual(output.splitlines()[0], ",".join(export.DATASETS["mcx"][1]))
+
+
+class PriceHistoryTests(SimpleTestCase):
+    def setUp(self):
+        price_history.HISTORY_CACHE.clear()
+        self.addCleanup(price_history.HISTORY_CACHE.clear)
+        self.model = mock.Mock()
+        self.query = self.model.objects.filter.return_value.exclude.return_value.order_by.return_value
+        spec = price_history.SERIES[("bhavcopy", "symbol")]
+        patch = mock.patch.dict(price_history.SERIES, {("bhavcopy", "symbol"): (self.model, *spec[1:])})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def rows(self, symbol, days):
+        columns = price_history.SERIES[("bhavcopy", "symbol")][5]
+        return [(symbol, date(2024, 1, 1), *[None] * (len(columns) - 1)) for _ in range(days)]
+
+    def history(self, *symbols):
+        return price_history.get_price_history("bhavcopy", "symbol", list(symbols), date(2024, 1, 1),
+                                               date(2024, 12, 31), {"Sgmt": "FO"})
+
+    def test_symbol_series_exclude_options(self):
+        self.query.values_list.return_value = self.rows("NIFTY", 2)
+        series, cache = self.history("NIFTY", "BANKNIFTY")
+        self.model.objects.filter.return_value.exclude.assert_called_once_with(OptnTp__in=["CE", "PE"])
+        self.assertEqual(series["NIFTY"]["TradDt"], ["2024-01-01", "2024-01-01"])
+        self.assertEqual(series["BANKNIFTY"]["TradDt"], [])
+        self.assertEqual(cache, {"hits": 0, "misses": 2})
+        self.assertEqual(self.history("NIFTY", "BANKNIFTY")[1], {"hits": 2, "misses": 0})
+
+    def test_long_series_are_not_cached(self):
+        long_rows = self.rows("NIFTY", price_history.PRICE_HISTORY_CACHE_MAX_ROWS + 1)
+        self.query.values_list.return_value = long_rows + self.rows("TCS", 3)
+        self.history("NIFTY", "TCS")
+        self.query.values_list.return_value = long_rows
+        self.assertEqual(self.history("NIFTY", "TCS")[1], {"hits": 1, "misses": 1})
+
+
+class PivotChainTests(SimpleTestCase):
+    fields = ["oi", "chg", "vol", "close"]
+
+    def test_pivot(self):
+        df = pd.DataFrame({
+            "strike": [110, 100, 100, 110, 100, 120],
+            "type": ["CE", "PE", "CE", "PE", "CE", "CE"],
+            "oi": [30, 20, 10, 40, 5, 1],
+            "chg": [3, -2, 1, -4, 0, 1],
+            "vol": [9, 8, 7, 10, 1, 2],
+            "close": [3.5, 2.5, 1.5, 4.5, 1.25, 0.5],
+            "spot": [105.0] * 6,
+        })
+        chain = pivot_chain(df, "strike", "type", self.fields, "spot")
+        self.assertEqual(chain["strikes"], [100, 110, 120])
+        self.assertEqual(chain["CE"], {"oi": [15, 30, 1], "chg_oi": [1, 3, 1], "volume": [8, 9, 2],
+                                       "close": [1.25, 3.5, 0.5]})
+        self.assertEqual(chain["PE"], {"oi": [20, 40, None], "chg_oi": [-2, -4, None], "volume": [8, 10, None],
+                                       "close": [2.5, 4.5, None]})
+        self.assertEqual(chain["underlying_price"], 105.0)
+        self.assertEqual(chain["total_oi"], {"CE": 46, "PE": 60})
+        self.assertEqual(chain["pcr"], round(60 / 46, 4))
+
+    def test_missing_field(self):
+        df = pd.DataFrame({"strike": [100], "type": ["CE"], "oi": [10], "vol": [1], "close": [2.0]})
+        chain = pivot_chain(df, "strike", "type", ["oi", None, "vol", "close"])
+        self.assertEqual(chain["CE"]["chg_oi"], [None])
+        self.assertIsNone(chain["underlying_price"])
+        self.assertEqual(chain["pcr"], 0.0)  # No PE open interest
+        self.assertIsNone(pivot_chain(df.assign(type="PE"), "strike", "type", self.fields[:1] + [None] * 3)["pcr"])
+
+    def test_empty(self):
+        df = pd.DataFrame(columns=["strike", "type", "oi", "chg", "vol", "close", "spot"])
+        chain = pivot_chain(df, "strike", "type", self.fields, "spot")
+        self.assertEqual(chain["strikes"], [])
+        self.assertEqual(chain["CE"], {"oi": [], "chg_oi": [], "volume": [], "close": []})
+        self.assertEqual(chain["total_oi"], {"CE": 0, "PE": 0})
+        self.assertIsNone(chain["pcr"])
+        self.assertIsNone(chain["underlying_price"])
+
+
+class DailyAggregatesTests(SimpleTestCase):
+    def test_summary_and_movers(self):
+        df = pd.DataFrame({
+            "FinInstrmId": [1, 2, 3, 4, 5],
+            "TckrSymb": ["A", "B", "C", "D", "E"],
+            "ClsPric": [110.0, 90.0, 50.0, np.nan, 30.0],
+            "PrvsClsgPric": [100.0, 100.0, 50.0, 10.0, 20.0],
+            "TtlTradgVol": [10, 20, 30, None, 40],
+            "TtlTrfVal": [1000.0, 5000.0, 300.0, np.nan, 2000.0],
+            "TtlNbOfTxsExctd": [1, 2, 3, 4, 5],
+            "OpnIntrst": [None] * 5,
+        })
+        summary, movers = compute_daily_aggregates(df, top_n=2)
+        self.assertEqual(summary, {"instruments": 5, "advances": 2, "declines": 1, "unchanged": 1,
+                                   "total_volume": 100, "total_turnover": 8300.0, "total_trades": 15,
+                                   "total_open_interest": None})
+        self.assertEqual([mover[:4] for mover in movers], [
+            ("gainer", 1, 5, "E"), ("gainer", 2, 1, "A"),
+            ("loser", 1, 2, "B"),
+            ("turnover", 1, 2, "B"), ("turnover", 2, 5, "E"),
+        ])
+        self.assertEqual(movers[0][-2:], (50.0, 2000.0))  # pct_change, TtlTrfVal
+
+    def test_empty_day(self):
+        df = pd.DataFrame(columns=["FinInstrmId", "TckrSymb", "ClsPric", "PrvsClsgPric", "TtlTradgVol", "TtlTrfVal",
+                                   "TtlNbOfTxsExctd", "OpnIntrst"])
+        summary, movers = compute_daily_aggregates(df)
+        self.assertEqual(summary["instruments"], 0)
+        self.assertIsNone(summary["total_turnover"])
+        self.assertEqual(movers, [])
+
+
+class ParseDateTests(SimpleTestCase):
+    def test_parse_date(self):
+        self.assertEqual(parse_date("2025-01-02"), date(2025, 1, 2))
+        self.assertIsNone(parse_date(None))
+        with self.assertRaisesMessage(CommandError, "Invalid date '02-01-2025', expected YYYY-MM-DD."):
+            parse_date("02-01-2025")
+
+
+def contract(expiry, close, oi, volume, contract_id=None):
+    return {"root": "NIFTY", "expiry_date": expiry, "contract_id": contract_id, "open_price": close,
+            "high_price": close, "low_price": close, "close_price": close, "settle_price": None, "volume": volume,
+            "open_interest": oi}
+
+
+class RollDayTests(SimpleTestCase):
+    jan, feb, mar = date(2025, 1, 30), date(2025, 2, 27), date(2025, 3, 27)
+
+    def test_oi_roll_adjusts_forward(self):
+        states = {}
+        day1 = roll_day(date(2025, 1, 27), [contract(self.feb, 210, 50, 5), contract(self.jan, 200, 100, 9)],
+                        ["oi"], states)
+        self.assertEqual(len(day1), 1)
+        root, rule, day, expiry = day1[0][:4]
+        self.assertEqual((root, rule, day, expiry), ("NIFTY", "oi", date(2025, 1, 27), self.jan))
+        self.assertEqual(day1[0][-2:], (Decimal(0), False))
+
+        day2 = roll_day(date(2025, 1, 28), [contract(self.jan, 205, 150, 9), contract(self.feb, 212, 200, 5)],
+                        ["oi"], states)
+        self.assertEqual(day2[0][3], self.feb)
+        self.assertEqual(day2[0][-2:], (Decimal(-7), True))  # Old close minus new close, both on the roll day
+        self.assertEqual(states[("NIFTY", "oi")], (self.feb, 212, Decimal(-7)))
+
+        # Open interest swinging back never returns the series to an earlier expiry
+        day3 = roll_day(date(2025, 1, 29), [contract(self.jan, 206, 900, 9), contract(self.feb, 214, 200, 5)],
+                        ["oi"], states)
+        self.assertEqual(day3[0][3], self.feb)
+        self.assertEqual(day3[0][-2:], (Decimal(-7), False))
+
+    def test_days_rule_and_expiry_day(self):
+        contracts = [contract(self.jan, 200, 100, 9), contract(self.feb, 210, 50, 5), contract(self.mar, 220, 1, 1)]
+        self.assertEqual(choose_contract(contracts, None, "days:3", date(2025, 1, 26))["expiry_date"], self.jan)
+        self.assertEqual(choose_contract(contracts, None, "days:3", date(2025, 1, 27))["expiry_date"], self.feb)
+        # On its expiry day a contract is left for the next one even under oi
+        self.assertEqual(choose_contract(contracts, self.jan, "oi", self.jan)["expiry_date"], self.feb)
+
+    def test_rules_are_independent(self):
+        states = {}
+        rows = roll_day(date(2025, 1, 28), [contract(self.jan, 200, 100, 1), contract(self.feb, 210, 50, 9)],
+                        ["oi", "volume"], states)
+        self.assertEqual({row[1]: row[3] for row in rows}, {"oi": self.jan, "volume": self.feb})
+
+    def test_unknown_rule(self):
+        with self.assertRaises(ValueError):
+            roll_day(date(2025, 1, 28), [contract(self.jan, 200, 100, 1)], ["weekly"], {})
+
+
+class DownloadFileTests(SimpleTestCase):
+    def download(self, *responses):
+        session = mock.Mock()
+        session.get.side_effect = responses
+        pool = mock.Mock()
+        pool.refresh.return_value = session
+        with mock.patch.object(reload_script, "fetch_cookies", return_value=session), \
+                mock.patch.object(reload_script, "SESSION_POOL", pool), \
+                mock.patch.object(reload_script.time, "sleep") as sleep:
+            result = reload_script.download_file("https://example.test/file.zip", "NSE", "20250102")
+        return result, pool.refresh.call_count, [call.args[0] for call in sleep.call_args_list]
+
+    def response(self, status_code, content=b""):
+        return mock.Mock(status_code=status_code, content=content)
+
+    def test_blocked_session_is_refreshed(self):
+        result, refreshes, _ = self.download(self.response(403), self.response(200, b"zip bytes"))
+        self.assertEqual((result, refreshes), ((b"zip bytes", None), 1))
+
+    def test_not_found(self):
+        (content, error), _, _ = self.download(self.response(404))
+        self.assertIsNone(content)
+        self.assertTrue(error["not_found"])
+
+    def test_request_errors_back_off_then_time_out(self):
+        (content, error), _, sleeps = self.download(*[requests.ConnectionError()] * 3)
+        self.assertEqual(sleeps, [1, 2])
+        self.assertEqual(error["error"], "❌ Timeout after multiple retries for 20250102.")
+
+    def test_failure_reports_the_last_response(self):
+        (_, error), _, _ = self.download(*[self.response(500)] * 3)
+        self.assertEqual(error, {"success": False, "error": "Download failed for 20250102 (500)."})
+        (_, error), refreshes, _ = self.download(*[self.response(200, b"<html>Access Denied</html>")] * 3)
+        self.assertEqual((error["error"], refreshes), ("NSE blocked access for 20250102.", 3))
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    definitions = {
+        "test_seconds": ("histogram", "Test durations."),
+        "test_total": ("counter", "Test events."),
+        "test_unused_total": ("counter", "Never recorded."),
+    }
+
+    def test_render(self):
+        registry = MetricsRegistry(self.definitions, [1, 0.1, 0.5])
+        registry.observe("test_seconds", 0.3, stage="parse", exchange="NSE")
+        registry.observe("test_seconds", 0.5, stage="parse", exchange="NSE")
+        registry.observe("test_seconds", 2.5, stage="parse", exchange="NSE")
+        registry.inc("test_total", exchange="NSE")
+        registry.inc("test_total", 4, exchange="NSE")
+        registry.inc("test_total", 1.5, exchange='say "hi"\n')
+
+        self.assertEqual(registry.render(), "\n".join([
+            "# HELP test_seconds Test durations.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{exchange="NSE",stage="parse",le="0.1"} 0',
+            'test_seconds_bucket{exchange="NSE",stage="parse",le="0.5"} 2',
+            'test_seconds_bucket{exchange="NSE",stage="parse",le="1"} 2',
+            'test_seconds_bucket{exchange="NSE",stage="parse",le="+Inf"} 3',
+            'test_seconds_sum{exchange="NSE",stage="parse"} 3.3',
+            'test_seconds_count{exchange="NSE",stage="parse"} 3',
+            "# HELP test_total Test events.",
+            "# TYPE test_total counter",
+            'test_total{exchange="NSE"} 5',
+            'test_total{exchange="say \\"hi\\"\\n"} 1.5',
+            "# HELP test_unused_total Never recorded.",
+            "# TYPE test_unused_total counter",
+        ]) + "\n")
+
+    def test_undeclared_metric(self):
+        registry = MetricsRegistry(self.definitions, [1])
+        with self.assertRaises(KeyError):
+            registry.inc("test_seconds")  # Declared, but as a histogram
+        with self.assertRaises(KeyError):
+            registry.observe("missing_seconds", 1)
+
+
+class RequestProfilerTests(SimpleTestCase):
+    def view(self, request):
+        for _ in range(3):
+            time_query(lambda sql, params, many, context: None, "SELECT 1", None, False, {})
+        return HttpResponse("ok")
+
+    def test_server_timing_counts_queries(self):
+        response = RequestProfiler(self.view)(RequestFactory().get("/app2/history/"))
+        self.assertRegex(response["Server-Timing"], r'^app;dur=\d+\.\d, db;dur=\d+\.\d;desc="3 queries"$')
+
+    def test_queries_outside_a_request_are_not_counted(self):
+        self.assertEqual(time_query(lambda *args: "rows", "SELECT 1", None, False, {}), "rows")
+        response = RequestProfiler(lambda request: HttpResponse("ok"))(RequestFactory().get("/"))
+        self.assertIn('desc="0 queries"', response["Server-Timing"])
+
+    def test_async_views(self):
+        async def view(request):
+            return self.view(request)
+
+        response = asyncio.run(RequestProfiler(view)(RequestFactory().get("/")))
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    def test_slow_requests_are_logged(self):
+        with mock.patch.object(middleware, "PROFILE_SLOW_REQUEST_MS", -1), \
+                self.assertLogs("bhavcopy_app.middleware", "WARNING") as logs:
+            RequestProfiler(self.view)(RequestFactory().get("/app2/history/?symbols=NIFTY"))
+        self.assertRegex(logs.output[0], r"^WARNING:bhavcopy_app.middleware:Slow request GET /app2/history/\?symbols=NIFTY: "
+                                         r"\d+\.\d ms, 3 queries")
+
+        with self.assertNoLogs("bhavcopy_app.middleware", "WARNING"):
+            RequestProfiler(self.view)(RequestFactory().get("/"))
@@ -1,12 +1,28 @@
 from django.urls import path
 from . import views
+from config import ASYNC_VIEWS
+
+# Under asgi.py the dashboard data and reload URLs use async views, so they never wait for a free sync thread
+data_view, data_mcx_view = (views.get_data_async, views.get_data_mcx_async) if ASYNC_VIEWS else (views.get_data, views.get_data_mcx)
+reload_view, reload_mcx_view = ((views.reload_date_async, views.reload_date_mcx_async) if ASYNC_VIEWS
+                                else (views.reload_date, views.reload_date_mcx))
 
 urlpatterns = [
     path('', views.index, name='index'),  # Add this line for the root URL
-    path('app2/data/', views.get_data, name='get_data'),
-    path('app2/reload/<str:date>/', views.reload_date, name='reload_date'),
+    path('app2/data/', data_view, name='get_data'),
+    path('app2/reload/<str:date>/', reload_view, name='reload_date'),
     path('app2/mcx/', views.mcx_page, name='mcx_page'),
-    path('app2/data/mcx/', views.get_data_mcx, name='get_data_mcx'),
-    path('app2/reload/mcx/<str:date>/', views.reload_date_mcx, name='reload_date_mcx'),
+    path('app2/data/mcx/', data_mcx_view, name='get_data_mcx'),
+    path('app2/reload/mcx/<str:date>/', reload_mcx_view, name='reload_date_mcx'),
+    path('app2/jobs/<str:job_id>/', views.job_status, name='job_status'),
+    path('app2/raw-cache/stats/', views.raw_cache_stats, name='raw_cache_stats'),
+    path('app2/db-pool/stats/', views.db_pool_stats, name='db_pool_stats'),
+    path('app2/history/', views.price_history, name='price_history'),
+    path('app2/option-chain/', views.option_chain, name='option_chain'),
+    path('app2/aggregates/', views.daily_aggregates, name='daily_aggregates'),
+    path('app2/continuous-futures/', views.continuous_futures, name='continuous_futures'),
+    path('app2/export/', views.export_data, name='export_data'),
+    path('app2/cache/stats/', views.response_cache_stats, name='response_cache_stats'),
+    path('metrics', views.metrics, name='metrics'),
 ]
 
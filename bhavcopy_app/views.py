@@ -1,11 +1,24 @@
 import json
 import logging
 from datetime import datetime, timedelta
-from django.http import JsonResponse
-from django.db.models import Count, Value, Case, When, CharField
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import F, Value, Case, When, CharField
 from django.shortcuts import render
-from bhavcopy_app.reload_script import reload_data_for_date, reload_data_for_date_mcx
+from bhavcopy_app.jobs import submit_reload, submit_reload_mcx, get_job
+from bhavcopy_app.load_status import MCX_SGMT, MCX_SRC
+from bhavcopy_app.raw_cache import RAW_CACHE
+from bhavcopy_app.db_pool import DB_POOL
+from bhavcopy_app.caching import RESPONSE_CACHE, cache_stats
+from bhavcopy_app.export import DATASETS, FORMATS, export_chunks
+from bhavcopy_app.price_history import SERIES, get_price_history
+from bhavcopy_app.option_chain import CHAINS, get_option_chain, nearest_expiry
+from bhavcopy_app.metrics import REGISTRY
 import calendar
+from collections import Counter, defaultdict
+from decimal import Decimal
+from config import DASHBOARD_PAGE_SIZE, DASHBOARD_MAX_PAGE_SIZE, EXPORT_MAX_DAYS, PRICE_HISTORY_MAX_SERIES, PRICE_HISTORY_MAX_DAYS
+from config import DAILY_AGGREGATES_MAX_DAYS, CONTINUOUS_FUTURES_RULES
 
 from bhavcopy_app import models
 
@@ -18,102 +31,197 @@ def index(request):
 
 def get_data(request):
     try:
-        # Get query parameters
-        page = int(request.GET.get("page", 1))
-        start_date = request.GET.get("start_date")
-        end_date = request.GET.get("end_date")
-        status = request.GET.get("status", "All")
-        sgmt = request.GET.get("sgmt", "All")
-        src = request.GET.get("src", "All")
-
-        logger.debug(f"Request parameters - page: {page}, start_date: {start_date}, end_date: {end_date}, status: {status}, sgmt: {sgmt}, src: {src}")
-
-        # Parse date range
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date and start_date != "null" else (datetime.today() - timedelta(days=30)).date()
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date and end_date != "null" else datetime.today().date()
-
-        logger.debug(f"Parsed date range - start_date: {start_date}, end_date: {end_date}")
-
-        # Date range
-        date_range = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
-
-        # Filter segments and sources
-        segments = ["CM", "FO", "CD"] if sgmt == "All" else [sgmt]
-        sources = ["NSE", "BSE"] if src == "All" else [src]
-
-        # Fetch data from the database
-        db_results = fetch_database_results(start_date, end_date, segments, sources)
-
-        final_results = []
-        seen_records = set()  # To track unique records
-
-        # Apply status filter
-        if status == "Success":
-            # Only include records with status "Success"
-            filtered_results = [record for record in db_results if record["RecordCount"] > 0]
-            for record in filtered_results:
-                record["Weekday"] = calendar.day_name[record["TradDt"].weekday()]
-                final_results.append(record)
-        elif status == "Failed/Not Present":
-            # Include default records for missing data
-            for date in date_range:
-                for segment in segments:
-                    for source in sources:
-                        record_key = (date, segment, source)
-                        if not any(record["TradDt"] == date and record["Sgmt"] == segment and record["Src"] == source for record in db_results):
-                            final_results.append({
-                                "TradDt": date,
-                                "Weekday": calendar.day_name[date.weekday()],
-                                "Sgmt": segment,
-                                "Src": source,
-                                "RecordCount": 0,
-                                "Status": "Failed/Not Present"
-                            })
-        else:  # Status == "All"
-            # Include both database records and missing data
-            for date in date_range:
-                for segment in segments:
-                    for source in sources:
-                        matching_record = next((record for record in db_results if record["TradDt"] == date and record["Sgmt"] == segment and record["Src"] == source), None)
-                        if matching_record:
-                            matching_record["Weekday"] = calendar.day_name[matching_record["TradDt"].weekday()]
-                            final_results.append(matching_record)
-                        else:
-                            final_results.append({
-                                "TradDt": date,
-                                "Weekday": calendar.day_name[date.weekday()],
-                                "Sgmt": segment,
-                                "Src": source,
-                                "RecordCount": 0,
-                                "Status": "Failed/Not Present"
-                            })
-
-        # Pagination
-        items_per_page = 10
-        total_pages = (len(final_results) + items_per_page - 1) // items_per_page
-        start_index = (page - 1) * items_per_page
-        end_index = start_index + items_per_page
-        paginated_results = final_results[start_index:end_index]
-
-        # Adjust response data for pagination
-        response_data = {
-            "current_page": page,
-            "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_previous": page > 1,
-            "results": paginated_results,
-        }
+        params = get_data_params(request)
+        cached = RESPONSE_CACHE.get(params["cache_key"])
+        if cached is not None:
+            return cached_json_response(cached)
+        cache_version = RESPONSE_CACHE.version("bhavcopy")
+
+        # Fetch data from the database, keyed by grid cell
+        db_results = fetch_database_results(params["start_date"], params["end_date"], params["segments"], params["sources"])
+        return get_data_response(params, db_results, cache_version)
+
+    except Exception as e:
+        logger.error("Error in get_data: %s", e, exc_info=True)
+        return JsonResponse({"error": "An error occurred while fetching data."}, status=500)
+
+
+async def get_data_async(request):
+    """get_data for ASGI: cache hits are answered on the event loop, misses await the async ORM."""
+    try:
+        params = get_data_params(request)
+        cached = RESPONSE_CACHE.get(params["cache_key"])
+        if cached is not None:
+            return cached_json_response(cached)
+        cache_version = RESPONSE_CACHE.version("bhavcopy")
 
-        return JsonResponse(response_data, safe=False)
+        db_results = await afetch_database_results(params["start_date"], params["end_date"], params["segments"], params["sources"])
+        return get_data_response(params, db_results, cache_version)
 
     except Exception as e:
-        logger.error(f"Error in get_data: {e}", exc_info=True)
+        logger.error("Error in get_data_async: %s", e, exc_info=True)
         return JsonResponse({"error": "An error occurred while fetching data."}, status=500)
 
 
+def get_data_params(request):
+    """Parsed get_data query parameters, with the response cache key."""
+    # Get query parameters
+    page = int(request.GET.get("page", 1))
+    start_date = request.GET.get("start_date")
+    end_date = request.GET.get("end_date")
+    status = request.GET.get("status", "All")
+    sgmt = request.GET.get("sgmt", "All")
+    src = request.GET.get("src", "All")
+
+    logger.debug("Request parameters - page: %s, start_date: %s, end_date: %s, status: %s, sgmt: %s, src: %s", page, start_date, end_date, status, sgmt, src)
+
+    # Parse date range
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date and start_date != "null" else (datetime.today() - timedelta(days=30)).date()
+    end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date and end_date != "null" else datetime.today().date()
+
+    logger.debug("Parsed date range - start_date: %s, end_date: %s", start_date, end_date)
+
+    page_size = get_page_size(request)
+
+    # Filter segments and sources
+    segments = ["CM", "FO", "CD"] if sgmt == "All" else [sgmt]
+    sources = ["NSE", "BSE"] if src == "All" else [src]
+
+    # Data only changes on reload, which invalidates the cached responses covering the date
+    cache_key = ("get_data", start_date, end_date, status, tuple(segments), tuple(sources), page, page_size)
+    return {"page": page, "start_date": start_date, "end_date": end_date, "status": status, "segments": segments,
+            "sources": sources, "page_size": page_size, "cache_key": cache_key}
+
+
+def get_data_response(params, db_results, cache_version):
+    """Build one page of the NSE/BSE coverage grid from the load counts and cache its body."""
+    start_date, end_date, page, page_size = params["start_date"], params["end_date"], params["page"], params["page_size"]
+    num_days = (end_date - start_date).days + 1
+    combos = [(segment, source) for segment in params["segments"] for source in params["sources"]]
+    present = {(record["TradDt"], record["Sgmt"], record["Src"]): record for record in db_results}
+
+    def missing_record(date, combo):
+        return {
+            "TradDt": date,
+            "Weekday": calendar.day_name[date.weekday()],
+            "Sgmt": combo[0],
+            "Src": combo[1],
+            "RecordCount": 0,
+            "Status": "Failed/Not Present"
+        }
+
+    paginated_results, total_pages = paginate_coverage(
+        start_date, num_days, combos, present, params["status"], page, page_size, "TradDt", missing_record
+    )
+
+    # Adjust response data for pagination
+    response_data = {
+        "current_page": page,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_previous": page > 1,
+        "results": paginated_results,
+    }
+
+    response = JsonResponse(response_data, safe=False)
+    RESPONSE_CACHE.set(params["cache_key"], response.content, "bhavcopy", start_date, end_date, cache_version)
+    response["X-Cache"] = "MISS"
+    return response
+
+
+def cached_json_response(content):
+    """Serve a JSON body stored in RESPONSE_CACHE."""
+    response = HttpResponse(content, content_type="application/json")
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def get_page_size(request):
+    """Page size from the optional `page_size` parameter, bounded by config.DASHBOARD_MAX_PAGE_SIZE."""
+    try:
+        page_size = int(request.GET.get("page_size", DASHBOARD_PAGE_SIZE))
+    except ValueError:
+        page_size = DASHBOARD_PAGE_SIZE
+    return min(max(page_size, 1), DASHBOARD_MAX_PAGE_SIZE)
+
+
+def paginate_coverage(start_date, num_days, combos, present, status, page, page_size, date_field, missing_record):
+    """
+    Return one page of the (date x combos) coverage grid and the total page count.
+
+    The grid is walked in date order, then combo order, exactly as a fully built list would be,
+    but only the cells on the requested page are materialized.
+
+    Args:
+        start_date (date): First date of the grid.
+        num_days (int): Number of dates in the grid.
+        combos (list): Tuples of the non-date key parts per date, e.g. [("CM", "NSE"), ...] or [()].
+        present (dict): Loaded records keyed by (date, *combo).
+        status (str): "Success", "Failed/Not Present" or "All".
+        page (int): 1-based page number.
+        page_size (int): Records per page.
+        date_field (str): Key of the date in a loaded record, used for its Weekday.
+        missing_record (callable): Builds the placeholder record for a (date, combo) with no data.
+
+    Returns:
+        tuple: (list of records on the page, total number of pages)
+    """
+    num_days = max(num_days, 0)
+    start_index = (page - 1) * page_size
+    end_index = start_index + page_size
+
+    def with_weekday(record):
+        record["Weekday"] = calendar.day_name[record[date_field].weekday()]
+        return record
+
+    if status == "Success":
+        loaded = list(present.values())
+        total = len(loaded)
+        page_records = [with_weekday(record) for record in loaded[max(start_index, 0):max(end_index, 0)]]
+    elif status == "Failed/Not Present":
+        total = num_days * len(combos) - len(present)
+        page_records = []
+        if start_index >= 0:
+            # Skip whole dates using per-date counts, then walk cells from there
+            loaded_per_date = Counter(key[0] for key in present)
+            day, skip = 0, start_index
+            while day < num_days:
+                missing = len(combos) - loaded_per_date.get(start_date + timedelta(days=day), 0)
+                if skip < missing:
+                    break
+                skip -= missing
+                day += 1
+            while day < num_days and len(page_records) < page_size:
+                date = start_date + timedelta(days=day)
+                for combo in combos:
+                    if (date, *combo) in present:
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    page_records.append(missing_record(date, combo))
+                    if len(page_records) == page_size:
+                        break
+                day += 1
+    else:  # Status == "All"
+        total = num_days * len(combos)
+        page_records = []
+        for index in range(max(start_index, 0), min(end_index, total)):
+            date = start_date + timedelta(days=index // len(combos))
+            combo = combos[index % len(combos)]
+            record = present.get((date, *combo))
+            page_records.append(with_weekday(record) if record else missing_record(date, combo))
+
+    total_pages = (total + page_size - 1) // page_size
+    return page_records, total_pages
+
+
 def fetch_database_results(start_date, end_date, segments, sources):
     """
-    Fetch records from the database for the given date range, segments, and sources.
+    Fetch per-cell load counts for the given date range, segments, and sources.
+
+    Counts come from the ingest-maintained load_status table rather than a
+    GROUP BY over the BhavCopy fact table.
 
     Args:
         start_date (date): Start date of the range.
@@ -124,56 +232,282 @@ def fetch_database_results(start_date, end_date, segments, sources):
     Returns:
         list: A list of dictionaries containing the query results.
     """
-    from django.db.models import Case, When, Value, CharField, Count
-
     try:
-        # Query with annotations
-        query = (
-            models.BhavCopy.objects.filter(
-                TradDt__range=(start_date, end_date),
-                Sgmt__in=segments,
-                Src__in=sources,
-            )
-            .values("TradDt", "Sgmt", "Src")
-            .annotate(
-                RecordCount=Count("id"),
-                Status=Case(
-                    When(RecordCount__gt=0, then=Value("Success")),
-                    default=Value("Failed/Not Present"),
-                    output_field=CharField(),
-                )
-            )
-        )
+        results = list(load_status_query(start_date, end_date, segments, sources))
+        logger.debug("Database Results: %s", results)
+        return results
+
+    except Exception as e:
+        logger.error("Error in fetch_database_results: %s", e, exc_info=True)
+        return []
 
-        results = list(query)
-        logger.debug(f"Database Results: {results}")
+
+async def afetch_database_results(start_date, end_date, segments, sources):
+    """fetch_database_results through Django's async ORM."""
+    try:
+        results = [record async for record in load_status_query(start_date, end_date, segments, sources)]
+        logger.debug("Database Results: %s", results)
         return results
 
     except Exception as e:
-        logger.error(f"Error in fetch_database_results: {e}", exc_info=True)
+        logger.error("Error in afetch_database_results: %s", e, exc_info=True)
         return []
 
 
+def load_status_query(start_date, end_date, segments, sources):
+    """Lazy load_status queryset of the loaded NSE/BSE cells, shaped as dashboard records."""
+    return (
+        models.LoadStatus.objects.filter(
+            trade_date__range=(start_date, end_date),
+            sgmt__in=segments,
+            src__in=sources,
+            row_count__gt=0,
+        )
+        .values(TradDt=F("trade_date"), Sgmt=F("sgmt"), Src=F("src"), RecordCount=F("row_count"))
+        .annotate(
+            Status=Case(
+                When(row_count__gt=0, then=Value("Success")),
+                default=Value("Failed/Not Present"),
+                output_field=CharField(),
+            )
+        )
+        .order_by("trade_date", "sgmt", "src")
+    )
+
+
 def reload_date(request, date):
-    """Reload data for a specific date."""
+    """Queue a reload for a specific date; poll job_status with the returned job_id."""
     try:
         # Parse sgmt and src from the request body
         body = json.loads(request.body)
         sgmt = body.get("sgmt", "CM")  # Default to CM if not provided
         src = body.get("src", "NSE")  # Default to NSE if not provided
+        force = bool(body.get("force", False))  # Bypass the raw file cache and unchanged-file skip
 
         print(f"Reloading for Date: {date}, Segment: {sgmt}, Source: {src}")
 
-        result = reload_data_for_date(date, sgmt, src)
-        if result["success"]:
-            return JsonResponse({"success": True, "message": result["message"]})
-        else:
-            return JsonResponse({"success": False, "error": result["error"]})
+        job, created = submit_reload(date, sgmt, src, force=force)
+        return JsonResponse({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "duplicate": not created,
+            "force": job.force,
+            "message": f"Reload for {date} {sgmt}/{src} {'queued' if created else 'already in progress'}.",
+        })
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
 
-# Ensure proper logging setup
-logging.basicConfig(level=logging.DEBUG)
+
+async def reload_date_async(request, date):
+    """reload_date for ASGI: queuing a job never blocks, so it is handled on the event loop."""
+    return reload_date(request, date)
+
+
+def job_status(request, job_id):
+    """Return the status, stage, rows inserted and errors of a reload job."""
+    job = get_job(job_id)
+    if not job:
+        return JsonResponse({"success": False, "error": f"Unknown job {job_id}."}, status=404)
+    return JsonResponse({"success": True, **job.to_dict()})
+
+def raw_cache_stats(request):
+    """Hit/miss counters of the raw download cache in this process."""
+    return JsonResponse({"raw_cache": RAW_CACHE.stats()})
+
+def response_cache_stats(request):
+    """Hit rate, size and invalidations of the in-process response caches."""
+    return JsonResponse({"caches": cache_stats()})
+
+def metrics(request):
+    """Ingest stage latencies and byte/row/reload counters of this process, in Prometheus text format."""
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+def db_pool_stats(request):
+    """Usage of the ingest connection pool in this process, plus Django's persistent-connection settings."""
+    django_db = settings.DATABASES["default"]
+    return JsonResponse({
+        "pool": DB_POOL.stats(),
+        "django": {"conn_max_age": django_db.get("CONN_MAX_AGE"), "conn_health_checks": django_db.get("CONN_HEALTH_CHECKS")},
+    })
+
+def export_data(request):
+    """
+    Stream stored BhavCopy or MCX rows as CSV or NDJSON.
+
+    Query parameters: dataset (bhavcopy | mcx), format (csv | ndjson), start_date and end_date
+    (YYYY-MM-DD, required), and for bhavcopy optional comma-separated sgmt / src lists. Rows are
+    sent as they are read from the database, so the download starts before the query completes.
+    """
+    dataset = request.GET.get("dataset", "bhavcopy")
+    fmt = request.GET.get("format", "csv")
+    if dataset not in DATASETS or fmt not in FORMATS:
+        return JsonResponse({"success": False, "error": f"dataset must be one of {list(DATASETS)} "
+                                                        f"and format one of {list(FORMATS)}."}, status=400)
+    try:
+        start_date = datetime.strptime(request.GET["start_date"], "%Y-%m-%d").date()
+        end_date = datetime.strptime(request.GET["end_date"], "%Y-%m-%d").date()
+    except (KeyError, ValueError):
+        return JsonResponse({"success": False, "error": "start_date and end_date (YYYY-MM-DD) are required."}, status=400)
+    if not 0 <= (end_date - start_date).days < EXPORT_MAX_DAYS:
+        return JsonResponse({"success": False, "error": f"Date range must be ordered and at most {EXPORT_MAX_DAYS} days."},
+                            status=400)
+
+    segments = [value for value in request.GET.get("sgmt", "").split(",") if value and value != "All"]
+    sources = [value for value in request.GET.get("src", "").split(",") if value and value != "All"]
+    response = StreamingHttpResponse(export_chunks(dataset, fmt, start_date, end_date, segments, sources),
+                                     content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{dataset}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{fmt}"'
+    return response
+
+def price_history(request):
+    """
+    Columnar daily OHLC / OI / volume history for one or more instruments.
+
+    Query parameters: dataset (bhavcopy | mcx), symbols (comma-separated TckrSymb / MCX symbol) or,
+    for bhavcopy, instruments (comma-separated FinInstrmId), start_date and end_date (YYYY-MM-DD),
+    and for bhavcopy optional sgmt / src. Each series maps column names to value lists in date order.
+    Symbol series leave options out; an option's history is asked for by its FinInstrmId.
+    """
+    dataset = request.GET.get("dataset", "bhavcopy")
+    kind, raw_ids = ("instrument", request.GET["instruments"]) if "instruments" in request.GET else ("symbol", request.GET.get("symbols", ""))
+    identifiers = list(dict.fromkeys(value.strip() for value in raw_ids.split(",") if value.strip()))
+    if (dataset, kind) not in SERIES:
+        return JsonResponse({"success": False, "error": f"Unsupported dataset/identifier: {dataset}/{kind}."}, status=400)
+    if not 0 < len(identifiers) <= PRICE_HISTORY_MAX_SERIES:
+        return JsonResponse({"success": False, "error": f"Pass 1 to {PRICE_HISTORY_MAX_SERIES} symbols or instruments."}, status=400)
+    try:
+        if kind == "instrument":
+            identifiers = [int(value) for value in identifiers]
+        end_date = datetime.strptime(request.GET["end_date"], "%Y-%m-%d").date() if request.GET.get("end_date") else datetime.today().date()
+        start_date = datetime.strptime(request.GET["start_date"], "%Y-%m-%d").date() if request.GET.get("start_date") else end_date - timedelta(days=365)
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Dates must be YYYY-MM-DD and instruments integers."}, status=400)
+    if not 0 <= (end_date - start_date).days < PRICE_HISTORY_MAX_DAYS:
+        return JsonResponse({"success": False, "error": f"Date range must be ordered and at most {PRICE_HISTORY_MAX_DAYS} days."},
+                            status=400)
+
+    allowed_filters = SERIES[(dataset, kind)][3]
+    filters = {field: request.GET[field.lower()] for field in allowed_filters if request.GET.get(field.lower(), "All") != "All"}
+    series, cache = get_price_history(dataset, kind, identifiers, start_date, end_date, filters)
+    return JsonResponse({
+        "success": True,
+        "dataset": dataset,
+        "start_date": start_date,
+        "end_date": end_date,
+        "series": {str(identifier): data for identifier, data in series.items()},
+        "cache": cache,
+    })
+
+def option_chain(request):
+    """
+    CE/PE-by-strike option chain with OI, change in OI, volume and close.
+
+    Query parameters: dataset (bhavcopy | mcx), underlying (TckrSymb / MCX symbol), date (YYYY-MM-DD),
+    optional expiry (YYYY-MM-DD, default the nearest one traded that day) and, for bhavcopy, sgmt
+    (default FO) and src (default NSE).
+    """
+    dataset = request.GET.get("dataset", "bhavcopy")
+    underlying = request.GET.get("underlying", "").strip()
+    if dataset not in CHAINS or not underlying:
+        return JsonResponse({"success": False, "error": f"underlying and a dataset in {list(CHAINS)} are required."}, status=400)
+    try:
+        trade_date = datetime.strptime(request.GET["date"], "%Y-%m-%d").date()
+        expiry = datetime.strptime(request.GET["expiry"], "%Y-%m-%d").date() if request.GET.get("expiry") else None
+    except (KeyError, ValueError):
+        return JsonResponse({"success": False, "error": "date (and expiry, if given) must be YYYY-MM-DD."}, status=400)
+
+    defaults = {"Sgmt": "FO", "Src": "NSE"}
+    filters = {field: request.GET.get(field.lower(), defaults[field]) for field in CHAINS[dataset][7]}
+    expiry = expiry or nearest_expiry(dataset, underlying, trade_date, filters)
+    if expiry is None:
+        return JsonResponse({"success": False, "error": f"No options for {underlying} on {trade_date}."}, status=404)
+    return JsonResponse({"success": True, **get_option_chain(dataset, underlying, trade_date, expiry, filters)})
+
+def daily_aggregates(request):
+    """
+    Stored per-day market aggregates with their top gainers, losers and turnover leaders.
+
+    Query parameters: start_date / end_date (YYYY-MM-DD, default the last 30 days) and optional
+    comma-separated sgmt / src lists.
+    """
+    try:
+        end_date = datetime.strptime(request.GET["end_date"], "%Y-%m-%d").date() if request.GET.get("end_date") else datetime.today().date()
+        start_date = datetime.strptime(request.GET["start_date"], "%Y-%m-%d").date() if request.GET.get("start_date") else end_date - timedelta(days=30)
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Dates must be YYYY-MM-DD."}, status=400)
+    if not 0 <= (end_date - start_date).days < DAILY_AGGREGATES_MAX_DAYS:
+        return JsonResponse({"success": False, "error": f"Date range must be ordered and at most {DAILY_AGGREGATES_MAX_DAYS} days."},
+                            status=400)
+
+    filters = {"trade_date__range": (start_date, end_date)}
+    for field in ("sgmt", "src"):
+        values = [value for value in request.GET.get(field, "").split(",") if value and value != "All"]
+        if values:
+            filters[f"{field}__in"] = values
+
+    def plain(record):
+        return {key: float(value) if isinstance(value, Decimal) else value for key, value in record.items()}
+
+    movers = defaultdict(lambda: {"gainer": [], "loser": [], "turnover": []})
+    for mover in (models.DailyTopMover.objects.filter(**filters)
+                  .order_by("trade_date", "sgmt", "src", "category", "position")
+                  .values("trade_date", "sgmt", "src", "category", "position", "FinInstrmId", "TckrSymb",
+                          "ClsPric", "PrvsClsgPric", "pct_change", "TtlTrfVal")):
+        key = (mover.pop("trade_date"), mover.pop("sgmt"), mover.pop("src"))
+        movers[key][mover.pop("category")].append(plain(mover))
+
+    summaries = []
+    for summary in models.DailyMarketSummary.objects.filter(**filters).order_by("trade_date", "sgmt", "src").values():
+        summary.pop("id")
+        top = movers[(summary["trade_date"], summary["sgmt"], summary["src"])]
+        summaries.append({**plain(summary), "top_gainers": top["gainer"], "top_losers": top["loser"],
+                          "top_turnover": top["turnover"]})
+    return JsonResponse({"success": True, "start_date": start_date, "end_date": end_date, "results": summaries})
+
+def continuous_futures(request):
+    """
+    Rolled continuous futures series of one root symbol, forward adjusted.
+
+    Query parameters: root (TckrSymb / MCX symbol), rule (oi | volume | days:N as configured, default
+    the first), sgmt / src (default FO / NSE; MCX / MCX for bhav_mcx) and start_date / end_date
+    (YYYY-MM-DD, default the last year). Prices are adjusted (raw + adjustment); close_raw and the
+    contract held each day are included.
+    """
+    root = request.GET.get("root", "").strip()
+    rule = request.GET.get("rule", CONTINUOUS_FUTURES_RULES[0])
+    if not root or rule not in CONTINUOUS_FUTURES_RULES:
+        return JsonResponse({"success": False, "error": f"root and a rule in {CONTINUOUS_FUTURES_RULES} are required."}, status=400)
+    try:
+        end_date = datetime.strptime(request.GET["end_date"], "%Y-%m-%d").date() if request.GET.get("end_date") else datetime.today().date()
+        start_date = datetime.strptime(request.GET["start_date"], "%Y-%m-%d").date() if request.GET.get("start_date") else end_date - timedelta(days=365)
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Dates must be YYYY-MM-DD."}, status=400)
+    sgmt, src = request.GET.get("sgmt", "FO"), request.GET.get("src", "NSE")
+
+    rows = (
+        models.ContinuousFuture.objects.filter(sgmt=sgmt, src=src, root=root, rule=rule,
+                                               trade_date__range=(start_date, end_date))
+        .order_by("trade_date")
+        .values_list("trade_date", "expiry_date", "contract_id", "open_price", "high_price", "low_price", "close_price",
+                     "settle_price", "volume", "open_interest", "adjustment", "rolled")
+    )
+
+    def adjusted(price, adjustment):
+        return float(price + adjustment) if price is not None else None
+
+    series = {column: [] for column in ("trade_date", "expiry_date", "contract_id", "open", "high", "low", "close",
+                                        "settle", "close_raw", "volume", "open_interest", "adjustment", "rolled")}
+    for trade_date, expiry, contract, open_, high, low, close, settle, volume, oi, adjustment, rolled in rows:
+        for column, value in (("trade_date", trade_date), ("expiry_date", expiry), ("contract_id", contract),
+                              ("open", adjusted(open_, adjustment)), ("high", adjusted(high, adjustment)),
+                              ("low", adjusted(low, adjustment)), ("close", adjusted(close, adjustment)),
+                              ("settle", adjusted(settle, adjustment)),
+                              ("close_raw", float(close) if close is not None else None), ("volume", volume),
+                              ("open_interest", oi), ("adjustment", float(adjustment)), ("rolled", bool(rolled))):
+            series[column].append(value)
+    return JsonResponse({"success": True, "root": root, "rule": rule, "sgmt": sgmt, "src": src, "series": series})
+
 ################################################################## INDEX.html END ######################################################
 
 
@@ -184,87 +518,96 @@ def mcx_page(request):
 
 def get_data_mcx(request):
     try:
-        # Get query parameters
-        page = int(request.GET.get("page", 1))
-        start_date = request.GET.get("start_date")
-        end_date = request.GET.get("end_date")
-        status = request.GET.get("status", "All")
-
-        logger.debug(f"Request parameters - page: {page}, start_date: {start_date}, end_date: {end_date}, status: {status}")
-
-        # Parse date range
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date and start_date != "null" else (datetime.today() - timedelta(days=30)).date()
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date and end_date != "null" else datetime.today().date()
-
-        logger.debug(f"Parsed date range - start_date: {start_date}, end_date: {end_date}")
-
-        # Date range
-        date_range = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
-
-        # Fetch data from the database
-        db_results = fetch_database_results_mcx(start_date, end_date)
-
-        final_results = []
-
-        # Apply status filter
-        if status == "Success":
-            # Only include records with status "Success"
-            filtered_results = [record for record in db_results if record["RecordCount"] > 0]
-            for record in filtered_results:
-                record["Weekday"] = calendar.day_name[record["date"].weekday()]
-                final_results.append(record)
-        elif status == "Failed/Not Present":
-            # Include default records for missing data
-            for date in date_range:
-                        record_key = (date)
-                        if not any(record["date"] == date for record in db_results):
-                            final_results.append({
-                                "date": date,
-                                "Weekday": calendar.day_name[date.weekday()],
-                                "RecordCount": 0,
-                                "Status": "Failed/Not Present"
-                            })
-        else:  # Status == "All"
-            # Include both database records and missing data
-            for date in date_range:
-                        matching_record = next((record for record in db_results if record["date"] == date), None)
-                        if matching_record:
-                            matching_record["Weekday"] = calendar.day_name[matching_record["date"].weekday()]
-                            final_results.append(matching_record)
-                        else:
-                            final_results.append({
-                                "date": date,
-                                "Weekday": calendar.day_name[date.weekday()],
-                                "RecordCount": 0,
-                                "Status": "Failed/Not Present"
-                            })
-
-        # Pagination
-        items_per_page = 10
-        total_pages = (len(final_results) + items_per_page - 1) // items_per_page
-        start_index = (page - 1) * items_per_page
-        end_index = start_index + items_per_page
-        paginated_results = final_results[start_index:end_index]
-
-        # Adjust response data for pagination
-        response_data = {
-            "current_page": page,
-            "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_previous": page > 1,
-            "results": paginated_results,
-        }
+        params = get_data_mcx_params(request)
+        cached = RESPONSE_CACHE.get(params["cache_key"])
+        if cached is not None:
+            return cached_json_response(cached)
+        cache_version = RESPONSE_CACHE.version("mcx")
 
-        return JsonResponse(response_data, safe=False)
+        # Fetch data from the database, keyed by date
+        db_results = fetch_database_results_mcx(params["start_date"], params["end_date"])
+        return get_data_mcx_response(params, db_results, cache_version)
 
     except Exception as e:
-        logger.error(f"Error in get_data: {e}", exc_info=True)
+        logger.error("Error in get_data: %s", e, exc_info=True)
         return JsonResponse({"error": "An error occurred while fetching data."}, status=500)
 
 
+async def get_data_mcx_async(request):
+    """get_data_mcx for ASGI: cache hits are answered on the event loop, misses await the async ORM."""
+    try:
+        params = get_data_mcx_params(request)
+        cached = RESPONSE_CACHE.get(params["cache_key"])
+        if cached is not None:
+            return cached_json_response(cached)
+        cache_version = RESPONSE_CACHE.version("mcx")
+
+        db_results = await afetch_database_results_mcx(params["start_date"], params["end_date"])
+        return get_data_mcx_response(params, db_results, cache_version)
+
+    except Exception as e:
+        logger.error("Error in get_data_mcx_async: %s", e, exc_info=True)
+        return JsonResponse({"error": "An error occurred while fetching data."}, status=500)
+
+
+def get_data_mcx_params(request):
+    """Parsed get_data_mcx query parameters, with the response cache key."""
+    # Get query parameters
+    page = int(request.GET.get("page", 1))
+    start_date = request.GET.get("start_date")
+    end_date = request.GET.get("end_date")
+    status = request.GET.get("status", "All")
+
+    logger.debug("Request parameters - page: %s, start_date: %s, end_date: %s, status: %s", page, start_date, end_date, status)
+
+    # Parse date range
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date and start_date != "null" else (datetime.today() - timedelta(days=30)).date()
+    end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date and end_date != "null" else datetime.today().date()
+
+    logger.debug("Parsed date range - start_date: %s, end_date: %s", start_date, end_date)
+
+    page_size = get_page_size(request)
+    cache_key = ("get_data_mcx", start_date, end_date, status, page, page_size)
+    return {"page": page, "start_date": start_date, "end_date": end_date, "status": status, "page_size": page_size,
+            "cache_key": cache_key}
+
+
+def get_data_mcx_response(params, db_results, cache_version):
+    """Build one page of the MCX coverage grid from the load counts and cache its body."""
+    start_date, end_date, page, page_size = params["start_date"], params["end_date"], params["page"], params["page_size"]
+    num_days = (end_date - start_date).days + 1
+    present = {(record["date"],): record for record in db_results}
+
+    def missing_record(date, combo):
+        return {
+            "date": date,
+            "Weekday": calendar.day_name[date.weekday()],
+            "RecordCount": 0,
+            "Status": "Failed/Not Present"
+        }
+
+    paginated_results, total_pages = paginate_coverage(
+        start_date, num_days, [()], present, params["status"], page, page_size, "date", missing_record
+    )
+
+    # Adjust response data for pagination
+    response_data = {
+        "current_page": page,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_previous": page > 1,
+        "results": paginated_results,
+    }
+
+    response = JsonResponse(response_data, safe=False)
+    RESPONSE_CACHE.set(params["cache_key"], response.content, "mcx", start_date, end_date, cache_version)
+    response["X-Cache"] = "MISS"
+    return response
+
+
 def fetch_database_results_mcx(start_date, end_date):
     """
-    Fetch records from the database for the given date range.
+    Fetch per-date MCX load counts for the given date range from load_status.
 
     Args:
         start_date (date): Start date of the range.
@@ -273,49 +616,69 @@ def fetch_database_results_mcx(start_date, end_date):
     Returns:
         list: A list of dictionaries containing the query results.
     """
-    from django.db.models import Case, When, Value, CharField, Count
-
     try:
-        # Query with annotations
-        query = (
-            models.BhavMCX.objects.filter(
-                date__range=(start_date, end_date)
-            )
-            .values("date")
-            .annotate(
-                RecordCount=Count("id"),
-                Status=Case(
-                    When(RecordCount__gt=0, then=Value("Success")),
-                    default=Value("Failed/Not Present"),
-                    output_field=CharField(),
-                )
-            )
-        )
+        results = list(load_status_query_mcx(start_date, end_date))
+        logger.debug("Database Results: %s", results)
+        return results
+
+    except Exception as e:
+        logger.error("Error in fetch_database_results: %s", e, exc_info=True)
+        return []
 
-        results = list(query)
-        logger.debug(f"Database Results: {results}")
+
+async def afetch_database_results_mcx(start_date, end_date):
+    """fetch_database_results_mcx through Django's async ORM."""
+    try:
+        results = [record async for record in load_status_query_mcx(start_date, end_date)]
+        logger.debug("Database Results: %s", results)
         return results
 
     except Exception as e:
-        logger.error(f"Error in fetch_database_results: {e}", exc_info=True)
+        logger.error("Error in afetch_database_results_mcx: %s", e, exc_info=True)
         return []
 
 
+def load_status_query_mcx(start_date, end_date):
+    """Lazy load_status queryset of the loaded MCX days, shaped as dashboard records."""
+    return (
+        models.LoadStatus.objects.filter(
+            trade_date__range=(start_date, end_date),
+            sgmt=MCX_SGMT,
+            src=MCX_SRC,
+            row_count__gt=0,
+        )
+        .values(date=F("trade_date"), RecordCount=F("row_count"))
+        .annotate(
+            Status=Case(
+                When(row_count__gt=0, then=Value("Success")),
+                default=Value("Failed/Not Present"),
+                output_field=CharField(),
+            )
+        )
+        .order_by("trade_date")
+    )
+
+
 def reload_date_mcx(request, date):
-    """Reload data for a specific date."""
+    """Queue an MCX reload for a specific date; poll job_status with the returned job_id."""
     try:
-        # Parse sgmt and src from the request body
-        body = json.loads(request.body)
-        
         print(f"Reloading for Date: {date}")
 
-        result = reload_data_for_date_mcx(date)
-        if result["success"]:
-            return JsonResponse({"success": True, "message": result["message"]})
-        else:
-            return JsonResponse({"success": False, "error": result["error"]})
+        job, created = submit_reload_mcx(date)
+        return JsonResponse({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "duplicate": not created,
+            "message": f"MCX reload for {date} {'queued' if created else 'already in progress'}.",
+        })
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
 
 
+async def reload_date_mcx_async(request, date):
+    """reload_date_mcx for ASGI: queuing a job never blocks, so it is handled on the event loop."""
+    return reload_date_mcx(request, date)
+
+
 ################################################################## MCX.html END ######################################################
\ No newline at end of file
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bhavcopy_app.middleware.RequestProfiler',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,7 +83,7 @@ WSGI_APPLICATION = 'bhavcopy_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-from config import DB_CONFIG
+from config import DB_CONFIG, DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS, LOG_LEVEL
 
 DATABASES = {
     'default': {
@@ -92,6 +93,9 @@ DATABASES = {
         'PASSWORD': DB_CONFIG['password'],
         'HOST': DB_CONFIG['host'],
         'PORT': DB_CONFIG['port'],
+        # Persistent connections: each worker thread connects once instead of on every request
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
     }
 }
 
@@ -135,3 +139,20 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Logging: bhavcopy_app loggers to the console at config.LOG_LEVEL (slow requests, view errors)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'bhavcopy_app': {'handlers': ['console'], 'level': LOG_LEVEL},
+    },
+}
@@ -6,6 +6,24 @@ DB_CONFIG = {
     'port': 3306  # Default MySQL port (if you're using a non-standard port, update accordingly)
 }
 
+# Connection pool shared by the ingest code (bhavcopy_app.db_pool)
+DB_POOL_NAME = "bhavcopy"
+DB_POOL_SIZE = 5  # Connections per process; mysql.connector allows at most 32
+DB_POOL_TIMEOUT = 30  # Seconds to wait for a free connection before giving up
+DB_POOL_HEALTH_CHECK_INTERVAL = 60  # Ping connections idle for longer than this before reuse
+
+# Django's own connection (views): kept open between requests and checked before reuse
+DB_CONN_MAX_AGE = 600
+DB_CONN_HEALTH_CHECKS = True
+
+# manage.py manage_partitions: monthly partitions of BhavCopy / bhav_mcx (SQL/migrations/003)
+PARTITION_MONTHS_AHEAD = 3  # Months beyond the current one that must already have a partition
+PARTITION_RETENTION_MONTHS = None  # Drop/archive months older than this; None keeps everything
+
+# Local storage for downloaded/extracted BhavCopy files
+DATA_DIR = "D:/bhavcopy_data/"
+RAW_CACHE_DIR = DATA_DIR + "raw/"  # Compressed raw downloads, one per (exchange, segment, date)
+
 # Base URLs for different segments
 BASE_URLS = {
     "CM_NSE": "https://nsearchives.nseindia.com/content/cm/BhavCopy_NSE_CM_0_0_0_{date}_F_0000.csv.zip",
@@ -17,3 +35,75 @@ BASE_URLS = {
     "CD_BSE":"https://www.bseindia.com/bsedata/CIML_bhavcopy/BhavCopy_BSE_CD_0_0_0_{date}_F_0000.CSV"
 }
 
+
+# Bulk ingest settings for reload_data_for_date
+INGEST_BATCH_SIZE = 5000  # Rows per executemany / LOAD DATA batch
+INGEST_USE_LOAD_DATA = False  # Use LOAD DATA LOCAL INFILE (server needs local_infile=ON)
+INGEST_RECONCILE = True  # Diff a reloaded day against the stored rows and write only what changed
+INGEST_DAILY_AGGREGATES = True  # Store daily_market_summary / daily_top_movers for each loaded day
+DAILY_TOP_MOVERS = 10  # Gainers, losers and turnover leaders kept per (date, segment, source)
+DAILY_AGGREGATE_WORKERS = 4  # Cells recomputed at once by manage.py rebuild_daily_aggregates
+DAILY_AGGREGATES_MAX_DAYS = 400  # Longest range /app2/aggregates/ serves in one response
+
+# Continuous futures (bhavcopy_app.continuous_futures), extended by every FO / CD / MCX load
+CONTINUOUS_FUTURES_SEGMENTS = ["FO", "CD", "MCX"]  # MCX is the load_status segment of bhav_mcx days
+CONTINUOUS_FUTURES_RULES = ["oi", "volume", "days:3"]  # Roll to max OI / max volume / N calendar days before expiry
+CONTINUOUS_FUTURES_LOCK_TIMEOUT = 120  # Seconds a replay waits for another replay of the same segment/source
+MCX_INSERT_BATCH_SIZE = 5000  # Rows per executemany in mcxdownloader.insert_into_db (one transaction per day)
+MCX_STREAM_CHUNK_BYTES = 64 * 1024  # Read size while streaming the MCX JSON response
+MCX_ARCHIVE_RESPONSES = True  # Keep each raw MCX response gzipped in RAW_CACHE_DIR/MCX/<instrument>/<yyyymmdd>.gz
+
+# Streaming exports (/app2/export/ and manage.py export_data)
+EXPORT_CHUNK_ROWS = 5000  # Rows fetched from the server-side cursor and encoded per response chunk
+EXPORT_MAX_DAYS = 3660  # Longest date range one export request may ask for
+
+# Price history API (/app2/history/): cached series, invalidated per date by reloads
+PRICE_HISTORY_CACHE_MAX_ENTRIES = 2048  # One entry per (instrument, filters, date range)
+PRICE_HISTORY_CACHE_MAX_ROWS = 1000  # Longer series are served uncached, bounding the cache's memory
+PRICE_HISTORY_CACHE_TTL = 300  # Seconds; like RESPONSE_CACHE_TTL, bounds staleness across processes
+PRICE_HISTORY_MAX_SERIES = 20  # Instruments per request
+PRICE_HISTORY_MAX_DAYS = 3660
+
+# Option chain API (/app2/option-chain/): pivots cached per (date, underlying, expiry)
+OPTION_CHAIN_CACHE_MAX_ENTRIES = 256
+OPTION_CHAIN_CACHE_TTL = 300  # Seconds; like RESPONSE_CACHE_TTL, bounds staleness across processes
+
+# Dashboard pagination (get_data / get_data_mcx); callers may pass ?page_size= up to the maximum
+DASHBOARD_PAGE_SIZE = 10
+DASHBOARD_MAX_PAGE_SIZE = 500
+
+# In-process response cache for get_data / get_data_mcx (bhavcopy_app.caching), invalidated per date by reloads
+RESPONSE_CACHE_MAX_ENTRIES = 512  # Least recently used responses are evicted beyond this
+RESPONSE_CACHE_TTL = 300  # Seconds; bounds staleness across processes, since each keeps its own cache
+
+# Background reload jobs (bhavcopy_app.jobs)
+RELOAD_WORKERS = 2  # Reloads parsing/inserting at once in each web process
+RELOAD_JOB_HISTORY = 200  # Finished jobs kept for status polling
+RELOAD_ASYNC_DOWNLOADS = True  # Download NSE/BSE files on a shared asyncio loop (needs httpx; MCX streams into its inserts)
+RELOAD_DOWNLOAD_CONCURRENCY = 4  # Async downloads in flight per exchange
+
+# Ingest metrics (bhavcopy_app.metrics), served in Prometheus text format at /metrics
+METRICS_STAGE_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]  # Seconds, for the stage/reload histograms
+
+# Request profiling (bhavcopy_app.middleware.RequestProfiler): Server-Timing header on every response
+PROFILE_SLOW_REQUEST_MS = 500  # Requests slower than this are logged with their query count and database time
+PROFILE_ENDPOINTS = {}  # URL name -> fraction of its requests run under cProfile, e.g. {"get_data": 0.01}
+PROFILE_DIR = DATA_DIR + "profiles/"  # Sampled profiles, as <url name>/<timestamp>.prof (open with pstats or snakeviz)
+LOG_LEVEL = "INFO"  # bhavcopy_app loggers; DEBUG adds the request parameters and result sets of the dashboard views
+
+# Route /app2/data/, /app2/data/mcx/ and the reload URLs to their async views; enable when serving through asgi.py
+ASYNC_VIEWS = False
+
+# manage.py backfill: per-exchange parallel downloads and minimum seconds between request starts
+BACKFILL_LIMITS = {
+    "NSE": {"concurrency": 2, "min_interval": 1.0},
+    "BSE": {"concurrency": 2, "min_interval": 2.0},
+    "MCX": {"concurrency": 1, "min_interval": 3.0},
+}
+
+# Shared exchange HTTP sessions (bhavcopy_app.exchange_sessions)
+EXCHANGE_SESSION_TTL = {"NSE": 300, "BSE": 600, "MCX": 600}  # Seconds before cookies are re-fetched
+HTTP_POOL_MAXSIZE = 10  # Keep-alive connections per exchange host
+
+# Also write each parsed CSV to DATA_DIR/<yyyymmdd>/ (parsing itself never needs the extracted copy)
+KEEP_EXTRACTED_FILES = False